@@ -1,14 +1,43 @@
-from transformers import AutoTokenizer, AutoModelForCausalLM
+"""
+Gemma Text Generation Demo
+Loads google/gemma-2-2b-it and generates a reply to a prompt
+"""
 
-# Read Hugging Face token from secure file
-with open('hf_token.txt', 'r') as f:
-    hf_token = f.read().strip()
+import os
 
-tokenizer = AutoTokenizer.from_pretrained("google/gemma-2-2b-it", token=hf_token)
-model = AutoModelForCausalLM.from_pretrained("google/gemma-2-2b-it", token=hf_token)
+MODEL_ID = "google/gemma-2-2b-it"
 
-input_text = "Write me a poem about Machine Learning."
-input_ids = tokenizer(input_text, return_tensors="pt")
+def read_token(path=None):
+    """Read the Hugging Face token from hf_token.txt next to this script"""
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hf_token.txt')
+    with open(path, 'r') as f:
+        return f.read().strip()
 
-outputs = model.generate(**input_ids)
-print(tokenizer.decode(outputs[0]))
\ No newline at end of file
+def load_model(model_id=MODEL_ID, token=None):
+    """
+    Load the tokenizer and model
+
+    transformers is imported here rather than at module level, so importing
+    this file (or listing the toolkit's commands) does not pay for it.
+    """
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id, token=token)
+    model = AutoModelForCausalLM.from_pretrained(model_id, token=token)
+    return tokenizer, model
+
+def generate(tokenizer, model, prompt):
+    input_ids = tokenizer(prompt, return_tensors="pt")
+    outputs = model.generate(**input_ids)
+    return tokenizer.decode(outputs[0])
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate text with the Gemma 2B instruction-tuned model")
+    parser.add_argument('prompt', nargs='?', default="Write me a poem about Machine Learning.")
+    parser.add_argument('--model', default=MODEL_ID, help="Hugging Face model id")
+    args = parser.parse_args()
+
+    tokenizer, model = load_model(args.model, token=read_token())
+    print(generate(tokenizer, model, args.prompt))
@@ -4,19 +4,239 @@ This script demonstrates basic web scraping without heavy dependencies
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin
 from datetime import datetime
 import json
+import os
 import re
 import time
 
+# Structural elements counted on every page (3 samples each)
+STRUCTURE_PATTERNS = {
+    'forms': r'<form[^>]*>',
+    'iframes': r'<iframe[^>]*>',
+    'scripts': r'<script[^>]*>',
+    'select_elements': r'<select[^>]*>',
+    'links': r'<a[^>]*href=["\'][^"\']*["\'][^>]*>',
+    'course_mentions': r'course|class|catalog',
+    'search_elements': r'search|browse|find'
+}
+
+# JavaScript frameworks (presence only)
+JS_FRAMEWORK_PATTERNS = {
+    'jQuery': r'jquery',
+    'React': r'react',
+    'Angular': r'angular',
+    'Vue': r'vue\.js',
+    'CTCLink': r'ctclink',
+    'PeopleSoft': r'peoplesoft|ps_'
+}
+
+FORM_ACTION_PATTERN = r'action=["\']([^"\']*)["\']'
+
+# AJAX/API calls in inline JavaScript
+API_PATTERNS = [
+    r'\.ajax\([^)]*\)',
+    r'fetch\([^)]*\)',
+    r'XMLHttpRequest',
+    r'/api/[^"\'\s]*',
+    r'/service/[^"\'\s]*'
+]
+
+_REGEX_SPECIALS = set('.^$*+?{}[]\\|()')
+
+def _literal_anchors(regex):
+    """
+    Literal prefixes of each top-level alternative of a regex
+
+    Returns:
+        tuple: (anchors, is_literal) where is_literal means the regex is nothing
+               but an alternation of those literals
+    """
+    alternatives = []
+    depth = 0
+    in_class = False
+    current = ''
+    escaped = False
+    for char in regex:
+        if escaped:
+            current += '\\' + char
+            escaped = False
+            continue
+        if char == '\\':
+            escaped = True
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            alternatives.append(current)
+            current = ''
+            continue
+        current += char
+    alternatives.append(current)
+
+    anchors = []
+    is_literal = True
+    for alternative in alternatives:
+        anchor = ''
+        i = 0
+        while i < len(alternative):
+            char = alternative[i]
+            if char == '\\' and i + 1 < len(alternative) and not alternative[i + 1].isalnum():
+                anchor += alternative[i + 1]
+                i += 2
+            elif char in _REGEX_SPECIALS or char == '\\':
+                break
+            else:
+                anchor += char
+                i += 1
+        if i < len(alternative):
+            is_literal = False
+            # A quantifier applies to the last literal character, so it isn't part of the prefix
+            if alternative[i] in '*?{':
+                anchor = anchor[:-1]
+        if not anchor:
+            raise ValueError(f"Pattern alternative has no literal prefix: {alternative!r}")
+        anchors.append(anchor.lower())
+    return anchors, is_literal
+
+class PatternScanner:
+    """
+    Count many regexes over a page in one left-to-right pass
+
+    Each pattern must start with literal text (e.g. '<form', 'course|class').
+    Those literal prefixes are compiled into one alternation that finds every
+    place any pattern can start; only there is the full pattern checked.
+    Each pattern only counts matches that begin after its previous match
+    ended, so counts and samples are identical to re.findall per pattern,
+    without building the match lists.
+    """
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns (dict): name -> (regex, number of samples to keep); matched
+                             case-insensitively
+        """
+        self.names = list(patterns)
+        self.sample_limits = [limit for _, limit in patterns.values()]
+        self.compiled = [re.compile(regex, re.IGNORECASE) for regex, _ in patterns.values()]
+
+        self.verify = []
+        self.anchor_patterns = {}
+        for i, (regex, _) in enumerate(patterns.values()):
+            anchors, is_literal = _literal_anchors(regex)
+            self.verify.append(not is_literal)
+            for anchor in anchors:
+                self.anchor_patterns.setdefault(anchor, []).append(i)
+
+        # Non-overlapping alternation would hide an anchor that starts inside
+        # another one ('class' + 'search' in 'classearch'), so record for each
+        # anchor which others can start at which offset inside it
+        anchors = sorted(self.anchor_patterns, key=len, reverse=True)
+        self.overlaps = {
+            anchor: [
+                (offset, other) for offset in range(len(anchor)) for other in anchors
+                if other != anchor and (anchor[offset:].startswith(other) or other.startswith(anchor[offset:]))
+                and (offset > 0 or len(other) < len(anchor))
+            ]
+            for anchor in anchors
+        }
+        self.trigger = re.compile('|'.join(re.escape(anchor) for anchor in anchors))
+
+    def scan(self, text):
+        """
+        Returns:
+            dict: name -> {'count': int, 'samples': list} (samples as re.findall would return them)
+        """
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Some characters change length when lower-cased; positions would not line up
+            lowered = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+        count = len(self.names)
+        counts = [0] * count
+        samples = [[] for _ in range(count)]
+        next_allowed = [0] * count
+        compiled = self.compiled
+        verify = self.verify
+        sample_limits = self.sample_limits
+        anchor_patterns = self.anchor_patterns
+        overlaps = self.overlaps
+
+        def visit(start, anchor):
+            for i in anchor_patterns[anchor]:
+                if start < next_allowed[i]:
+                    continue
+                if verify[i]:
+                    found = compiled[i].match(text, start)
+                    if found is None:
+                        continue
+                    next_allowed[i] = found.end()
+                else:
+                    found = None
+                    next_allowed[i] = start + len(anchor)
+                counts[i] += 1
+                if len(samples[i]) < sample_limits[i]:
+                    found = found or compiled[i].match(text, start)
+                    samples[i].append(found.group(1) if compiled[i].groups == 1 else found.group(0))
+            for offset, other in overlaps[anchor]:
+                if lowered.startswith(other, start + offset):
+                    visit(start + offset, other)
+
+        for match in self.trigger.finditer(lowered):
+            visit(match.start(), match.group())
+
+        return {
+            name: {'count': counts[i], 'samples': samples[i]}
+            for i, name in enumerate(self.names)
+        }
+
+def _build_page_scanner():
+    patterns = {name: (regex, 3) for name, regex in STRUCTURE_PATTERNS.items()}
+    patterns.update({f'framework:{name}': (regex, 0) for name, regex in JS_FRAMEWORK_PATTERNS.items()})
+    patterns['form_actions'] = (FORM_ACTION_PATTERN, 10)
+    patterns.update({f'api:{i}': (regex, 5) for i, regex in enumerate(API_PATTERNS)})
+    return PatternScanner(patterns)
+
+PAGE_SCANNER = _build_page_scanner()
+
+IFRAME_SRC_PATTERN = re.compile(r'<iframe\b[^>]*?\ssrc=["\']([^"\']+)["\']', re.IGNORECASE)
+
+SAVED_PAGE_EXTENSIONS = ('.html', '.htm')
+
 class SimpleCatalogAnalyzer:
-    def __init__(self):
+    def __init__(self, cache=None, pool_size=10):
+        """
+        Args:
+            cache (ResponseCache): Optional response cache shared by every fetch
+            pool_size (int): Keep-alive connections per host (batch mode threads share them)
+        """
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        self.cache = cache
         self.data = []
         
+    def _get(self, url):
+        """GET a page, from the response cache when one is configured"""
+        if self.cache:
+            return self.cache.fetch(self.session, url, timeout=30)
+        response = self.session.get(url, timeout=30)
+        response.raise_for_status()
+        return response
+        
     def analyze_catalog_structure(self, url):
         """
         Analyze the catalog structure without JavaScript execution
@@ -25,82 +245,48 @@ class SimpleCatalogAnalyzer:
         try:
             print(f"Analyzing catalog structure: {url}")
             
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            html_content = response.text
-            
-            # Analyze the HTML structure
-            analysis = {
-                'url': url,
-                'status_code': response.status_code,
-                'content_length': len(html_content),
-                'analysis_time': datetime.now().isoformat(),
-                'findings': {}
-            }
-            
-            # Look for common elements
-            patterns = {
-                'forms': r'<form[^>]*>',
-                'iframes': r'<iframe[^>]*>',
-                'scripts': r'<script[^>]*>',
-                'select_elements': r'<select[^>]*>',
-                'links': r'<a[^>]*href=["\'][^"\']*["\'][^>]*>',
-                'course_mentions': r'course|class|catalog',
-                'search_elements': r'search|browse|find'
-            }
-            
-            for name, pattern in patterns.items():
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                analysis['findings'][name] = {
-                    'count': len(matches),
-                    'samples': matches[:3] if matches else []
-                }
-                
-            # Look for JavaScript frameworks
-            js_frameworks = {
-                'jQuery': r'jquery',
-                'React': r'react',
-                'Angular': r'angular',
-                'Vue': r'vue\.js',
-                'CTCLink': r'ctclink',
-                'PeopleSoft': r'peoplesoft|ps_'
-            }
-            
-            analysis['frameworks'] = {}
-            for framework, pattern in js_frameworks.items():
-                if re.search(pattern, html_content, re.IGNORECASE):
-                    analysis['frameworks'][framework] = True
-                    
-            # Extract potential API endpoints or form actions
-            form_actions = re.findall(r'action=["\']([^"\']*)["\']', html_content, re.IGNORECASE)
-            analysis['form_actions'] = form_actions[:10]  # Limit to first 10
-            
-            # Look for AJAX/API calls in JavaScript
-            api_patterns = [
-                r'\.ajax\([^)]*\)',
-                r'fetch\([^)]*\)',
-                r'XMLHttpRequest',
-                r'/api/[^"\'\s]*',
-                r'/service/[^"\'\s]*'
-            ]
-            
-            analysis['potential_apis'] = []
-            for pattern in api_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                analysis['potential_apis'].extend(matches[:5])
-                
-            return analysis
+            response = self._get(url)
+            return self.analyze_html(response.text, url, response.status_code)
             
         except requests.RequestException as e:
             return {'error': f"Request failed: {e}", 'url': url}
         except Exception as e:
             return {'error': f"Analysis failed: {e}", 'url': url}
             
+    def analyze_html(self, html_content, url, status_code=None):
+        """Analyze already-fetched HTML (a live response or a saved page)"""
+        # Analyze the HTML structure
+        analysis = {
+            'url': url,
+            'status_code': status_code,
+            'content_length': len(html_content),
+            'analysis_time': datetime.now().isoformat(),
+            'findings': {}
+        }
+        
+        # Count every structural, framework and API pattern in one pass
+        scan = PAGE_SCANNER.scan(html_content)
+        analysis['findings'] = {name: scan[name] for name in STRUCTURE_PATTERNS}
+        
+        # Look for JavaScript frameworks
+        analysis['frameworks'] = {
+            name: True for name in JS_FRAMEWORK_PATTERNS if scan[f'framework:{name}']['count']
+        }
+        
+        # Extract potential API endpoints or form actions
+        analysis['form_actions'] = scan['form_actions']['samples']  # Limited to first 10
+        
+        # Look for AJAX/API calls in JavaScript
+        analysis['potential_apis'] = []
+        for i in range(len(API_PATTERNS)):
+            analysis['potential_apis'].extend(scan[f'api:{i}']['samples'])
+            
+        return analysis
+        
     def extract_static_links(self, url):
         """Extract all links that might lead to course data"""
         try:
-            response = self.session.get(url, timeout=30)
+            response = self._get(url)
             html_content = response.text
             
             # Find all links
@@ -179,10 +365,156 @@ class SimpleCatalogAnalyzer:
             
         print(f"Analysis saved to: {filename}")
         return filename
+        
+    def analyze_source(self, source):
+        """
+        Analyze one URL or saved HTML file for a batch report
+        
+        Returns:
+            dict: Flat report row with timings, per-finding counts and the page's iframe URLs
+        """
+        row = {'source': source, 'kind': 'url', 'status_code': None, 'content_length': 0,
+               'fetch_seconds': 0.0, 'analysis_seconds': 0.0, 'error': None}
+        try:
+            start = time.perf_counter()
+            if os.path.isfile(source):
+                row['kind'] = 'file'
+                with open(source, 'r', encoding='utf-8', errors='replace') as f:
+                    html_content = f.read()
+            else:
+                response = self._get(source)
+                html_content = response.text
+                row['status_code'] = response.status_code
+            row['fetch_seconds'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            analysis = self.analyze_html(html_content, source, row['status_code'])
+            iframe_urls = [urljoin(source, src) for src in IFRAME_SRC_PATTERN.findall(html_content)]
+            row['analysis_seconds'] = time.perf_counter() - start
+        except requests.RequestException as e:
+            row['error'] = f"Request failed: {e}"
+            return row
+        except Exception as e:
+            row['error'] = f"Analysis failed: {e}"
+            return row
+            
+        row['content_length'] = analysis['content_length']
+        for name, finding in analysis['findings'].items():
+            row[f'count_{name}'] = finding['count']
+        row['frameworks'] = sorted(analysis['frameworks'])
+        row['form_actions'] = analysis['form_actions']
+        row['potential_apis'] = analysis['potential_apis']
+        row['iframe_urls'] = iframe_urls if row['kind'] == 'url' else []
+        return row
+        
+    def analyze_batch(self, sources, workers=8, follow_iframes=False):
+        """
+        Analyze many URLs and saved HTML files concurrently
+        
+        All threads share this analyzer's pooled session (and response cache).
+        
+        Args:
+            sources (list): URLs and/or paths of saved HTML pages
+            workers (int): Pages analyzed in parallel
+            follow_iframes (bool): Also analyze the iframe pages of each URL (one level deep)
+            
+        Returns:
+            list: Report rows in completion order
+        """
+        rows = []
+        seen = set(sources)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # future -> the page whose iframe it analyzes (None for listed sources)
+            parents = {executor.submit(self.analyze_source, source): None for source in sources}
+            pending = set(parents)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = future.result()
+                    row['parent'] = parents.pop(future)
+                    rows.append(row)
+                    status = f"❌ {row['error']}" if row['error'] else f"✅ {row['content_length']} chars"
+                    print(f"   {status} - {row['source']}")
+                    if not follow_iframes or row['parent']:
+                        continue
+                    for iframe_url in row.get('iframe_urls', []):
+                        if iframe_url in seen:
+                            continue
+                        seen.add(iframe_url)
+                        child = executor.submit(self.analyze_source, iframe_url)
+                        parents[child] = row['source']
+                        pending.add(child)
+                    
+        return rows
+        
+    def save_batch_report(self, rows, filename=None, format='jsonl'):
+        """Write batch rows as JSON Lines or Parquet (Parquet needs pyarrow)"""
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"catalog_analysis_batch_{timestamp}.{format}"
+            
+        if format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            # Pages differ in which findings they have; give every row every column
+            columns = sorted({key for row in rows for key in row})
+            pq.write_table(pa.Table.from_pylist([{key: row.get(key) for key in columns} for row in rows]), filename)
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + '\n')
+                    
+        print(f"Batch report saved to: {filename}")
+        return filename
+
+def load_batch_sources(path):
+    """Saved pages under a directory, or the URLs/paths listed one per line in a file"""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names if name.lower().endswith(SAVED_PAGE_EXTENSIONS)
+        )
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
 
 # Example usage and demonstration
 if __name__ == "__main__":
-    analyzer = SimpleCatalogAnalyzer()
+    import argparse
+    from response_cache import ResponseCache, DEFAULT_CACHE_PATH
+    
+    parser = argparse.ArgumentParser(description="Analyze the CTCLink catalog page structure")
+    parser.add_argument('--no-cache', action='store_true', help="Always fetch from the network")
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH, help="SQLite file for cached responses")
+    parser.add_argument('--cache-ttl', type=float, default=3600, help="Seconds a cached page is used without revalidation")
+    parser.add_argument('--batch', nargs='+', metavar='PATH', help="URL list file(s) and/or directories of saved HTML to analyze concurrently")
+    parser.add_argument('--workers', type=int, default=8, help="Batch mode: pages analyzed in parallel")
+    parser.add_argument('--follow-iframes', action='store_true', help="Batch mode: also analyze each URL's iframe pages")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl', help="Batch report format")
+    parser.add_argument('--output', help="Batch report path (default: catalog_analysis_batch_<timestamp>.<format>)")
+    args = parser.parse_args()
+    
+    cache = None if args.no_cache else ResponseCache(args.cache_path, ttl=args.cache_ttl)
+    analyzer = SimpleCatalogAnalyzer(cache=cache, pool_size=max(10, args.workers))
+    
+    if args.batch:
+        sources = [source for path in args.batch for source in load_batch_sources(path)]
+        print(f"=== Batch Catalog Analysis: {len(sources)} pages, {args.workers} workers ===")
+        start = time.perf_counter()
+        rows = analyzer.analyze_batch(sources, workers=args.workers, follow_iframes=args.follow_iframes)
+        elapsed = time.perf_counter() - start
+        
+        try:
+            analyzer.save_batch_report(rows, args.output, args.format)
+        except ImportError:
+            print("❌ Parquet output needs pyarrow: pip install pyarrow")
+            exit(1)
+        failed = sum(1 for row in rows if row['error'])
+        print(f"📊 {len(rows) - failed} pages analyzed, {failed} failed in {elapsed:.2f}s")
+        if cache:
+            cache.close()
+        exit(0 if not failed else 1)
     
     catalog_url = "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main"
     
@@ -241,6 +573,11 @@ if __name__ == "__main__":
     print()
     filename = analyzer.save_analysis(analysis)
     
+    if cache:
+        stats = cache.summary()
+        print(f"Response cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} fetched")
+        cache.close()
+    
     print()
     print("=== Next Steps ===")
     print("1. Run setup_scraper.bat to install dependencies")
@@ -0,0 +1,344 @@
+"""
+Asyncio Course Catalog Scraper
+Fetches CTCLink subject pages concurrently with aiohttp or Playwright's async API
+"""
+
+from ctclink_http_client import (
+    DEFAULT_BASE_URL, find_content_url, guess_content_url, parse_subjects, parse_courses
+)
+from metrics import ScrapeMetrics
+from resilience import Resilience
+from urllib.parse import urlsplit, urlunsplit
+from datetime import datetime
+import aiohttp
+import asyncio
+import signal
+import json
+import csv
+import logging
+import time
+
+def is_transient_error(error):
+    """Connection failures, timeouts, 429 and 5xx are worth retrying; other HTTP errors are not"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+class TokenBucket:
+    """Allow `rate` requests per second on average with bursts of up to `capacity`"""
+    def __init__(self, rate=2.0, capacity=4):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use"""
+    def __init__(self, rate=2.0, capacity=4):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+
+    async def acquire(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        await self.buckets[host].acquire()
+
+class AsyncCourseScraper:
+    def __init__(self, engine='http', concurrency=8, rate_per_host=2.0, burst=4,
+                 headless=True, timeout=30, max_subjects=None, base_url=DEFAULT_BASE_URL,
+                 change_tracker=None, cache=None, resource_blocker=None, checkpoint=None, sink=None,
+                 resilience=None, metrics=None):
+        """
+        Initialize the asyncio scraper
+
+        Args:
+            engine (str): 'http' uses aiohttp; 'browser' renders pages with Playwright
+            concurrency (int): Maximum subject pages in flight at once
+            rate_per_host (float): Average requests per second allowed to each host
+            burst (int): Requests a host may receive back-to-back before throttling
+            headless (bool): Run the Playwright browser without a window
+            timeout (int): Per-page timeout in seconds
+            max_subjects (int): Limit on subjects scraped per run (None for all)
+            base_url (str): Host to talk to; page links are rebased onto it
+            change_tracker: Optional incremental_scrape.SubjectChangeTracker; unchanged
+                            subject pages are skipped without parsing
+            cache (ResponseCache): Optional on-disk response cache (both engines)
+            resource_blocker (ResourceBlocker): Browser engine: subresource types to skip
+            checkpoint (ScrapeCheckpoint): Records each finished subject; subjects it already
+                                           holds are restored instead of fetched
+            sink: Optional output_sinks sink; records are streamed to it as subjects
+                  finish instead of being kept in courses_data
+            resilience (Resilience): Retry policy, per-host circuit breakers and attempt statistics
+            metrics (ScrapeMetrics): Receives fetch/parse timings and page/row/byte counts
+        """
+        self.engine = engine
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = HostRateLimiter(rate_per_host, burst)
+        self.headless = headless
+        self.timeout = timeout
+        self.max_subjects = max_subjects
+        self.base_url = base_url.rstrip('/')
+        self.change_tracker = change_tracker
+        self.cache = cache
+        self.resource_blocker = resource_blocker
+        self.checkpoint = checkpoint
+        self.sink = sink
+        self.resilience = resilience or Resilience()
+        self.metrics = metrics or ScrapeMetrics('async_course_scraper')
+        self.metrics.track_resilience(self.resilience)
+        self.failed_subjects = []
+        self.courses_data = []
+        self.course_count = 0
+        self.setup_logging()
+
+        self._session = None
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+        self._shutdown = None
+
+    def setup_logging(self):
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def rebase(self, url):
+        """Point an absolute URL found in a page at this scraper's base_url"""
+        parts = urlsplit(url)
+        base = urlsplit(self.base_url)
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+    async def _start(self):
+        """Open the HTTP session or the browser and its page pool"""
+        if self.engine == 'browser':
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            context = await self._browser.new_context()
+            if self.cache:
+                await context.route("**/*", self.cache.playwright_async_route_handler())
+            if self.resource_blocker:
+                # Installed last so it runs first and blocked requests never reach the cache
+                await self.resource_blocker.install_playwright_async(context)
+            self._pages = asyncio.Queue()
+            for _ in range(self.concurrency):
+                self._pages.put_nowait(await context.new_page())
+        else:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+            )
+
+    async def _stop(self):
+        """Close whatever _start opened"""
+        if self._session:
+            await self._session.close()
+            self._session = None
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def fetch(self, url):
+        """
+        Fetch a page's HTML, respecting the per-host rate limit
+
+        Transient failures are retried with backoff (every failure for the
+        browser engine); the last error is raised once the attempts run out.
+        """
+        url = self.rebase(url)
+        retryable = is_transient_error if self.engine == 'http' else None
+        with self.metrics.span('fetch'):
+            html = await self.resilience.call_async('fetch', self._fetch_once, url, url=url, retryable=retryable)
+        self.metrics.inc('pages')
+        self.metrics.inc('bytes', len(html.encode('utf-8')))
+        return html
+
+    async def _fetch_once(self, url):
+        if self.cache and self.engine == 'http':
+            return (await self.cache.fetch_async(self._session, url, throttle=self.rate_limiter.acquire)).text
+
+        await self.rate_limiter.acquire(url)
+        if self.engine == 'browser':
+            page = await self._pages.get()
+            try:
+                await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
+                return await page.content()
+            finally:
+                self._pages.put_nowait(page)
+
+        async with self._session.get(url) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def _scrape_subject(self, semaphore, subject):
+        async with semaphore:
+            try:
+                html = await self.fetch(subject['url'])
+                if self.change_tracker and not self.change_tracker.page_changed(subject['code'], html):
+                    self.logger.info(f"Unchanged {subject['code']}, skipped")
+                    if self.checkpoint:
+                        self.checkpoint.record(subject['code'], [])
+                    return []
+                with self.metrics.span('parse'):
+                    courses = parse_courses(html, subject['code'], subject['url'])
+                if self.change_tracker:
+                    self.change_tracker.record_courses(subject['code'], courses)
+                if self.checkpoint:
+                    self.checkpoint.record(subject['code'], courses)
+                self.logger.info(f"Scraped {subject['code']}: {len(courses)} courses")
+                if self.sink:
+                    # Streamed now; the empty list only marks success for the results loop
+                    self.add_courses(courses)
+                    return []
+                return courses
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error scraping subject {subject['code']}: {e}")
+                return None
+
+    async def scrape_full_catalog_async(self, base_url):
+        """Fetch the subject list, then every subject page concurrently"""
+        self._shutdown = asyncio.Event()
+        await self._start()
+        tasks = []
+        try:
+            portal_url = self.rebase(base_url)
+            try:
+                content_url = find_content_url(await self.fetch(portal_url), portal_url)
+            except Exception as e:
+                self.logger.warning(f"Could not load portal page, guessing content URL: {e}")
+                content_url = None
+            content_url = content_url or guess_content_url(portal_url)
+
+            subjects = parse_subjects(await self.fetch(content_url), content_url)
+            if not subjects:
+                self.logger.error("No subjects found in catalog content page")
+                return False
+            if self.max_subjects:
+                subjects = subjects[:self.max_subjects]
+            if self.checkpoint:
+                done = self.checkpoint.completed()
+                restored = [subject for subject in subjects if subject['code'] in done]
+                for subject in restored:
+                    self.add_courses(done[subject['code']])
+                subjects = [subject for subject in subjects if subject['code'] not in done]
+                if restored:
+                    self.logger.info(f"Resuming: {len(restored)} subjects restored from checkpoint, {len(subjects)} left")
+
+            self.logger.info(f"Scraping {len(subjects)} subjects with concurrency {self.concurrency} ({self.engine} engine)")
+            semaphore = asyncio.Semaphore(self.concurrency)
+            tasks = [asyncio.create_task(self._scrape_subject(semaphore, subject)) for subject in subjects]
+
+            # Finish when every subject is done or a shutdown is requested, whichever comes first
+            shutdown_waiter = asyncio.create_task(self._shutdown.wait())
+            gathered = asyncio.gather(*tasks)
+            await asyncio.wait([gathered, shutdown_waiter], return_when=asyncio.FIRST_COMPLETED)
+            shutdown_waiter.cancel()
+            if self._shutdown.is_set():
+                self.logger.warning("Shutdown requested, cancelling outstanding subjects")
+                gathered.cancel()
+
+            for subject, task in zip(subjects, tasks):
+                if task.done() and not task.cancelled() and task.result() is not None:
+                    self.add_courses(task.result())
+                else:
+                    self.logger.warning(f"Subject {subject['code']} was not scraped")
+                    if not self._shutdown.is_set():
+                        self.failed_subjects.append(subject['code'])
+
+            self.logger.info(f"Total courses scraped: {self.course_count}")
+            if self.failed_subjects:
+                self.logger.error(f"{len(self.failed_subjects)} subjects failed after retries: "
+                                  f"{', '.join(self.failed_subjects)}; rerun with --resume to scrape only these")
+            return not self._shutdown.is_set()
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._stop()
+
+    def add_courses(self, courses):
+        """Stream finished records to the sink, or keep them in courses_data for save_data()"""
+        self.course_count += len(courses)
+        self.metrics.inc('rows', len(courses))
+        if self.sink:
+            self.sink.write_many(courses)
+        else:
+            self.courses_data.extend(courses)
+
+    def request_shutdown(self):
+        """Cancel in-flight work; safe to call from a signal handler on the event loop"""
+        if self._shutdown:
+            self._shutdown.set()
+
+    def scrape_full_catalog(self, base_url):
+        """Run the async scrape to completion (same surface as CourseScraperCTCLink)"""
+        async def main():
+            loop = asyncio.get_running_loop()
+            try:
+                loop.add_signal_handler(signal.SIGTERM, self.request_shutdown)
+            except (NotImplementedError, RuntimeError):
+                pass  # Signal handlers are unavailable on Windows event loops
+            return await self.scrape_full_catalog_async(base_url)
+
+        try:
+            return asyncio.run(main())
+        except Exception as e:
+            self.logger.error(f"Error in async catalog scrape: {e}")
+            return False
+
+    def scrape_catalog(self, url):
+        """Alias matching CourseScraperPlaywright.scrape_catalog"""
+        return self.scrape_full_catalog(url)
+
+    def save_data(self, format='json'):
+        """Save scraped data to file"""
+        start = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if format == 'json':
+            filename = f"course_catalog_async_{timestamp}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.courses_data, f, indent=2, ensure_ascii=False)
+
+        elif format == 'csv':
+            filename = f"course_catalog_async_{timestamp}.csv"
+            if self.courses_data:
+                fieldnames = self.courses_data[0].keys()
+                with open(filename, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(self.courses_data)
+
+        self.metrics.observe('save', time.perf_counter() - start)
+        self.logger.info(f"Data saved to: {filename}")
+        return filename
+
+    def close(self):
+        """Resources are released at the end of each scrape; kept for interface parity"""
+        pass
@@ -0,0 +1,212 @@
+"""
+Multi-Institution Batch Scraper
+Extracts course prefixes for many CTCLink colleges in parallel worker processes
+and stores them in course_catalog.db
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import util
+from datetime import datetime
+import sqlite3
+import os
+
+from init_course_db import migrate_course_prefixes
+
+# Per-process state created once by _init_worker and reused for every institution
+_worker = {}
+
+def _init_worker(backend, headless, http_base_url, cache_path=None):
+    """Open one HTTP session (and response cache) or browser per worker process"""
+    _worker['backend'] = backend
+    if backend == 'http':
+        from ctclink_http_client import CTCLinkCatalogClient, DEFAULT_BASE_URL
+
+        cache = None
+        if cache_path:
+            from response_cache import ResponseCache
+
+            cache = ResponseCache(cache_path)
+            util.Finalize(None, cache.close, exitpriority=5)
+        client = CTCLinkCatalogClient(base_url=http_base_url or DEFAULT_BASE_URL, cache=cache)
+        _worker['client'] = client
+        util.Finalize(None, client.close, exitpriority=10)
+    else:
+        from extract_prefixes_final import create_driver
+
+        driver = create_driver(headless=headless)
+        _worker['driver'] = driver
+        util.Finalize(None, driver.quit, exitpriority=10)
+
+def _scrape_institution(institution_code):
+    """Extract one institution's prefixes with this worker's session or browser"""
+    started = datetime.now()
+    result = {
+        'institution_code': institution_code,
+        'extracted_at': started.isoformat(),
+        'prefixes': [],
+        'error': None
+    }
+    try:
+        if _worker['backend'] == 'http':
+            client = _worker['client']
+            client.institution = institution_code
+            result['source_url'] = client.portal_url()
+            result['prefixes'] = sorted({subject['code'] for subject in client.get_subjects()})
+            result['extraction_method'] = 'Batch HTTP IScript client'
+        else:
+            from extract_prefixes_final import extract_course_prefixes, CATALOG_URL_TEMPLATE
+
+            result['source_url'] = CATALOG_URL_TEMPLATE.format(institution=institution_code)
+            result['prefixes'] = extract_course_prefixes(institution_code, driver=_worker['driver'])
+            result['extraction_method'] = 'Batch Selenium scraping'
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = (datetime.now() - started).total_seconds()
+    return result
+
+def store_institution_prefixes(conn, result, institution_name=None):
+    """
+    Upsert one institution's prefixes into course_prefixes in a single transaction
+
+    Returns:
+        int: Number of prefix rows written
+    """
+    rows = [
+        (prefix, institution_name or result['institution_code'], result['institution_code'],
+         result['extracted_at'], result.get('source_url'), result.get('extraction_method'))
+        for prefix in result['prefixes']
+    ]
+    with conn:
+        conn.executemany("""
+            INSERT INTO course_prefixes
+            (prefix_code, institution, institution_code, extracted_at, source_url, extraction_method)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(institution_code, prefix_code) DO UPDATE SET
+                institution = excluded.institution,
+                extracted_at = excluded.extracted_at,
+                source_url = excluded.source_url,
+                extraction_method = excluded.extraction_method
+        """, rows)
+    return len(rows)
+
+def scrape_institutions(institutions, processes=4, backend='http', headless=True,
+                        http_base_url=None, db_path="course_catalog.db", cache_path=None, checkpoint=None):
+    """
+    Scrape course prefixes for many institutions and store them in the shared database
+
+    Institutions are sharded across worker processes; each worker keeps one
+    HTTP session or browser for all the institutions it handles. Results are
+    written by this (parent) process as they arrive, so SQLite has one writer.
+
+    Args:
+        institutions (dict): Institution code -> display name (name may be None)
+        processes (int): Number of worker processes
+        backend (str): 'http' (CTCLinkCatalogClient) or 'selenium' (Chrome)
+        headless (bool): Run Chrome headless when backend is 'selenium'
+        http_base_url (str): Host for the http backend (e.g. a replay server)
+        db_path (str): SQLite database created by init_course_db.py
+        cache_path (str): Response cache file shared by the http workers (None disables caching)
+        checkpoint (ScrapeCheckpoint): Records each stored institution; institutions it
+                                       already holds are skipped
+
+    Returns:
+        list: Per-institution result dicts (prefixes, timing, error)
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        print(f"   Please run 'python init_course_db.py' first to create the database.")
+        return []
+
+    pending = list(institutions)
+    if checkpoint:
+        done = checkpoint.completed()
+        pending = [code for code in institutions if code not in done]
+        if len(pending) < len(institutions):
+            print(f"⏩ Resuming: {len(institutions) - len(pending)} institutions already stored, {len(pending)} left")
+
+    conn = sqlite3.connect(db_path)
+    migrate_course_prefixes(conn)
+
+    print(f"🏫 Scraping {len(pending)} institutions with {processes} {backend} workers")
+    results = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(backend, headless, http_base_url, cache_path)
+        ) as executor:
+            futures = [executor.submit(_scrape_institution, code) for code in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                code = result['institution_code']
+                if result['error']:
+                    print(f"   ❌ {code}: {result['error']}")
+                    continue
+                written = store_institution_prefixes(conn, result, institutions[code])
+                if checkpoint:
+                    checkpoint.record(code, result['prefixes'])
+                print(f"   ✅ {code}: {written} prefixes in {result['seconds']:.1f}s")
+    finally:
+        conn.close()
+
+    results.sort(key=lambda r: r['institution_code'])
+    return results
+
+def load_institutions(path):
+    """Read 'CODE' or 'CODE,Name' lines into a code -> name dict"""
+    institutions = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            code, _, name = line.partition(',')
+            institutions[code.strip().upper()] = name.strip() or None
+    return institutions
+
+if __name__ == "__main__":
+    import argparse
+    from response_cache import DEFAULT_CACHE_PATH
+    from scrape_checkpoint import ScrapeCheckpoint, DEFAULT_CHECKPOINT_PATH
+
+    parser = argparse.ArgumentParser(description="Scrape course prefixes for many CTCLink institutions")
+    parser.add_argument('institutions', nargs='*', help="Institution codes, e.g. WA030")
+    parser.add_argument('--institutions-file', help="File with one 'CODE' or 'CODE,Name' per line")
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--backend', choices=['http', 'selenium'], default='http')
+    parser.add_argument('--show-browser', action='store_true', help="Run Chrome with a window (selenium backend)")
+    parser.add_argument('--http-base-url', help="Host for the http backend, e.g. a replay_server.py address")
+    parser.add_argument('--db', default="course_catalog.db")
+    parser.add_argument('--cache', action='store_true', help="http backend: reuse responses from the on-disk cache")
+    parser.add_argument('--resume', action='store_true', help="Skip institutions stored by the last interrupted run")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help="File recording finished institutions")
+    args = parser.parse_args()
+
+    institutions = {code.upper(): None for code in args.institutions}
+    if args.institutions_file:
+        institutions.update(load_institutions(args.institutions_file))
+    if not institutions:
+        parser.error("Give institution codes or --institutions-file")
+
+    checkpoint = ScrapeCheckpoint(args.checkpoint, scope='batch_prefixes', resume=args.resume)
+    try:
+        results = scrape_institutions(
+            institutions,
+            processes=args.processes,
+            backend=args.backend,
+            headless=not args.show_browser,
+            http_base_url=args.http_base_url,
+            db_path=args.db,
+            cache_path=DEFAULT_CACHE_PATH if args.cache else None,
+            checkpoint=checkpoint
+        )
+    finally:
+        checkpoint.close()
+
+    failed = [r['institution_code'] for r in results if r['error']]
+    total = sum(len(r['prefixes']) for r in results)
+    print(f"\n📊 {len(results) - len(failed)} institutions scraped, {total} prefixes stored")
+    if failed:
+        print(f"   Failed: {', '.join(failed)}")
+    print(f"\n✨ Done!")
@@ -0,0 +1,73 @@
+"""
+Catalog Parser Benchmark
+Times catalog_parser against the saved course_catalog_20251001_132500.json fixture
+"""
+
+from catalog_parser import iter_catalog_records, Subject
+from datetime import datetime
+import io
+import json
+import re
+import time
+
+FIXTURE = "course_catalog_20251001_132500.json"
+
+def naive_parse(text):
+    """The list-building approach the parser replaces: split everything, findall, dedupe at the end"""
+    lines = [line.strip() for line in text.splitlines()]
+    subjects = re.findall(r'^([A-Z][A-Z&]{1,5})\s*-\s*(.+?)\s*-\s*\1$', '\n'.join(lines), re.MULTILINE)
+    return list(dict.fromkeys(subjects))
+
+def time_it(func, repeats):
+    """Best wall-clock time of `repeats` calls, in seconds"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmark(fixture=FIXTURE, scales=(1, 10, 100), repeats=5):
+    """
+    Parse the fixture's raw_text at several synthetic sizes
+
+    Returns:
+        list: One dict per scale with sizes, record counts and timings
+    """
+    with open(fixture, 'r', encoding='utf-8') as f:
+        blob = json.load(f)[0]['raw_text']
+
+    results = []
+    for scale in scales:
+        text = '\n'.join([blob] * scale)
+        records = list(iter_catalog_records(io.StringIO(text)))
+
+        streaming = time_it(lambda: sum(1 for _ in iter_catalog_records(io.StringIO(text))), repeats)
+        naive = time_it(lambda: naive_parse(text), repeats)
+
+        results.append({
+            'scale': scale,
+            'bytes': len(text.encode('utf-8')),
+            'subjects': sum(1 for r in records if isinstance(r, Subject)),
+            'courses': sum(1 for r in records if not isinstance(r, Subject)),
+            'streaming_seconds': streaming,
+            'naive_seconds': naive,
+            'streaming_mb_per_second': len(text) / streaming / 1e6
+        })
+    return results
+
+if __name__ == "__main__":
+    print("=== Catalog Parser Benchmark ===")
+    results = run_benchmark()
+    print(f"{'Scale':>6} | {'Size':>10} | {'Subjects':>8} | {'Streaming':>10} | {'Naive':>10} | {'MB/s':>7}")
+    print("-" * 68)
+    for r in results:
+        print(f"{r['scale']:>5}x | {r['bytes']:>8} B | {r['subjects']:>8} | "
+              f"{r['streaming_seconds'] * 1000:>7.2f} ms | {r['naive_seconds'] * 1000:>7.2f} ms | "
+              f"{r['streaming_mb_per_second']:>7.1f}")
+
+    filename = f"benchmark_parser_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {filename}")
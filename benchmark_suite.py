@@ -0,0 +1,343 @@
+"""
+Catalog Pipeline Benchmark Suite
+Times the analyzer, prefix extraction, course parsing, save_data and prefix ingestion
+against synthetic CTCLink catalogs served from a local replay server
+"""
+
+from catalog_parser import iter_subjects
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from html import escape
+from urllib.parse import urlencode
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import benchmark_parser
+from ctclink_http_client import CATALOG_SCRIPT_PATH, CTCLinkCatalogClient, parse_courses
+
+# The saved catalog next to this script, so the suite runs from any working directory
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), benchmark_parser.FIXTURE)
+INSTITUTION = "WA030"
+COURSES_PER_SUBJECT = 4
+
+def fixture_subjects(fixture=FIXTURE):
+    """(code, name) pairs of the subjects in the saved catalog fixture"""
+    with open(fixture, 'r', encoding='utf-8') as f:
+        blob = json.load(f)[0]['raw_text']
+    return [(subject.prefix_code, subject.name) for subject in iter_subjects(io.StringIO(blob))]
+
+def _synthetic_code(n):
+    """A 5-letter prefix from a counter; real CTCLink prefixes never start with 'Q'"""
+    letters = ''
+    for _ in range(4):
+        n, digit = divmod(n, 26)
+        letters = chr(ord('A') + digit) + letters
+    return 'Q' + letters
+
+def synthetic_subjects(scale, fixture=FIXTURE):
+    """The fixture's subjects, plus scale - 1 renamed copies of them"""
+    base = fixture_subjects(fixture)
+    subjects = list(base)
+    for copy in range(1, scale):
+        for i, (code, name) in enumerate(base):
+            subjects.append((_synthetic_code((copy - 1) * len(base) + i), f"{name} {copy + 1}"))
+    return subjects
+
+def build_catalog_pages(directory, scale, fixture=FIXTURE):
+    """
+    Write a synthetic catalog in ReplayServer's format: portal shell, content iframe,
+    and one View Courses page per subject
+
+    Returns:
+        list: The (code, name) subjects the catalog lists
+    """
+    os.makedirs(directory, exist_ok=True)
+    subjects = synthetic_subjects(scale, fixture)
+    portal_path = f"/psp/csprd{CATALOG_SCRIPT_PATH}"
+    content_path = f"/psc/csprd{CATALOG_SCRIPT_PATH}?{urlencode({'institution': INSTITUTION})}"
+    courses_path = f"/psc/csprd{CATALOG_SCRIPT_PATH.replace('IScript_Main', 'IScript_SubjectCourses')}"
+    manifest = {portal_path: 'portal.html', content_path: 'content.html'}
+
+    with open(os.path.join(directory, 'portal.html'), 'w', encoding='utf-8') as f:
+        f.write(
+            '<html><head><title>Course Catalog</title></head><body>'
+            '<div id="pthdr">ctcLink</div>'
+            f'<iframe id="main_iframe" name="main_iframe" src="{escape(content_path)}"></iframe>'
+            '</body></html>'
+        )
+
+    rows = []
+    for i, (code, name) in enumerate(subjects):
+        href = f"{courses_path}?{urlencode({'institution': INSTITUTION, 'subject': code})}"
+        rows.append(f'<tr><td>{escape(code)} - {escape(name)} - {escape(code)}</td>'
+                    f'<td><a href="{escape(href)}">View Courses</a></td></tr>')
+
+        filename = f"subject_{i}.html"
+        manifest[href] = filename
+        with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+            f.write('<html><body>' + ''.join(
+                f'<div>{escape(code)} {100 + n} - {escape(name)} {"I" * (n + 1)}</div><div>5 Credits</div>'
+                for n in range(COURSES_PER_SUBJECT)
+            ) + '</body></html>')
+
+    with open(os.path.join(directory, 'content.html'), 'w', encoding='utf-8') as f:
+        f.write('<html><body><h1>Course Catalog</h1><table>' + ''.join(rows) + '</table></body></html>')
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return subjects
+
+def _serve(pages_dir, conn):
+    from replay_server import ReplayServer
+
+    server = ReplayServer(pages_dir)
+    conn.send(server.base_url)
+    server.httpd.serve_forever()
+
+@contextmanager
+def served_catalog(pages_dir):
+    """
+    Serve a catalog from a ReplayServer in a child process and yield its base URL
+
+    In-process, the server's handler threads compete with the client's fetch
+    threads for the GIL and the parallel scrape looks several times slower
+    than it is against a real host.
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(pages_dir, child), daemon=True)
+    process.start()
+    try:
+        yield parent.recv()
+    finally:
+        process.terminate()
+        process.join()
+
+def time_stage(func, repeats, setup=None):
+    """
+    Best and mean wall-clock time of `repeats` calls, in seconds
+
+    setup() runs untimed before each call (e.g. to create a fresh database);
+    its return value is passed to func.
+
+    Returns:
+        tuple: (best seconds, mean seconds, result of the last call)
+    """
+    times = []
+    result = None
+    for _ in range(repeats):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        result = func(arg) if setup else func()
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times), result
+
+def run_scale(scale, workdir, repeats=3, workers=8, fixture=FIXTURE):
+    """
+    Build and serve one synthetic catalog, then time every pipeline stage against it
+
+    Returns:
+        list: One dict per stage with best/mean seconds and the number of items handled
+    """
+    from analyze_catalog import SimpleCatalogAnalyzer
+    from course_catalog_scraper import CourseScraperCTCLink
+    from ingest_course_data import ingest_course_prefixes
+    from init_course_db import create_database_schema
+    pages_dir = os.path.join(workdir, f"pages_{scale}x")
+    subjects = build_catalog_pages(pages_dir, scale, fixture)
+    pages = []
+    for i, (code, _) in enumerate(subjects):
+        with open(os.path.join(pages_dir, f"subject_{i}.html"), 'r', encoding='utf-8') as f:
+            pages.append((code, f.read()))
+
+    results = []
+
+    def record(stage, timing, items):
+        best, mean, _ = timing
+        results.append({
+            'scale': scale,
+            'stage': stage,
+            'items': items,
+            'best_seconds': round(best, 6),
+            'mean_seconds': round(mean, 6),
+            'items_per_second': round(items / best, 1) if best else None
+        })
+
+    with served_catalog(pages_dir) as base_url:
+        client = CTCLinkCatalogClient(base_url=base_url, institution=INSTITUTION,
+                                      pool_size=workers, workers=workers)
+        analyzer = SimpleCatalogAnalyzer(pool_size=workers)
+        try:
+            timing = time_stage(lambda: analyzer.analyze_batch([client.portal_url()], workers=workers,
+                                                               follow_iframes=True), repeats)
+            record('analyze', timing, len(timing[2]))
+
+            timing = time_stage(client.get_subjects, repeats)
+            found = timing[2]
+            if len(found) != len(subjects):
+                raise RuntimeError(f"Expected {len(subjects)} subjects at {scale}x, extracted {len(found)}")
+            record('prefixes', timing, len(found))
+
+            timing = time_stage(lambda: [parse_courses(html, code, code) for code, html in pages], repeats)
+            record('parse_courses', timing, sum(len(courses) for courses in timing[2]))
+
+            timing = time_stage(lambda: list(client.scrape_subjects(found)), repeats)
+            courses = [course for _, subject_courses in timing[2] for course in subject_courses or []]
+            record('scrape_courses', timing, len(courses))
+        finally:
+            analyzer.session.close()
+            client.close()
+
+    scraper = CourseScraperCTCLink(backend='http', http_base_url='http://127.0.0.1')
+    scraper.courses_data = courses
+    record('save_json', time_stage(lambda: scraper.save_data('json'), repeats), len(courses))
+    record('save_csv', time_stage(lambda: scraper.save_data('csv'), repeats), len(courses))
+    scraper.http_client.close()
+
+    prefix_file = os.path.join(workdir, f"prefixes_{scale}x.json")
+    with open(prefix_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'extracted_at': datetime.now().isoformat(),
+            'source_url': client.portal_url(),
+            'institution': 'Benchmark College',
+            'institution_code': INSTITUTION,
+            'extraction_method': 'benchmark_suite',
+            'total_prefixes': len(found),
+            'course_prefixes': [subject['code'] for subject in found]
+        }, f)
+
+    counter = iter(range(repeats))
+
+    def fresh_database():
+        db_path = os.path.join(workdir, f"bench_{scale}x_{next(counter)}.db")
+        create_database_schema(db_path)
+        return db_path
+
+    record('ingest_prefixes', time_stage(lambda db_path: ingest_course_prefixes(prefix_file, db_path),
+                                         repeats, setup=fresh_database), len(found))
+    return results
+
+def git_revision():
+    """Short commit hash of the working tree, if it is a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(scales=(1, 10, 100), repeats=3, workers=8, fixture=FIXTURE, keep_dir=None):
+    """
+    Run every stage at every scale
+
+    The scrapers write logs and output files into the working directory, so the
+    suite runs inside a scratch directory (keep_dir, or a temporary one) with
+    their console output and INFO logging silenced.
+
+    Returns:
+        dict: Environment details and the per-stage results
+    """
+    fixture = os.path.abspath(fixture)
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'workers': workers,
+        'results': []
+    }
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        workdir = os.path.abspath(keep_dir) if keep_dir else scratch
+        os.makedirs(workdir, exist_ok=True)
+        os.chdir(workdir)
+        logging.disable(logging.INFO)
+        try:
+            for scale in scales:
+                with redirect_stdout(io.StringIO()):
+                    report['results'].extend(run_scale(scale, workdir, repeats, workers, fixture))
+        finally:
+            logging.disable(logging.NOTSET)
+            os.chdir(cwd)
+    return report
+
+def find_regressions(report, baseline, tolerance=0.25):
+    """
+    Stages that got slower than in a baseline report
+
+    Args:
+        tolerance (float): Allowed slowdown of best_seconds (0.25 = 25%)
+
+    Returns:
+        list: dicts with scale, stage, baseline and current seconds and the slowdown ratio
+    """
+    previous = {(r['scale'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    for r in report['results']:
+        before = previous.get((r['scale'], r['stage']))
+        if not before or not before['best_seconds']:
+            continue
+        ratio = r['best_seconds'] / before['best_seconds']
+        if ratio > 1 + tolerance:
+            regressions.append({
+                'scale': r['scale'],
+                'stage': r['stage'],
+                'baseline_seconds': before['best_seconds'],
+                'current_seconds': r['best_seconds'],
+                'ratio': round(ratio, 3)
+            })
+    return regressions
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark the catalog pipeline against local synthetic catalogs")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="Catalog sizes as multiples of the fixture's subject list")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed runs per stage (the best is reported)")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent fetches for the analyzer and scraper")
+    parser.add_argument('--fixture', default=FIXTURE, help="Saved catalog JSON the subjects come from")
+    parser.add_argument('--keep', metavar='DIR', help="Keep generated pages, outputs and databases here")
+    parser.add_argument('--baseline', help="Earlier benchmark_suite_*.json to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Slowdown against the baseline that counts as a regression (0.25 = 25%%)")
+    parser.add_argument('--output', help="Results file (default benchmark_suite_<timestamp>.json)")
+    args = parser.parse_args()
+
+    print("=== Catalog Pipeline Benchmark ===")
+    report = run_suite(args.scales, args.repeats, args.workers, args.fixture, args.keep)
+
+    print(f"{'Scale':>6} | {'Stage':<16} | {'Items':>7} | {'Best':>10} | {'Mean':>10} | {'Items/s':>9}")
+    print("-" * 72)
+    for r in report['results']:
+        print(f"{r['scale']:>5}x | {r['stage']:<16} | {r['items']:>7} | "
+              f"{r['best_seconds'] * 1000:>7.1f} ms | {r['mean_seconds'] * 1000:>7.1f} ms | "
+              f"{r['items_per_second'] or 0:>9.0f}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        report['baseline'] = {'file': args.baseline, 'git_revision': baseline.get('git_revision'),
+                              'tolerance': args.tolerance, 'regressions': regressions}
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regressions against {args.baseline}:")
+            for r in regressions:
+                print(f"   {r['scale']}x {r['stage']}: {r['baseline_seconds'] * 1000:.1f} ms -> "
+                      f"{r['current_seconds'] * 1000:.1f} ms ({r['ratio']:.2f}x)")
+        else:
+            print(f"\n✅ No stage slower than {args.baseline} by more than {args.tolerance:.0%}")
+
+    filename = args.output or f"benchmark_suite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {filename}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,66 @@
+"""
+Course Catalog Toolkit CLI
+One entry point for the scrapers, database and export scripts; each subcommand imports
+only its own script (and backend: selenium, playwright, requests, pyarrow, transformers)
+"""
+
+import os
+import runpy
+import sys
+
+# subcommand -> (module run as __main__, or a .py path relative to this file; one-line help)
+COMMANDS = {
+    'scrape': ('course_catalog_scraper', "Scrape one institution's courses (Selenium, or --backend http / --engine async)"),
+    'scrape-playwright': ('course_catalog_scraper_playwright', "Scrape one institution's courses with Playwright"),
+    'batch': ('batch_scrape', "Extract course prefixes for many institutions in parallel"),
+    'prefixes': ('extract_prefixes_final', "Extract one institution's course prefixes with Selenium"),
+    'analyze': ('analyze_catalog', "Analyze catalog page structure (URLs or saved HTML)"),
+    'init-db': ('init_course_db', "Create the course catalog database"),
+    'ingest': ('ingest_course_data', "Load prefix or scraped course JSON into the database"),
+    'query': ('catalog_query', "Look up prefixes and courses read-only, or serve them as a JSON API"),
+    'export': ('parquet_export', "Export courses/prefixes to Parquet and query the datasets"),
+    'replay': ('replay_server', "Serve recorded catalog pages on a local port"),
+    'benchmark': ('benchmark_suite', "Time the pipeline against local synthetic catalogs"),
+    'demo': (os.path.join('BasicDemo', 'gemma_demo.py'), "Generate text with the Gemma 2B demo model"),
+}
+
+def usage():
+    width = max(len(name) for name in COMMANDS)
+    lines = [
+        f"usage: {os.path.basename(sys.argv[0])} <command> [options]",
+        "",
+        "Course catalog toolkit. Run '<command> --help' for a command's options.",
+        "",
+        "commands:"
+    ]
+    lines.extend(f"  {name:<{width}}  {help_text}" for name, (_, help_text) in COMMANDS.items())
+    return '\n'.join(lines)
+
+def main(argv=None):
+    """
+    Run a subcommand's script as __main__ with the remaining arguments
+
+    Nothing but the chosen script is imported, so light commands such as
+    'ingest' or 'init-db' start without loading selenium, playwright or pyarrow.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        print(f"\nunknown command: {command}", file=sys.stderr)
+        return 2
+
+    target, _ = COMMANDS[command]
+    # runpy points sys.argv[0] at the script itself, so its --help shows the script's name
+    sys.argv = sys.argv[:1] + args
+    if target.endswith('.py'):
+        runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), target), run_name='__main__')
+    else:
+        runpy.run_module(target, run_name='__main__', alter_sys=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Streaming Parser for CTCLink Catalog Text
+Turns scraped raw_text blobs and page dumps into typed, de-duplicated subject and course records
+"""
+
+from collections import namedtuple
+import io
+import re
+
+Subject = namedtuple('Subject', ['prefix_code', 'name'])
+Course = namedtuple('Course', ['prefix_code', 'course_number', 'title', 'credits'])
+
+# Prefixes are 2-6 characters and may end in '&' (state common course numbering): ART, ACCT&, ADABE
+PREFIX = r'[A-Z][A-Z&]{1,5}'
+# Whitespace before the course number is optional only after '&' ("MATH&151", but not "WA030")
+NUMBER_SEP = r'(?:[ \t]+|(?<=&)[ \t]*)'
+
+# "ACCT& - Accounting - ACCT&" / "ADESL - English as 2nd Language -ADESL"
+SUBJECT_LINE_PATTERN = re.compile(rf'^({PREFIX})\s*-\s*(.+?)\s*-\s*\1$')
+# "ACCT& 201 - Principles of Accounting I" / "CS 101: Intro" / "MATH&151"
+COURSE_LINE_PATTERN = re.compile(rf'^({PREFIX}){NUMBER_SEP}(\d{{3}}[A-Z]?)\b\s*[-:]?\s*(.*)$')
+# A course code anywhere in a line of text
+COURSE_CODE_PATTERN = re.compile(rf'(?<![A-Za-z&])({PREFIX}){NUMBER_SEP}(\d{{3}}[A-Z]?)\b')
+CREDITS_PATTERN = re.compile(r'(\d+(?:\.\d+)?(?:\s*-\s*\d+(?:\.\d+)?)?)\s*(?:credits?|units?)\b', re.IGNORECASE)
+
+# One scan per chunk finds every subject heading and course line; other lines are
+# skipped inside the regex engine. A course line also captures the next non-empty
+# line, where CTCLink puts the credits.
+_RECORD_PATTERN = re.compile(
+    rf'^[ \t]*(?:'
+    rf'(?P<subject>{PREFIX})[ \t]*-[ \t]*(?P<subject_name>[^\n]+?)[ \t]*-[ \t]*(?P=subject)'
+    rf'|(?P<prefix>{PREFIX}){NUMBER_SEP}(?P<number>\d{{3}}[A-Z]?)\b[ \t]*[-:]?[ \t]*(?P<rest>[^\n]*?)'
+    rf')[ \t\r]*$(?:(?=\n\s*(?P<next>[^\n]*)))?',
+    re.MULTILINE
+)
+
+def _iter_chunks(source, chunk_size):
+    """Yield text chunks from a string, an open text file, or an iterable of chunks"""
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(chunk_size), '')
+    return iter(source)
+
+def _iter_matches(source, chunk_size):
+    """
+    Yield _RECORD_PATTERN matches over a stream of chunks
+
+    Only matches that start before the last complete line of the buffer are
+    taken, and a course line is held back until its following line has
+    arrived, so a chunk boundary never cuts off the credits look-ahead. The
+    rest of the buffer is carried into the next round.
+    """
+    buffer = ''
+    for chunk in _iter_chunks(source, chunk_size):
+        buffer += chunk
+        last_newline = buffer.rfind('\n')
+        cut = buffer.rfind('\n', 0, last_newline) + 1 if last_newline > 0 else 0
+        if cut <= 0:
+            continue
+        for match in _RECORD_PATTERN.finditer(buffer, 0, last_newline):
+            if match.start() >= cut:
+                break
+            if match.group('number') and not match.group('next'):
+                # Only blank lines follow so far; the credits line may be in the next chunk
+                cut = match.start()
+                break
+            yield match
+        buffer = buffer[cut:]
+    yield from _RECORD_PATTERN.finditer(buffer)
+
+def iter_catalog_records(source, chunk_size=65536):
+    """
+    Yield Subject and Course records from catalog text in a single pass
+
+    Each subject appears twice in the catalog listing and course pages may
+    repeat rows; only the first occurrence of each record is yielded. A course
+    line without credits picks them up from the line that follows it.
+
+    Args:
+        source: A string, an open text file, or any iterable of text chunks
+        chunk_size (int): Read size when source is a file object
+    """
+    seen_subjects = set()
+    seen_courses = set()
+
+    for match in _iter_matches(source, chunk_size):
+        prefix = match.group('subject')
+        if prefix:
+            if prefix not in seen_subjects:
+                seen_subjects.add(prefix)
+                yield Subject(prefix, match.group('subject_name'))
+            continue
+
+        key = (match.group('prefix'), match.group('number'))
+        if key in seen_courses:
+            continue
+        seen_courses.add(key)
+
+        rest = match.group('rest')
+        credits = CREDITS_PATTERN.search(rest)
+        following = match.group('next')
+        if not credits and following and not COURSE_LINE_PATTERN.match(following.strip()):
+            credits = CREDITS_PATTERN.search(following)
+        yield Course(
+            key[0],
+            key[1],
+            CREDITS_PATTERN.sub('', rest).strip(' -:'),
+            credits.group(1) if credits else ''
+        )
+
+def iter_subjects(source):
+    """Yield de-duplicated Subject records"""
+    return (record for record in iter_catalog_records(source) if isinstance(record, Subject))
+
+def iter_courses(source, prefix_code=None):
+    """Yield de-duplicated Course records, optionally only those for one prefix"""
+    for record in iter_catalog_records(source):
+        if isinstance(record, Course) and (prefix_code is None or record.prefix_code == prefix_code):
+            yield record
+
+def find_course_code(text):
+    """Return the first course code in text as 'PREFIX NUMBER', or ''"""
+    match = COURSE_CODE_PATTERN.search(text)
+    return f"{match.group(1)} {match.group(2)}" if match else ''
@@ -0,0 +1,439 @@
+"""
+Catalog Query Library and HTTP API
+Read-only, paginated lookups of course prefixes and courses in course_catalog.db by
+institution, prefix and first letter, over a pool of read-only connections
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, quote, urlsplit
+import base64
+import json
+import os
+import queue
+import sqlite3
+import threading
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+class PoolTimeout(Exception):
+    """No pooled connection became free in time"""
+
+def enable_wal(db_path):
+    """
+    Switch the database to WAL journaling (a no-op if it already is)
+
+    The mode is stored in the database file. Under WAL, readers see the last
+    committed snapshot and neither block nor are blocked by the ingest writer.
+    A read-only connection cannot change it, so this uses a short-lived writable
+    one, opened with mode=rw so a missing database is an error rather than created.
+    """
+    conn = sqlite3.connect(f"file:{quote(db_path)}?mode=rw", uri=True)
+    try:
+        return conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    finally:
+        conn.close()
+
+class ConnectionPool:
+    def __init__(self, db_path="course_catalog.db", size=8, timeout=5.0, statement_cache=128, wal=False):
+        """
+        Fixed-size pool of read-only connections shared by request threads
+
+        Connections are opened on first use and reused, so each one keeps its
+        page cache and its compiled statements: sqlite3 caches prepared statements
+        per connection by SQL text, and every query here uses fixed SQL with bound
+        parameters.
+
+        Args:
+            db_path (str): Path to the SQLite database
+            size (int): Maximum open connections
+            timeout (float): Seconds to wait for a free connection before PoolTimeout
+            statement_cache (int): Prepared statements kept per connection
+            wal (bool): Switch the database to WAL first (see enable_wal); needs write
+                        access. Bulk ingest already leaves the database in WAL mode.
+
+        Raises:
+            FileNotFoundError: db_path does not exist
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Catalog database not found: {db_path}")
+        if wal:
+            enable_wal(db_path)
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.statement_cache = statement_cache
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            f"file:{quote(self.db_path)}?mode=ro",
+            uri=True,
+            check_same_thread=False,  # a connection is only ever used by one thread at a time
+            cached_statements=self.statement_cache
+        )
+        conn.execute("PRAGMA query_only=ON")
+        conn.execute("PRAGMA cache_size=-16384")  # 16 MB page cache per connection
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool when the block ends"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                opening = self._opened < self.size
+                if opening:
+                    self._opened += 1
+            if opening:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise PoolTimeout(f"No free connection to {self.db_path} after {self.timeout:g}s")
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        """Close the idle connections now and borrowed ones as they are returned"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+def _letter_range(letter):
+    """prefix_code bounds for a first letter, as an index-friendly range instead of SUBSTR()"""
+    if not letter or len(letter) != 1 or not letter.isalpha():
+        raise ValueError(f"letter must be a single letter, got {letter!r}")
+    letter = letter.upper()
+    return letter, chr(ord(letter) + 1)
+
+def encode_cursor(values):
+    """Opaque page cursor holding the sort key of a page's last row"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("invalid cursor")
+    # Sort keys are text or integers; anything else would reach sqlite3 as an unbindable parameter
+    if any(isinstance(value, bool) or not isinstance(value, (str, int)) for value in values):
+        raise ValueError("invalid cursor")
+    return values
+
+# table -> (columns returned, sort key columns by whether an institution filter is given)
+_LISTINGS = {
+    'course_prefixes': (
+        ('prefix_code', 'institution', 'institution_code', 'extracted_at'),
+        {True: ('institution_code', 'prefix_code'), False: ('prefix_code', 'institution_code')}
+    ),
+    'courses': (
+        ('institution_code', 'prefix_code', 'course_number', 'title', 'credits'),
+        # Both orders are covered by an index (idx_courses_institution / idx_courses_prefix_number)
+        {True: ('institution_code', 'prefix_code', 'course_number'),
+         False: ('prefix_code', 'course_number', 'institution_code')}
+    ),
+}
+
+def _cursor_columns(table, by_institution, by_prefix):
+    """Sort key columns a page cursor holds: those not already pinned by an equality filter"""
+    pinned = {'institution_code'} if by_institution else set()
+    if by_prefix:
+        pinned.add('prefix_code')
+    return tuple(column for column in _LISTINGS[table][1][by_institution] if column not in pinned)
+
+@lru_cache(maxsize=None)
+def _listing_sql(table, by_institution, by_prefix, by_letter, after):
+    """
+    SQL for one combination of filters
+
+    There are only a handful of combinations, so each always yields the same
+    SQL text and hits the connections' prepared-statement cache.
+    """
+    columns, orders = _LISTINGS[table]
+    order = orders[by_institution]
+    conditions = []
+    if by_institution:
+        conditions.append("institution_code = ?")
+    if by_prefix:
+        conditions.append("prefix_code = ?")
+    if by_letter:
+        conditions.append("prefix_code >= ? AND prefix_code < ?")
+    if after:
+        # Keyset pagination: each page seeks straight to the previous page's last row
+        after_columns = _cursor_columns(table, by_institution, by_prefix)
+        conditions.append(f"({', '.join(after_columns)}) > ({', '.join('?' * len(after_columns))})")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY {', '.join(order)} LIMIT ?"
+
+class CatalogQueries:
+    def __init__(self, pool):
+        """
+        Read-only catalog lookups
+
+        List methods return one page: {'items': [...], 'next_cursor': str or None}.
+        Pass next_cursor back to get the following page; it stays valid while the
+        ingest writer adds or removes rows.
+
+        Args:
+            pool (ConnectionPool): Connections to read through
+        """
+        self.pool = pool
+
+    def _page(self, table, institution=None, prefix=None, letter=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        try:
+            limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        except (TypeError, ValueError):
+            raise ValueError(f"limit must be a whole number, got {limit!r}")
+        columns = _LISTINGS[table][0]
+        cursor_columns = _cursor_columns(table, bool(institution), bool(prefix))
+        params = []
+        if institution:
+            params.append(institution.upper())
+        if prefix:
+            params.append(prefix.upper())
+        if letter:
+            params.extend(_letter_range(letter))
+        if cursor:
+            params.extend(decode_cursor(cursor, len(cursor_columns)))
+        sql = _listing_sql(table, bool(institution), bool(prefix), bool(letter), bool(cursor))
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+        items = [dict(zip(columns, row)) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor([items[-1][column] for column in cursor_columns])
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def prefixes(self, institution=None, letter=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """Course prefixes, optionally for one institution and/or starting with one letter"""
+        return self._page('course_prefixes', institution=institution, letter=letter, limit=limit, cursor=cursor)
+
+    def courses(self, prefix=None, institution=None, letter=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """Courses filtered by prefix (e.g. 'MATH&'), institution and/or first letter of the prefix"""
+        return self._page('courses', institution=institution, prefix=prefix, letter=letter, limit=limit, cursor=cursor)
+
+    def course(self, institution, prefix, number):
+        """One course with its subject name, or None"""
+        with self.pool.connection() as conn:
+            row = conn.execute("""
+                SELECT c.institution_code, c.prefix_code, c.course_number, c.title, c.credits,
+                       c.description, s.subject_name
+                FROM courses c
+                JOIN subjects s ON s.id = c.subject_id
+                WHERE c.institution_code = ? AND c.prefix_code = ? AND c.course_number = ?
+            """, (institution.upper(), prefix.upper(), number.upper())).fetchone()
+        if not row:
+            return None
+        return dict(zip(('institution_code', 'prefix_code', 'course_number', 'title', 'credits',
+                         'description', 'subject_name'), row))
+
+    def institutions(self):
+        """Institutions with their number of prefixes"""
+        with self.pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT institution_code, MAX(institution), COUNT(*)
+                FROM course_prefixes
+                GROUP BY institution_code
+                ORDER BY institution_code
+            """).fetchall()
+        return [{'institution_code': code, 'institution': name, 'prefixes': count} for code, name, count in rows]
+
+    def letters(self, institution=None):
+        """Number of prefixes per first letter"""
+        with self.pool.connection() as conn:
+            rows = conn.execute("""
+                SELECT SUBSTR(prefix_code, 1, 1), COUNT(*)
+                FROM course_prefixes
+                WHERE ? IS NULL OR institution_code = ?
+                GROUP BY SUBSTR(prefix_code, 1, 1)
+                ORDER BY 1
+            """, (institution and institution.upper(),) * 2).fetchall()
+        return [{'letter': letter, 'prefixes': count} for letter, count in rows]
+
+class CatalogAPIServer:
+    def __init__(self, db_path="course_catalog.db", host="127.0.0.1", port=8080, pool_size=8, wal=False):
+        """
+        JSON HTTP API over CatalogQueries
+
+        Endpoints (all GET, all return JSON):
+            /prefixes?institution=&letter=&limit=&cursor=
+            /courses?prefix=&institution=&letter=&limit=&cursor=
+            /course?institution=&prefix=&number=
+            /institutions
+            /letters?institution=
+            /health
+
+        Args:
+            db_path (str): Catalog database
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free port)
+            pool_size (int): Read-only connections shared by the request threads
+            wal (bool): Switch the database to WAL before serving (see enable_wal)
+        """
+        self.pool = ConnectionPool(db_path, size=pool_size, wal=wal)
+        self.queries = CatalogQueries(self.pool)
+        self.requests_served = 0
+        self._served_lock = threading.Lock()
+
+        server = self
+
+        class CatalogHandler(BaseHTTPRequestHandler):
+            # Keep-alive, so a client can send many lookups over one connection
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                try:
+                    status, body = server.route(parts.path.rstrip('/') or '/', params)
+                except ValueError as e:
+                    status, body = 400, {'error': str(e)}
+                except PoolTimeout as e:
+                    status, body = 503, {'error': str(e)}
+                except sqlite3.Error as e:
+                    status, body = 500, {'error': f"database error: {e}"}
+                with server._served_lock:
+                    server.requests_served += 1
+
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), CatalogHandler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def route(self, path, params):
+        """Answer one request; returns (HTTP status, JSON-ready body)"""
+        page = {key: params[key] for key in ('limit', 'cursor') if key in params}
+        if path == '/prefixes':
+            return 200, self.queries.prefixes(params.get('institution'), params.get('letter'), **page)
+        if path == '/courses':
+            return 200, self.queries.courses(params.get('prefix'), params.get('institution'), params.get('letter'), **page)
+        if path == '/course':
+            missing = [key for key in ('institution', 'prefix', 'number') if not params.get(key)]
+            if missing:
+                raise ValueError(f"missing parameters: {', '.join(missing)}")
+            course = self.queries.course(params['institution'], params['prefix'], params['number'])
+            return (200, course) if course else (404, {'error': "course not found"})
+        if path == '/institutions':
+            return 200, {'items': self.queries.institutions()}
+        if path == '/letters':
+            return 200, {'items': self.queries.letters(params.get('institution'))}
+        if path == '/health':
+            return 200, {'status': 'ok', 'requests_served': self.requests_served}
+        return 404, {'error': f"unknown path {path}"}
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down and close the pooled connections"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the course catalog database read-only, or serve it as a JSON API")
+    parser.add_argument('--db', default="course_catalog.db")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    prefixes = commands.add_parser('prefixes', help="List course prefixes")
+    courses = commands.add_parser('courses', help="List courses")
+    courses.add_argument('--prefix', help="e.g. MATH&")
+    for listing in (prefixes, courses):
+        listing.add_argument('--institution', help="e.g. WA030")
+        listing.add_argument('--letter', help="First letter of the prefix")
+        listing.add_argument('--limit', type=int, default=DEFAULT_PAGE_SIZE, help="Rows per page")
+        listing.add_argument('--cursor', help="next_cursor printed by the previous page")
+    commands.add_parser('institutions', help="Institutions and their prefix counts")
+    letters = commands.add_parser('letters', help="Prefix counts by first letter")
+    letters.add_argument('--institution')
+
+    serve = commands.add_parser('serve', help="Serve the JSON API")
+    serve.add_argument('--host', default="127.0.0.1")
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--pool-size', type=int, default=8, help="Read-only connections shared by request threads")
+    serve.add_argument('--wal', action='store_true',
+                       help="Switch the database to WAL first so ingest runs do not block readers (needs write access)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"catalog database not found: {args.db}")
+
+    if args.command == 'serve':
+        api = CatalogAPIServer(args.db, args.host, args.port, args.pool_size, args.wal)
+        print(f"Serving {args.db} at {api.base_url} (/prefixes, /courses, /course, /institutions, /letters)")
+        try:
+            api.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped")
+        finally:
+            api.pool.close()
+    else:
+        pool = ConnectionPool(args.db, size=1)
+        queries = CatalogQueries(pool)
+        try:
+            if args.command == 'prefixes':
+                result = queries.prefixes(args.institution, args.letter, args.limit, args.cursor)
+            elif args.command == 'courses':
+                result = queries.courses(args.prefix, args.institution, args.letter, args.limit, args.cursor)
+            elif args.command == 'institutions':
+                result = {'items': queries.institutions()}
+            else:
+                result = {'items': queries.letters(args.institution)}
+        finally:
+            pool.close()
+
+        for item in result['items']:
+            print('  '.join(str(value) for value in item.values()))
+        if result.get('next_cursor'):
+            print(f"\nMore rows: --cursor {result['next_cursor']}")
@@ -8,12 +8,29 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException, InvalidSessionIdException
+import urllib3
 import time
 import json
 import csv
 from datetime import datetime
 import logging
+import queue
+import threading
+from page_readiness import PageReadiness
+from page_capture import PageCapture, CAPTURE_MODES
+from catalog_parser import find_course_code
+from dom_snapshot import snapshot_first, snapshot_elements
+from resilience import Resilience, RetryPolicy
+from metrics import ScrapeMetrics
+
+# Failures of the page or the browser (worth a retry), as opposed to bugs in the scraper;
+# connection errors to chromedriver mean the browser process is gone
+DRIVER_ERRORS = (WebDriverException, ConnectionError, urllib3.exceptions.HTTPError)
+DRIVER_GONE_ERRORS = (InvalidSessionIdException, ConnectionError, urllib3.exceptions.HTTPError)
+
+def is_driver_error(error):
+    return isinstance(error, DRIVER_ERRORS)
 
 class CourseScraperCTCLink:
     def __init__(self, headless=True, wait_timeout=10):
@@ -54,6 +71,7 @@ class CourseScraperCTCLink:
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
             self.wait = WebDriverWait(self.driver, self.wait_timeout)
+            self.readiness = PageReadiness(self.driver, self.wait_timeout, logger=self.logger)
             self.logger.info("Chrome driver initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize Chrome driver: {e}")
@@ -90,19 +108,85 @@ class CourseScraperCTCLink:
             self.logger.error(f"Failed to save page source: {e}")
             return None
 
+class PolitenessBudget:
+    """Shared throttle that spaces out subject searches across all drivers"""
+    def __init__(self, request_interval=2.0):
+        self.request_interval = request_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        
+    def wait(self):
+        """Block until this caller's slot in the shared request schedule"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.request_interval
+        if slot > now:
+            time.sleep(slot - now)
+
 class CourseScraperCTCLink:
-    def __init__(self, headless=True, wait_timeout=10):
+    def __init__(self, headless=True, wait_timeout=10, workers=1, request_interval=2.0, max_subjects=5,
+                 backend='selenium', http_base_url=None, institution_code='WA030', change_tracker=None,
+                 cache=None, resource_blocker=None, capture=None, checkpoint=None, sink=None,
+                 resilience=None, restart_after=3, metrics=None):
         """
         Initialize the scraper with Chrome driver
         
         Args:
             headless (bool): Run browser in headless mode
             wait_timeout (int): Timeout for waiting for elements
+            workers (int): Number of browser drivers searching subjects in parallel
+            request_interval (float): Minimum seconds between subject searches across all drivers
+            max_subjects (int): Limit on subjects scraped per run (None for all)
+            backend (str): 'selenium' drives Chrome; 'http' fetches the IScript pages directly
+            http_base_url (str): Host for the 'http' backend (e.g. a local replay server)
+            institution_code (str): CTCLink institution being scraped (WA030 = Olympic College)
+            change_tracker: Optional incremental_scrape.SubjectChangeTracker; subjects
+                            whose result page is unchanged are not parsed
+            cache (ResponseCache): On-disk response cache for the 'http' backend
+            resource_blocker (ResourceBlocker): Drops images, fonts, trackers etc. in Chrome
+                                                via DevTools; shared with pool workers
+            capture (PageCapture): Screenshot/page-source policy; defaults to on-error captures
+            checkpoint (ScrapeCheckpoint): Records each finished subject; subjects it already
+                                           holds are restored instead of scraped
+            sink: Optional output_sinks sink; records are streamed to it as subjects
+                  finish instead of being kept in courses_data
+            resilience (Resilience): Retry policy, per-host circuit breakers and attempt
+                                     statistics; shared with pool workers and the http client
+            restart_after (int): Consecutive WebDriver failures after which Chrome is restarted
+            metrics (ScrapeMetrics): Stage timings and page/row counters; shared with pool workers
         """
+        self.headless = headless
         self.wait_timeout = wait_timeout
+        self.workers = max(1, workers)
+        self.request_interval = request_interval
+        self.max_subjects = max_subjects
+        self.backend = backend
+        self.institution_code = institution_code
+        self.change_tracker = change_tracker
+        self.cache = cache
+        self.resource_blocker = resource_blocker
+        self.checkpoint = checkpoint
+        self.sink = sink
+        self.resilience = resilience or Resilience()
+        self.restart_after = max(1, restart_after)
+        self.metrics = metrics or ScrapeMetrics('course_catalog_scraper', institution_code)
+        self.metrics.track_resilience(self.resilience)
+        self.catalog_url = None
+        self.failed_subjects = []
+        self._driver_failures = 0
+        self._owns_capture = capture is None
+        self.capture = capture or PageCapture()
+        self.driver = None
+        self.http_client = None
         self.setup_logging()
-        self.setup_driver(headless)
+        if backend == 'http':
+            self.setup_http_client(http_base_url)
+        else:
+            self.setup_driver(headless)
         self.courses_data = []
+        self.course_count = 0
+        self._output_lock = threading.Lock()
         
     def setup_logging(self):
         """Set up logging for debugging"""
@@ -125,68 +209,101 @@ class CourseScraperCTCLink:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
+        if self.resource_blocker:
+            self.resource_blocker.configure_chrome_options(chrome_options)
         
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
+            if self.resource_blocker:
+                self.resource_blocker.install_selenium(self.driver)
             self.wait = WebDriverWait(self.driver, self.wait_timeout)
+            self.readiness = PageReadiness(self.driver, self.wait_timeout, logger=self.logger)
             self.logger.info("Chrome driver initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize Chrome driver: {e}")
             raise
             
+    def setup_http_client(self, base_url=None):
+        """Initialize the browserless CTCLink catalog client"""
+        from ctclink_http_client import CTCLinkCatalogClient, DEFAULT_BASE_URL
+        
+        self.http_client = CTCLinkCatalogClient(
+            base_url=base_url or DEFAULT_BASE_URL,
+            institution=self.institution_code,
+            timeout=max(self.wait_timeout, 30),
+            pool_size=max(self.workers, 4),
+            workers=self.workers,
+            cache=self.cache,
+            resilience=self.resilience,
+            metrics=self.metrics
+        )
+        self.logger.info(f"HTTP catalog client initialized for {self.http_client.base_url}")
+        
     def navigate_to_catalog(self, base_url):
-        """Navigate to the course catalog main page"""
+        """Navigate to the course catalog main page, retrying failed loads with backoff"""
+        self.catalog_url = base_url
         try:
-            self.logger.info(f"Navigating to: {base_url}")
-            self.driver.get(base_url)
-            
-            # Wait for page to load
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(2)  # Additional wait for dynamic content
-            
-            # Take screenshot after page loads
-            self.take_screenshot("01_page_loaded.png")
-            
-            # Check if we're already on Olympic College page (direct URL)
-            current_url = self.driver.current_url.lower()
-            if 'institution=wa030' in current_url or 'olympic' in current_url:
-                self.logger.info("Already on Olympic College page (direct URL)")
-                self.take_screenshot("02_olympic_college_page.png")
-            else:
-                # Try to find Olympic College link if we're on the general page
-                if self.click_olympic_college_link():
-                    self.logger.info("Successfully clicked Olympic College link")
-                    time.sleep(3)  # Wait for navigation
-                    self.take_screenshot("02_olympic_college_page.png")
-                else:
-                    self.logger.info("Olympic College link not found, continuing with current page")
-            
+            with self.metrics.span('navigate'):
+                self.resilience.call('navigate', self._load_catalog, base_url, url=base_url,
+                                     retryable=is_driver_error, before_retry=self._before_driver_retry)
             self.logger.info("Successfully loaded catalog page")
             return True
             
         except TimeoutException:
             self.logger.error("Timeout waiting for page to load")
+            self.take_screenshot("error_navigate_timeout.png", error=True)
             return False
         except Exception as e:
             self.logger.error(f"Error navigating to catalog: {e}")
+            self.take_screenshot("error_navigate.png", error=True)
             return False
             
+    def _load_catalog(self, base_url):
+        """One attempt at loading the catalog and reaching the institution's page"""
+        self.logger.info(f"Navigating to: {base_url}")
+        self.driver.get(base_url)
+        
+        # Wait for page to load
+        self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        self.readiness.document_ready()
+        self.readiness.spinner_gone()
+        self.metrics.inc('pages')
+        
+        # Take screenshot after page loads
+        self.take_screenshot("01_page_loaded.png")
+        
+        # Check if we're already on the institution's page (direct URL)
+        current_url = self.driver.current_url.lower()
+        if f'institution={self.institution_code.lower()}' in current_url or 'olympic' in current_url:
+            self.logger.info(f"Already on {self.institution_code} page (direct URL)")
+            self.take_screenshot("02_olympic_college_page.png")
+        else:
+            # Try to find Olympic College link if we're on the general page
+            old_root = self.readiness.current_root()
+            if self.click_olympic_college_link():
+                self.logger.info("Successfully clicked Olympic College link")
+                self.readiness.page_settled(old_root)  # Wait for navigation
+                self.take_screenshot("02_olympic_college_page.png")
+            else:
+                self.logger.info("Olympic College link not found, continuing with current page")
+            
     def click_olympic_college_link(self):
         """Find and click on Olympic College link in navigation"""
         try:
             self.logger.info("Searching for Olympic College link...")
             
-            # Wait a bit more for page to fully load
-            time.sleep(3)
+            # Wait for dynamic content to stop changing
+            self.readiness.dom_quiet()
             
             # First, let's see what links are available for debugging
-            all_links = self.driver.find_elements(By.TAG_NAME, "a")
+            # (text, href and title of every link in one round trip)
+            all_links = snapshot_elements(self.driver, "a", ['href', 'title'])
             self.logger.info(f"Found {len(all_links)} total links on page")
             
             # Log first few links to help debug
             for i, link in enumerate(all_links[:10]):
                 link_text = link.text.strip()
-                link_href = link.get_attribute('href') or ''
+                link_href = link.attrs['href'] or ''
                 if link_text:  # Only log links with text
                     self.logger.info(f"Link {i+1}: '{link_text}' -> {link_href}")
             
@@ -199,11 +316,11 @@ class CourseScraperCTCLink:
             ]
             
             # Search through all links for Olympic College
-            for link in all_links:
+            for snapshot in all_links:
                 try:
-                    link_text = (link.text or '').strip().lower()
-                    link_href = (link.get_attribute('href') or '').lower()
-                    link_title = (link.get_attribute('title') or '').lower()
+                    link_text = (snapshot.text or '').strip().lower()
+                    link_href = (snapshot.attrs['href'] or '').lower()
+                    link_title = (snapshot.attrs['title'] or '').lower()
                     
                     # Check if any Olympic pattern matches
                     for pattern in olympic_patterns:
@@ -212,20 +329,22 @@ class CourseScraperCTCLink:
                             pattern in link_title):
                             
                             self.logger.info(f"FOUND Olympic College link!")
-                            self.logger.info(f"  Text: '{link.text}'")
-                            self.logger.info(f"  Href: '{link.get_attribute('href')}'")
-                            self.logger.info(f"  Title: '{link.get_attribute('title')}'")
+                            self.logger.info(f"  Text: '{snapshot.text}'")
+                            self.logger.info(f"  Href: '{snapshot.attrs['href']}'")
+                            self.logger.info(f"  Title: '{snapshot.attrs['title']}'")
                             self.logger.info(f"  Matched pattern: '{pattern}'")
                             
+                            # Only the matching link is fetched as a live WebElement
+                            link = self.driver.find_elements(By.TAG_NAME, "a")[snapshot.index]
+                            
                             # Make sure link is visible
                             if link.is_displayed() and link.is_enabled():
                                 # Scroll to element
                                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", link)
-                                time.sleep(1)
                                 
                                 # Highlight the element (for debugging)
                                 self.driver.execute_script("arguments[0].style.border='3px solid red';", link)
-                                time.sleep(1)
+                                self.wait.until(EC.element_to_be_clickable(link))
                                 
                                 # Try to click
                                 try:
@@ -257,7 +376,7 @@ class CourseScraperCTCLink:
                     self.logger.info(f"  {i+1}. '{link_text}'")
             
             # Save page source for debugging
-            self.save_page_source("debug_no_olympic_link.html")
+            self.save_page_source("debug_no_olympic_link.html", error=True)
             
             return False
             
@@ -271,23 +390,26 @@ class CourseScraperCTCLink:
             self.logger.info("Looking for course search interface...")
             
             # Try to find main iframe first (common in CTCLink)
-            try:
-                iframe = self.wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "iframe"))
-                )
-                self.logger.info(f"Found iframe: {iframe.get_attribute('name') or iframe.get_attribute('id')}")
-                self.driver.switch_to.frame(iframe)
-                self.logger.info("Switched to main iframe")
-                
-                # Take screenshot after switching to iframe
-                self.take_screenshot("03_inside_iframe.png")
-                
-                # Wait for iframe content to load
-                time.sleep(3)
-                
-            except TimeoutException:
-                self.logger.info("No iframe found, continuing with main page")
-                self.take_screenshot("03_main_page_no_iframe.png")
+            with self.metrics.span('iframe'):
+                try:
+                    iframe = self.wait.until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "iframe"))
+                    )
+                    self.logger.info(f"Found iframe: {iframe.get_attribute('name') or iframe.get_attribute('id')}")
+                    if not self.readiness.iframe_loaded(iframe).ready:
+                        self.driver.switch_to.frame(iframe)
+                    self.logger.info("Switched to main iframe")
+                    
+                    # Wait for iframe content to finish rendering
+                    self.readiness.spinner_gone()
+                    self.readiness.dom_quiet()
+                    
+                    # Take screenshot after switching to iframe
+                    self.take_screenshot("03_inside_iframe.png")
+                    
+                except TimeoutException:
+                    self.logger.info("No iframe found, continuing with main page")
+                    self.take_screenshot("03_main_page_no_iframe.png")
             
             # Now let's explore what's actually in the iframe/page
             self.logger.info("Exploring page content...")
@@ -297,10 +419,10 @@ class CourseScraperCTCLink:
             self.logger.info(f"Found {len(forms)} forms")
             
             # Look for select elements (dropdowns)
-            selects = self.driver.find_elements(By.TAG_NAME, "select")
+            selects = snapshot_elements(self.driver, "select", ['name', 'id'], text_property='tagName')
             self.logger.info(f"Found {len(selects)} select elements")
             for i, select in enumerate(selects[:5]):  # Log first 5
-                name = select.get_attribute('name') or select.get_attribute('id') or f'select_{i}'
+                name = select.attrs['name'] or select.attrs['id'] or f'select_{i}'
                 self.logger.info(f"  Select: {name}")
                 
             # Look for input elements
@@ -312,7 +434,7 @@ class CourseScraperCTCLink:
             self.logger.info(f"Found {len(buttons)} buttons")
             
             # Look for links that might be navigation
-            links = self.driver.find_elements(By.TAG_NAME, "a")
+            links = snapshot_elements(self.driver, "a")
             self.logger.info(f"Found {len(links)} links in iframe")
             for i, link in enumerate(links[:10]):  # Log first 10 links
                 link_text = (link.text or '').strip()
@@ -375,53 +497,101 @@ class CourseScraperCTCLink:
                 "select[id*='dept']",
             ]
             
-            for selector in subject_selectors:
-                try:
-                    subject_dropdown = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    select = Select(subject_dropdown)
-                    
-                    for option in select.options:
-                        if option.value and option.value != "":
-                            subjects.append({
-                                'code': option.value,
-                                'name': option.text
-                            })
-                    
-                    self.logger.info(f"Found {len(subjects)} subjects")
-                    return subjects
-                    
-                except NoSuchElementException:
-                    continue
+            # Options of the first matching dropdown, read in one round trip
+            selector, options = snapshot_first(
+                self.driver, [f"{selector} option" for selector in subject_selectors], ['value']
+            )
+            for option in options:
+                if option.attrs['value']:
+                    subjects.append({
+                        'code': option.attrs['value'],
+                        'name': option.text
+                    })
                     
+            if selector:
+                self.logger.info(f"Found {len(subjects)} subjects")
+                
         except Exception as e:
             self.logger.error(f"Error getting subjects: {e}")
             
         return subjects
         
     def search_courses_by_subject(self, subject_code):
-        """Search for courses in a specific subject"""
+        """
+        Search for courses in a specific subject (None if the search failed)
+        
+        A failed search is retried from a reloaded search form; Chrome is
+        restarted after restart_after consecutive WebDriver failures.
+        """
         try:
-            # Select subject
-            subject_dropdown = self.driver.find_element(By.CSS_SELECTOR, "select[name*='subject']")
-            select = Select(subject_dropdown)
-            select.select_by_value(subject_code)
+            with self.metrics.span('search'):
+                courses = self.resilience.call('search', self._search_subject, subject_code, url=self.catalog_url,
+                                               retryable=is_driver_error, before_retry=self._before_search_retry)
+            self._driver_failures = 0
+            return courses
+            
+        except Exception as e:
+            self.logger.error(f"Error searching courses for {subject_code}: {e}")
+            self.take_screenshot(f"error_search_{subject_code}.png", error=True)
+            return None
             
-            # Submit search
-            search_button = self.driver.find_element(By.CSS_SELECTOR, "input[type='submit'], button[type='submit']")
-            search_button.click()
+    def _search_subject(self, subject_code):
+        """One attempt at searching a subject and extracting its result rows"""
+        # Select subject
+        subject_dropdown = self.driver.find_element(By.CSS_SELECTOR, "select[name*='subject']")
+        select = Select(subject_dropdown)
+        select.select_by_value(subject_code)
+        
+        # Submit search
+        old_root = self.readiness.current_root()
+        search_button = self.driver.find_element(By.CSS_SELECTOR, "input[type='submit'], button[type='submit']")
+        search_button.click()
+        
+        # Wait for results
+        self.readiness.page_settled(old_root)
+        self.readiness.results_table_present()
+        self.metrics.inc('pages')
+        
+        # Take screenshot after search results load
+        self.take_screenshot(f"04_search_results_{subject_code}.png")
+        if self.resource_blocker:
+            self.resource_blocker.collect_selenium_stats(self.driver)
+        
+        if self.change_tracker:
+            if not self.change_tracker.page_changed(subject_code, self.driver.page_source):
+                self.logger.info(f"Unchanged {subject_code}, skipped")
+                return []
+            courses = self.extract_course_data()
+            self.change_tracker.record_courses(subject_code, courses)
+            return courses
             
-            # Wait for results
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)  # Wait for dynamic loading
+        return self.extract_course_data()
             
-            # Take screenshot after search results load
-            self.take_screenshot(f"04_search_results_{subject_code}.png")
+    def _before_driver_retry(self, attempt, error):
+        """Restart Chrome when its session is gone or WebDriver calls keep failing"""
+        self._driver_failures += 1
+        if isinstance(error, DRIVER_GONE_ERRORS) or self._driver_failures >= self.restart_after:
+            self.restart_driver()
             
-            return self.extract_course_data()
+    def _before_search_retry(self, attempt, error):
+        """Start the next search attempt from a freshly loaded search form"""
+        self._before_driver_retry(attempt, error)
+        if self.catalog_url and not (self.navigate_to_catalog(self.catalog_url) and self.find_course_search_interface()):
+            self.logger.warning("Could not reload the search interface before retrying")
             
+    def restart_driver(self):
+        """Replace the browser with a fresh one; the caller navigates back to where it was"""
+        self.logger.warning(f"Restarting Chrome after {self._driver_failures} consecutive WebDriver failures")
+        try:
+            if self.resource_blocker:
+                self.resource_blocker.collect_selenium_stats(self.driver)
+            self.driver.quit()
         except Exception as e:
-            self.logger.error(f"Error searching courses for {subject_code}: {e}")
-            return []
+            self.logger.debug(f"Error quitting old driver: {e}")
+        self.driver = None
+        self.setup_driver(self.headless)
+        self._driver_failures = 0
+        self.resilience.record_restart()
             
     def extract_course_data(self):
         """Extract course data from search results"""
@@ -436,20 +606,17 @@ class CourseScraperCTCLink:
                 "[id*='course']"
             ]
             
-            for selector in course_selectors:
-                try:
-                    course_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if course_elements:
-                        self.logger.info(f"Found {len(course_elements)} course elements with selector: {selector}")
-                        
-                        for element in course_elements:
-                            course_data = self.parse_course_element(element)
-                            if course_data:
-                                courses.append(course_data)
-                        break
-                        
-                except Exception as e:
-                    continue
+            # Text of every row of the first matching selector in a single round trip
+            with self.metrics.span('extract'):
+                selector, course_elements = snapshot_first(self.driver, course_selectors)
+            if course_elements:
+                self.logger.info(f"Found {len(course_elements)} course elements with selector: {selector}")
+                
+                with self.metrics.span('parse'):
+                    for element in course_elements:
+                        course_data = self.parse_course_element(element)
+                        if course_data:
+                            courses.append(course_data)
                     
         except Exception as e:
             self.logger.error(f"Error extracting course data: {e}")
@@ -457,7 +624,7 @@ class CourseScraperCTCLink:
         return courses
         
     def parse_course_element(self, element):
-        """Parse individual course element for data"""
+        """Parse individual course element (an ElementSnapshot or WebElement) for data"""
         try:
             # Extract text content and look for patterns
             text = element.text.strip()
@@ -476,11 +643,8 @@ class CourseScraperCTCLink:
                 'location': ''
             }
             
-            # Try to extract course code (common pattern: ABC 123)
-            import re
-            code_match = re.search(r'\b[A-Z]{2,4}\s+\d{3}\b', text)
-            if code_match:
-                course_data['course_code'] = code_match.group()
+            # Try to extract course code (ABC 123, ACCT& 201, ADABE 041)
+            course_data['course_code'] = find_course_code(text)
                 
             return course_data
             
@@ -490,6 +654,9 @@ class CourseScraperCTCLink:
             
     def scrape_full_catalog(self, base_url):
         """Main method to scrape the entire catalog"""
+        if self.backend == 'http':
+            return self.scrape_full_catalog_http(base_url)
+            
         try:
             # Navigate to catalog
             if not self.navigate_to_catalog(base_url):
@@ -505,16 +672,36 @@ class CourseScraperCTCLink:
             if not subjects:
                 self.logger.warning("No subjects found, attempting to scrape current page")
                 courses = self.extract_course_data()
-                self.courses_data.extend(courses)
+                self.add_courses(courses)
             else:
-                # Scrape each subject
-                for subject in subjects[:5]:  # Limit to first 5 for testing
-                    self.logger.info(f"Scraping subject: {subject['code']} - {subject['name']}")
-                    courses = self.search_courses_by_subject(subject['code'])
-                    self.courses_data.extend(courses)
-                    time.sleep(2)  # Respectful delay
+                if self.max_subjects:
+                    subjects = subjects[:self.max_subjects]
+                subjects = self.resume_subjects(subjects)
+                    
+                if self.workers > 1:
+                    self.scrape_subjects_with_pool(base_url, subjects)
+                else:
+                    # Scrape each subject
+                    budget = PolitenessBudget(self.request_interval)
+                    for subject in subjects:
+                        budget.wait()  # Respectful delay
+                        self.logger.info(f"Scraping subject: {subject['code']} - {subject['name']}")
+                        courses = self.search_courses_by_subject(subject['code'])
+                        if courses is None:
+                            self.logger.warning(f"Subject {subject['code']} was not scraped")
+                            self.failed_subjects.append(subject['code'])
+                            continue
+                        self.subject_completed(subject['code'], courses)
+                        self.add_courses(courses)
                     
-            self.logger.info(f"Total courses scraped: {len(self.courses_data)}")
+            self.logger.info(f"Total courses scraped: {self.course_count}")
+            self.report_failed_subjects()
+            for name, timing in self.readiness.summary().items():
+                self.logger.info(
+                    f"Wait '{name}': {timing['count']} waits, "
+                    f"avg {timing['total_seconds'] / timing['count']:.2f}s, "
+                    f"max {timing['max_seconds']:.2f}s, {timing['timeouts']} timeouts"
+                )
             
             # Take final screenshot
             self.take_screenshot("05_scraping_complete.png")
@@ -523,10 +710,166 @@ class CourseScraperCTCLink:
             
         except Exception as e:
             self.logger.error(f"Error in full catalog scrape: {e}")
+            self.take_screenshot("error_full_catalog.png", error=True)
             return False
             
+    def scrape_full_catalog_http(self, base_url):
+        """
+        Scrape the catalog over plain HTTP without launching a browser
+        
+        Each subject is checkpointed and handed to add_courses() as soon as it is
+        fetched, so with a sink only the subjects in flight are held in memory.
+        """
+        try:
+            subjects = self.http_client.get_subjects(base_url)
+            if not subjects:
+                self.logger.error("No subjects found in catalog content page")
+                return False
+            if self.max_subjects:
+                subjects = subjects[:self.max_subjects]
+            subjects = self.resume_subjects(subjects)
+                
+            self.logger.info(f"Fetching {len(subjects)} subjects over HTTP with {self.workers} workers")
+            for subject, courses in self.http_client.scrape_subjects(subjects, self.change_tracker):
+                if courses is None:
+                    self.logger.warning(f"Subject {subject['code']} was not scraped")
+                    self.failed_subjects.append(subject['code'])
+                    continue
+                self.subject_completed(subject['code'], courses)
+                self.add_courses(courses)
+                
+            self.logger.info(f"Total courses scraped: {self.course_count}")
+            self.report_failed_subjects()
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error in HTTP catalog scrape: {e}")
+            return False
+            
+    def resume_subjects(self, subjects):
+        """
+        Restore subjects finished by an earlier run from the checkpoint
+        
+        Their courses are passed to add_courses() straight away.
+        
+        Returns:
+            list: The subjects that still have to be scraped
+        """
+        if not self.checkpoint:
+            return subjects
+        done = self.checkpoint.completed()
+        pending = []
+        for subject in subjects:
+            if subject['code'] in done:
+                self.add_courses(done[subject['code']])
+            else:
+                pending.append(subject)
+        if len(pending) < len(subjects):
+            self.logger.info(f"Resuming: {len(subjects) - len(pending)} subjects restored from checkpoint, "
+                             f"{len(pending)} left")
+        return pending
+        
+    def add_courses(self, courses):
+        """Stream finished records to the sink, or keep them in courses_data for save_data()"""
+        self.metrics.inc('rows', len(courses))
+        with self._output_lock:
+            self.course_count += len(courses)
+            if self.sink:
+                self.sink.write_many(courses)
+            else:
+                self.courses_data.extend(courses)
+                
+    def report_failed_subjects(self):
+        """Name the subjects that failed every retry, so a run with holes does not look complete"""
+        if self.failed_subjects:
+            self.logger.error(f"{len(self.failed_subjects)} subjects failed after retries: "
+                              f"{', '.join(self.failed_subjects)}; rerun with --resume to scrape only these")
+                
+    def subject_completed(self, subject_code, courses):
+        """Checkpoint a finished subject so a crash after this point does not lose it"""
+        if self.checkpoint:
+            self.checkpoint.record(subject_code, courses)
+            
+    def scrape_subjects_with_pool(self, base_url, subjects):
+        """
+        Search subjects in parallel using a pool of browser drivers
+        
+        This driver acts as the first worker; the remaining workers each open
+        their own driver and iframe context. All workers pull subject codes from
+        a shared queue, and results are merged in the original subject order.
+        
+        Args:
+            base_url (str): Catalog URL each extra worker navigates to
+            subjects (list): Subject dicts from get_available_subjects()
+        """
+        work_queue = queue.Queue()
+        for index, subject in enumerate(subjects):
+            work_queue.put((index, subject))
+            
+        results = [None] * len(subjects)
+        budget = PolitenessBudget(self.request_interval)
+        
+        def drain_queue(scraper, worker_id):
+            while True:
+                try:
+                    index, subject = work_queue.get_nowait()
+                except queue.Empty:
+                    return
+                budget.wait()
+                self.logger.info(f"[worker {worker_id}] Scraping subject: {subject['code']} - {subject['name']}")
+                courses = scraper.search_courses_by_subject(subject['code'])
+                if courses is not None:
+                    self.subject_completed(subject['code'], courses)
+                    if self.sink:
+                        # Stream each subject as it finishes instead of holding all results until the end
+                        self.add_courses(courses)
+                        courses = []
+                results[index] = courses
+                
+        def run_extra_worker(worker_id):
+            scraper = None
+            try:
+                scraper = CourseScraperCTCLink(headless=self.headless, wait_timeout=self.wait_timeout,
+                                               institution_code=self.institution_code,
+                                               change_tracker=self.change_tracker,
+                                               resource_blocker=self.resource_blocker,
+                                               capture=self.capture,
+                                               resilience=self.resilience,
+                                               restart_after=self.restart_after,
+                                               metrics=self.metrics)
+                if not scraper.navigate_to_catalog(base_url) or not scraper.find_course_search_interface():
+                    self.logger.error(f"[worker {worker_id}] Could not reach search interface, leaving subjects to other workers")
+                    return
+                drain_queue(scraper, worker_id)
+            except Exception as e:
+                self.logger.error(f"[worker {worker_id}] Worker failed: {e}")
+            finally:
+                if scraper:
+                    scraper.close()
+                    
+        self.logger.info(f"Scraping {len(subjects)} subjects with {self.workers} workers")
+        threads = [
+            threading.Thread(target=run_extra_worker, args=(worker_id,), daemon=True)
+            for worker_id in range(1, self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+            
+        # This driver is already inside the iframe, so it starts working immediately
+        drain_queue(self, 0)
+        for thread in threads:
+            thread.join()
+            
+        for subject, courses in zip(subjects, results):
+            if courses is None:
+                self.logger.warning(f"Subject {subject['code']} was not scraped")
+                self.failed_subjects.append(subject['code'])
+                continue
+            self.add_courses(courses)
+            
     def save_data(self, format='json'):
         """Save scraped data to file"""
+        start = time.perf_counter()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if format == 'json':
@@ -543,46 +886,229 @@ class CourseScraperCTCLink:
                     writer.writeheader()
                     writer.writerows(self.courses_data)
                     
+        self.metrics.observe('save', time.perf_counter() - start)
         self.logger.info(f"Data saved to: {filename}")
         return filename
         
-    def take_screenshot(self, filename=None):
-        """Take a screenshot for debugging purposes"""
+    def take_screenshot(self, filename=None, error=False):
+        """
+        Take a screenshot for debugging purposes, if the capture policy wants one
+        
+        Only the browser round trip happens here; decoding and writing the PNG
+        is done by the capture writer thread.
+        """
+        if not self.driver or not self.capture.wants(error):
+            return None
         try:
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"scraper_screenshot_{timestamp}.png"
                 
-            self.driver.save_screenshot(filename)
-            self.logger.info(f"Screenshot saved: {filename}")
-            return filename
+            return self.capture.submit(filename, self.driver.get_screenshot_as_base64(), encoding='base64')
             
         except Exception as e:
             self.logger.error(f"Failed to take screenshot: {e}")
             return None
             
+    def save_page_source(self, filename=None, error=False):
+        """Save current page source for debugging, if the capture policy wants it"""
+        if not self.driver or not self.capture.wants(error):
+            return None
+        try:
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"page_source_{timestamp}.html"
+                
+            return self.capture.submit(filename, self.driver.page_source)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to save page source: {e}")
+            return None
+            
     def close(self):
         """Clean up resources"""
-        if hasattr(self, 'driver'):
+        if getattr(self, 'driver', None):
+            if self.resource_blocker:
+                self.resource_blocker.collect_selenium_stats(self.driver)
             self.driver.quit()
             self.logger.info("Driver closed")
+        if getattr(self, 'http_client', None):
+            self.http_client.close()
+        if getattr(self, '_owns_capture', False):
+            self.capture.close()
 
 # Example usage
 if __name__ == "__main__":
-    scraper = CourseScraperCTCLink(headless=False)  # Set to True for production
+    import argparse
+    from scrape_checkpoint import ScrapeCheckpoint, DEFAULT_CHECKPOINT_PATH
+    from output_sinks import open_sinks, SINK_FORMATS
+    
+    parser = argparse.ArgumentParser(description="Scrape the CTCLink course catalog with Selenium")
+    parser.add_argument('--headless', action='store_true', help="Run Chrome without a window (recommended for production)")
+    parser.add_argument('--workers', type=int, default=1, help="Number of parallel browser drivers")
+    parser.add_argument('--request-interval', type=float, default=2.0, help="Minimum seconds between subject searches across all drivers")
+    parser.add_argument('--max-subjects', type=int, default=5, help="Limit subjects scraped (0 for all)")
+    parser.add_argument('--backend', choices=['selenium', 'http'], default='selenium', help="Drive Chrome or fetch the IScript pages directly")
+    parser.add_argument('--http-base-url', help="Host for the http backend, e.g. a replay_server.py address")
+    parser.add_argument('--institution', default='WA030', help="CTCLink institution code (WA030 = Olympic College)")
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync', help="Use the asyncio engine (workers = concurrency)")
+    parser.add_argument('--rate-per-host', type=float, default=2.0, help="Async engine: average requests per second per host")
+    parser.add_argument('--incremental', action='store_true', help="Skip subjects whose page hash is unchanged and store only course deltas")
+    parser.add_argument('--db', default="course_catalog.db", help="Database holding page hashes for --incremental")
+    parser.add_argument('--cache', action='store_true', help="http backend/async engine: reuse responses from the on-disk cache")
+    parser.add_argument('--cache-ttl', type=float, default=3600, help="Seconds a cached page is used without revalidation")
+    parser.add_argument('--block-resources', nargs='*', metavar='TYPE',
+                        help="Browser runs: skip image/font/stylesheet/media/tracker requests "
+                             "(no TYPE = all but stylesheet)")
+    parser.add_argument('--capture', choices=CAPTURE_MODES, default='on-error',
+                        help="Which debug screenshots/page sources to keep")
+    parser.add_argument('--capture-every', type=int, default=10, help="--capture sampled: keep 1 in N captures")
+    parser.add_argument('--capture-dir', default='.', help="Directory for debug captures")
+    parser.add_argument('--resume', action='store_true', help="Skip subjects finished by the last interrupted run")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH, help="File recording finished subjects")
+    parser.add_argument('--stream', nargs='+', choices=SINK_FORMATS, metavar='FORMAT',
+                        help="Write records as they are scraped (jsonl, csv, sqlite into --db) instead of JSON/CSV at the end")
+    parser.add_argument('--retries', type=int, default=4, help="Attempts per page load/search before a subject is given up")
+    parser.add_argument('--circuit-reset', type=float, default=30.0,
+                        help="Seconds all workers pause after repeated failures from the catalog host")
+    parser.add_argument('--metrics', metavar='DIR',
+                        help="Write stage timings and counters as course_catalog_scraper.prom and a JSON run summary")
+    parser.add_argument('--profile', nargs='?', const='.', metavar='DIR',
+                        help="Profile the run with cProfile and write a hotspot report, collapsed stacks "
+                             "(for flame graphs) and .pstats into DIR (default: current directory)")
+    parser.add_argument('--profile-memory', action='store_true', help="With --profile, also trace allocations with tracemalloc")
+    args = parser.parse_args()
+    
+    profiler = None
+    if args.profile:
+        from profiling import RunProfiler
+        
+        profiler = RunProfiler('course_catalog_scraper', args.profile, memory=args.profile_memory).start()
+    
+    # Every run checkpoints finished subjects; --resume picks up where the last one stopped
+    checkpoint = ScrapeCheckpoint(args.checkpoint, scope=args.institution, resume=args.resume)
+    
+    capture = PageCapture(args.capture, args.capture_every, args.capture_dir)
+    resilience = Resilience(RetryPolicy(max_attempts=args.retries), reset_timeout=args.circuit_reset)
+    metrics = ScrapeMetrics('course_catalog_scraper', args.institution)
+    
+    resource_blocker = None
+    if args.block_resources is not None:
+        from resource_blocking import ResourceBlocker, DEFAULT_BLOCKED_TYPES
+        
+        resource_blocker = ResourceBlocker(args.block_resources or DEFAULT_BLOCKED_TYPES)
+    
+    cache = None
+    if args.cache:
+        from response_cache import ResponseCache
+        
+        cache = ResponseCache(ttl=args.cache_ttl)
+    
+    change_tracker = None
+    if args.incremental:
+        from incremental_scrape import SubjectChangeTracker
+        
+        change_tracker = SubjectChangeTracker(args.db, args.institution, scraper='course_catalog_scraper').start()
+    
+    sink = None
+    if args.stream:
+        sink = open_sinks(
+            args.stream,
+            f"course_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            db_path=args.db,
+            institution_code=args.institution,
+            scraper='course_catalog_scraper'
+        )
+    
+    if args.engine == 'async':
+        from async_course_scraper import AsyncCourseScraper
+        from ctclink_http_client import DEFAULT_BASE_URL
+        
+        scraper = AsyncCourseScraper(
+            engine='http' if args.backend == 'http' else 'browser',
+            concurrency=args.workers,
+            rate_per_host=args.rate_per_host,
+            headless=args.headless,
+            max_subjects=args.max_subjects or None,
+            base_url=args.http_base_url or DEFAULT_BASE_URL,
+            change_tracker=change_tracker,
+            cache=cache,
+            resource_blocker=resource_blocker,
+            checkpoint=checkpoint,
+            sink=sink,
+            resilience=resilience,
+            metrics=metrics
+        )
+    else:
+        scraper = CourseScraperCTCLink(
+            headless=args.headless,
+            workers=args.workers,
+            request_interval=args.request_interval,
+            max_subjects=args.max_subjects or None,
+            backend=args.backend,
+            http_base_url=args.http_base_url,
+            institution_code=args.institution,
+            change_tracker=change_tracker,
+            cache=cache,
+            resource_blocker=resource_blocker,
+            capture=capture,
+            checkpoint=checkpoint,
+            sink=sink,
+            resilience=resilience,
+            metrics=metrics
+        )
     
     # Direct URL to Olympic College course catalog
-    catalog_url = "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main?institution=WA030&PortalActualURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentProvider=SA&PortalCRefLabel=Course%20Catalog&PortalRegistryName=EMPLOYEE&PortalServletURI=https%3a%2f%2fcsprd.ctclink.us%2fpsp%2fcsprd%2f&PortalURI=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2f&PortalHostNode=SA&NoCrumbs=yes"
+    catalog_url = f"https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main?institution={args.institution}&PortalActualURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentProvider=SA&PortalCRefLabel=Course%20Catalog&PortalRegistryName=EMPLOYEE&PortalServletURI=https%3a%2f%2fcsprd.ctclink.us%2fpsp%2fcsprd%2f&PortalURI=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2f&PortalHostNode=SA&NoCrumbs=yes"
     
+    success = False
     try:
         success = scraper.scrape_full_catalog(catalog_url)
-        if success:
-            scraper.save_data('json')
-            scraper.save_data('csv')
+        if change_tracker:
+            changes = change_tracker.finish('complete' if success else 'failed')
+            print(f"Incremental run {changes['run_id']}: {changes['subjects_unchanged']} unchanged subjects, "
+                  f"{changes['added']} added / {changes['removed']} removed / {changes['changed']} changed courses")
+        if success and scraper.course_count:
+            # In incremental mode only the changed subjects are output
+            if sink:
+                print(f"Streamed {scraper.course_count} records")
+            else:
+                scraper.save_data('json')
+                scraper.save_data('csv')
+        elif success:
+            print("No changed subjects, nothing written.")
         else:
-            print("Scraping failed. Check logs for details.")
+            print("Scraping failed. Check logs for details; --resume skips the subjects already finished.")
             
     except KeyboardInterrupt:
-        print("Scraping interrupted by user")
+        print("Scraping interrupted by user; run again with --resume to continue")
     finally:
-        scraper.close()
\ No newline at end of file
+        scraper.close()
+        if sink:
+            sink.close('complete' if success else 'failed')
+        capture.close()
+        checkpoint.close()
+        for line in resilience.summary_lines():
+            print(f"Retries: {line}")
+        if scraper.failed_subjects:
+            print(f"Not scraped after {args.retries} attempts: {', '.join(scraper.failed_subjects)}")
+        if cache:
+            stats = cache.summary()
+            print(f"Response cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} fetched")
+            cache.close()
+        if resource_blocker:
+            stats = resource_blocker.summary()
+            print(f"Resource blocking: {stats['blocked_total']} requests blocked, "
+                  f"~{stats['estimated_bytes_saved'] / 1024:.0f} KB saved (estimated), "
+                  f"{stats['bytes_transferred'] / 1024:.0f} KB transferred")
+            metrics.inc('bytes', stats['bytes_transferred'])
+        for line in metrics.summary_lines():
+            print(f"Timing: {line}")
+        if args.metrics:
+            prom_path, json_path = metrics.write(args.metrics)
+            print(f"Metrics written to {prom_path} and {json_path}")
+        if profiler:
+            paths = profiler.finish()
+            for line in profiler.summary_lines():
+                print(f"Profile: {line}")
+            print(f"Profile written to {paths['report']}, {paths['collapsed']} and {paths['pstats']}")
\ No newline at end of file
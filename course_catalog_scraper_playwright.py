@@ -3,18 +3,74 @@ Alternative scraper using Playwright
 Playwright can be more reliable for some dynamic sites
 """
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 import json
-import csv
 from datetime import datetime
 import logging
 import time
+from page_capture import PageCapture, CAPTURE_MODES
+from dom_snapshot import snapshot_locator
+from output_sinks import CsvSink
+from resilience import Resilience, RetryPolicy
+from metrics import ScrapeMetrics
+
+# CSV columns for the two record shapes this scraper produces (table rows and whole-page dumps)
+RECORD_FIELDS = ['raw_text', 'selector_used', 'page_content', 'page_title', 'url', 'extracted_at']
+
+# Longest wait (ms) for the catalog iframe or a subject's result rows to appear
+RESULT_TIMEOUT_MS = 10000
+# Rows of a subject search's results
+RESULT_ROW_SELECTOR = "tr:has-text('course'), [class*='course']"
+
+class _ContextSlot:
+    """One isolated browser context with its page and a count of pages it has served"""
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.pages_served = 0
 
 class CourseScraperPlaywright:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, cache=None, pages_per_context=50, resource_blocker=None,
+                 capture=None, sink=None, resilience=None, metrics=None):
+        """
+        Long-lived Playwright scraper
+
+        The browser is launched on first use and kept warm until close().
+        scrape_catalog calls reuse one warm context (cookies, cache and page
+        isolated from other scrapers); it is replaced after an error or after
+        it has served pages_per_context pages so renderer memory does not grow
+        without bound. Like all sync Playwright objects, a scraper must be used
+        from the thread that created it, so calls never overlap and one context
+        is all it needs.
+
+        Args:
+            headless (bool): Run Chromium without a window
+            cache (ResponseCache): Optional on-disk cache that GET requests are served from
+            pages_per_context (int): Pages a context serves before it is recycled
+            resource_blocker (ResourceBlocker): Subresource types (images, fonts, trackers...) to abort
+            capture (PageCapture): Screenshot policy; defaults to on-error captures
+            sink: Optional output_sinks sink that records are streamed to instead of courses_data
+            resilience (Resilience): Retry policy and per-host circuit breaker for page loads
+            metrics (ScrapeMetrics): Stage timings and page/row counters
+        """
         self.headless = headless
+        self.cache = cache
+        self.resource_blocker = resource_blocker
+        self._owns_capture = capture is None
+        self.capture = capture or PageCapture()
+        self.pages_per_context = max(1, pages_per_context)
         self.setup_logging()
+        self.sink = sink
+        self.resilience = resilience or Resilience()
+        self.metrics = metrics or ScrapeMetrics('course_catalog_scraper_playwright')
+        self.metrics.track_resilience(self.resilience)
         self.courses_data = []
+        self.course_count = 0
+
+        self._playwright = None
+        self._browser = None
+        self._idle = None
+        self.contexts_created = 0
         
     def setup_logging(self):
         logging.basicConfig(
@@ -23,53 +79,144 @@ class CourseScraperPlaywright:
         )
         self.logger = logging.getLogger(__name__)
         
+    def _ensure_browser(self):
+        """Start Playwright and launch Chromium once"""
+        if self._browser is None:
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+            self.logger.info("Chromium launched")
+        return self._browser
+        
+    def _new_slot(self):
+        context = self._ensure_browser().new_context()
+        if self.cache:
+            context.route("**/*", self.cache.playwright_route_handler())
+        if self.resource_blocker:
+            # Installed last so it runs first and blocked requests never reach the cache
+            self.resource_blocker.install_playwright(context)
+        self.contexts_created += 1
+        return _ContextSlot(context, context.new_page())
+        
+    def _acquire(self):
+        """Take the warm context, creating one if there is none"""
+        slot, self._idle = self._idle, None
+        return slot or self._new_slot()
+        
+    def _release(self, slot, healthy=True):
+        """Keep a context warm for the next call, or close it if it is worn out or broken"""
+        slot.pages_served += 1
+        if healthy and slot.pages_served < self.pages_per_context:
+            try:
+                # Drop the previous page's DOM and frames before the next call
+                slot.page.goto("about:blank")
+                self._idle = slot
+                return
+            except Exception as e:
+                self.logger.warning(f"Could not reset page, recycling its context: {e}")
+        self.logger.info(f"Recycling browser context after {slot.pages_served} pages")
+        try:
+            slot.context.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser context: {e}")
+        
     def scrape_catalog(self, url):
-        """Main scraping method using Playwright"""
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(headless=self.headless)
-            page = browser.new_page()
+        """
+        Main scraping method using Playwright
+
+        Returns:
+            bool: True if this call found any courses
+        """
+        start_count = self.course_count
+        slot = self._acquire()
+        page = slot.page
+        healthy = True
+        
+        try:
+            self.logger.info(f"Navigating to: {url}")
+            with self.metrics.span('navigate'):
+                self.resilience.call('navigate', page.goto, url, url=url, wait_until="networkidle")
+            self.metrics.inc('pages')
             
+            # Try to find and enter main iframe if present
             try:
-                self.logger.info(f"Navigating to: {url}")
-                page.goto(url, wait_until="networkidle")
-                
-                # Wait for page to fully load
-                page.wait_for_timeout(3000)
-                
-                # Try to find and enter main iframe if present
-                try:
-                    iframe = page.frame_locator("iframe[name='main_iframe']")
-                    if iframe:
-                        self.logger.info("Found main iframe, working within it")
-                        self._scrape_within_frame(iframe)
-                except:
-                    self.logger.info("No iframe found or accessible, scraping main page")
-                    self._scrape_main_page(page)
-                    
-                # Take a screenshot for debugging
-                page.screenshot(path="course_catalog_screenshot.png")
-                self.logger.info("Screenshot saved as course_catalog_screenshot.png")
+                iframe = page.frame_locator("iframe[name='main_iframe']")
+                with self.metrics.span('iframe'):
+                    # Raises if the iframe never appears
+                    iframe.locator("body").wait_for(state="attached", timeout=RESULT_TIMEOUT_MS)
+                self.logger.info("Found main iframe, working within it")
+                self._scrape_within_frame(iframe)
+            except PlaywrightTimeoutError:
+                self.logger.info("No iframe found or accessible, scraping main page")
+                self._scrape_main_page(page)
                 
+            self.take_screenshot(page, "course_catalog_screenshot.png")
+            
+        except Exception as e:
+            self.logger.error(f"Error during scraping: {e}")
+            self.take_screenshot(page, "course_catalog_error.png", error=True)
+            healthy = False
+        finally:
+            self._release(slot, healthy)
+            
+        return self.course_count > start_count
+        
+    def add_record(self, record):
+        """Stream a record to the sink, or keep it in courses_data for save_data()"""
+        self.course_count += 1
+        self.metrics.inc('rows')
+        if self.sink:
+            self.sink.write(record)
+        else:
+            self.courses_data.append(record)
+            
+    def take_screenshot(self, page, filename, error=False):
+        """Screenshot the page if the capture policy wants it; the file is written in the background"""
+        if not self.capture.wants(error):
+            return None
+        try:
+            return self.capture.submit(filename, page.screenshot())
+        except Exception as e:
+            self.logger.error(f"Failed to take screenshot: {e}")
+            return None
+            
+    def close(self):
+        """Close the warm context, the browser and Playwright"""
+        if self._idle:
+            slot, self._idle = self._idle, None
+            try:
+                slot.context.close()
             except Exception as e:
-                self.logger.error(f"Error during scraping: {e}")
-            finally:
-                browser.close()
-                
-        return len(self.courses_data) > 0
+                self.logger.warning(f"Error closing browser context: {e}")
+        if self._browser:
+            self._browser.close()
+            self._browser = None
+        if self._playwright:
+            self._playwright.stop()
+            self._playwright = None
+        if self._owns_capture:
+            self.capture.close()
+            
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         
     def _scrape_within_frame(self, iframe):
         """Scrape content within iframe"""
         try:
             # Look for course search elements
             subjects = iframe.locator("select[name*='subject'], select[id*='subject']")
-            if subjects.count() > 0:
+            with self.metrics.span('iframe'):
+                # First round trip into the frame's document
+                subject_count = subjects.count()
+            if subject_count > 0:
                 self.logger.info("Found subject dropdown in iframe")
-                # Get all options
-                options = subjects.locator("option").all()
+                # Get all options in one evaluate call
+                options = snapshot_locator(subjects.locator("option"), ['value'])
                 for option in options[:5]:  # Limit for testing
-                    value = option.get_attribute("value")
-                    text = option.text_content()
+                    value = option.attrs['value']
+                    text = option.text
                     if value and value.strip():
                         self.logger.info(f"Processing subject: {text}")
                         self._search_subject_in_frame(iframe, value)
@@ -83,15 +230,29 @@ class CourseScraperPlaywright:
     def _search_subject_in_frame(self, iframe, subject_code):
         """Search for courses in a specific subject within iframe"""
         try:
-            # Select subject
-            iframe.locator("select[name*='subject']").select_option(subject_code)
-            
-            # Click search button
-            search_btn = iframe.locator("input[type='submit'], button[type='submit']").first
-            search_btn.click()
-            
-            # Wait for results
-            iframe.page.wait_for_timeout(3000)
+            with self.metrics.span('search'):
+                # Select subject
+                iframe.locator("select[name*='subject']").select_option(subject_code)
+                
+                # The warm context still shows the previous subject's results; hold on to one
+                # of its rows so the wait below cannot be satisfied by them
+                rows = iframe.locator(RESULT_ROW_SELECTOR)
+                old_row = rows.first.element_handle() if rows.count() else None
+                
+                # Click search button
+                search_btn = iframe.locator("input[type='submit'], button[type='submit']").first
+                search_btn.click()
+                
+                if old_row and not self._wait_for_detach(old_row):
+                    self.logger.warning(f"Previous results still shown after searching {subject_code}, skipping it")
+                    return
+                
+                # Wait for the first result row rather than a fixed pause
+                try:
+                    rows.first.wait_for(timeout=RESULT_TIMEOUT_MS)
+                except PlaywrightTimeoutError:
+                    self.logger.warning(f"No course rows appeared for subject {subject_code}")
+            self.metrics.inc('pages')
             
             # Extract course data
             self._extract_course_data_from_frame(iframe)
@@ -99,6 +260,30 @@ class CourseScraperPlaywright:
         except Exception as e:
             self.logger.error(f"Error searching subject {subject_code}: {e}")
             
+    def _wait_for_detach(self, element):
+        """
+        Wait for an element captured before an action to leave the document,
+        like page_readiness.page_settled(old_root) on the Selenium path
+        
+        Returns:
+            bool: False if it was still attached after RESULT_TIMEOUT_MS
+        """
+        try:
+            frame = element.owner_frame()
+            if frame:
+                frame.wait_for_function("el => !el.isConnected", arg=element, timeout=RESULT_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            return False
+        except PlaywrightError:
+            # The frame navigated, so the element's whole document is gone
+            pass
+        finally:
+            try:
+                element.dispose()
+            except PlaywrightError:
+                pass
+        return True
+        
     def _extract_course_data_from_frame(self, iframe):
         """Extract course data from iframe content"""
         try:
@@ -112,23 +297,21 @@ class CourseScraperPlaywright:
             ]
             
             for selector in selectors:
-                elements = iframe.locator(selector)
-                count = elements.count()
-                if count > 0:
-                    self.logger.info(f"Found {count} elements with selector: {selector}")
-                    for i in range(min(count, 20)):  # Limit to prevent timeout
-                        try:
-                            element = elements.nth(i)
-                            text = element.text_content()
+                # Every element's text in one evaluate call instead of one per element
+                with self.metrics.span('extract'):
+                    elements = snapshot_locator(iframe.locator(selector))
+                if elements:
+                    self.logger.info(f"Found {len(elements)} elements with selector: {selector}")
+                    with self.metrics.span('parse'):
+                        for element in elements[:20]:  # Limit for testing
+                            text = element.text
                             if text and len(text.strip()) > 10:
                                 course_data = {
                                     'raw_text': text.strip(),
                                     'extracted_at': datetime.now().isoformat(),
                                     'selector_used': selector
                                 }
-                                self.courses_data.append(course_data)
-                        except:
-                            continue
+                                self.add_record(course_data)
                     break
                     
         except Exception as e:
@@ -141,10 +324,10 @@ class CourseScraperPlaywright:
             content = page.content()
             
             # Look for links to course sections
-            links = page.locator("a").all()
+            links = snapshot_locator(page.locator("a"), ['href'])
             for link in links:
-                href = link.get_attribute("href")
-                text = link.text_content()
+                href = link.attrs['href']
+                text = link.text
                 if text and ("course" in text.lower() or "class" in text.lower()):
                     self.logger.info(f"Found relevant link: {text} -> {href}")
                     
@@ -152,7 +335,7 @@ class CourseScraperPlaywright:
             try:
                 browse_link = page.locator("text=Browse Classes").first
                 browse_link.click()
-                page.wait_for_timeout(3000)
+                page.wait_for_load_state("networkidle")
                 self._extract_any_visible_data(page)
             except:
                 self.logger.info("Could not find or click Browse Classes link")
@@ -173,13 +356,14 @@ class CourseScraperPlaywright:
                 'page_title': page.title(),
                 'url': page.url
             }
-            self.courses_data.append(raw_data)
+            self.add_record(raw_data)
             
         except Exception as e:
             self.logger.error(f"Error extracting visible data: {e}")
             
     def save_data(self, format='json'):
         """Save scraped data"""
+        start = time.perf_counter()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         if format == 'json':
@@ -188,41 +372,127 @@ class CourseScraperPlaywright:
                 json.dump(self.courses_data, f, indent=2, ensure_ascii=False)
         elif format == 'csv':
             filename = f"course_catalog_playwright_{timestamp}.csv"
-            # Handle mixed data types for CSV
             if self.courses_data:
-                # Flatten the data structure for CSV
-                flattened_data = []
-                for item in self.courses_data:
-                    if isinstance(item, dict):
-                        flattened_data.append(item)
-                
-                if flattened_data:
-                    fieldnames = set()
-                    for item in flattened_data:
-                        fieldnames.update(item.keys())
-                    
-                    with open(filename, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.DictWriter(f, fieldnames=list(fieldnames))
-                        writer.writeheader()
-                        writer.writerows(flattened_data)
+                # Both record shapes share one header; missing columns are left empty
+                with CsvSink(filename, RECORD_FIELDS) as sink:
+                    sink.write_many(self.courses_data)
                         
+        self.metrics.observe('save', time.perf_counter() - start)
         self.logger.info(f"Data saved to: {filename}")
         return filename
 
 # Example usage
 if __name__ == "__main__":
-    scraper = CourseScraperPlaywright(headless=False)
+    import argparse
+    from output_sinks import open_sinks, SINK_FORMATS
+    
+    parser = argparse.ArgumentParser(description="Scrape the CTCLink course catalog with Playwright")
+    parser.add_argument('--headless', action='store_true', help="Run Chromium without a window")
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync', help="Use the asyncio engine with concurrent pages")
+    parser.add_argument('--concurrency', type=int, default=4, help="Async engine: pages in flight at once")
+    parser.add_argument('--rate-per-host', type=float, default=2.0, help="Async engine: average requests per second per host")
+    parser.add_argument('--cache', action='store_true', help="Serve GET requests from the on-disk response cache")
+    parser.add_argument('--cache-ttl', type=float, default=3600, help="Seconds a cached response is used without revalidation")
+    parser.add_argument('--block-resources', nargs='*', metavar='TYPE',
+                        help="Skip image/font/stylesheet/media/tracker requests (no TYPE = all but stylesheet)")
+    parser.add_argument('--capture', choices=CAPTURE_MODES, default='on-error', help="Which debug screenshots to keep")
+    parser.add_argument('--capture-every', type=int, default=10, help="--capture sampled: keep 1 in N screenshots")
+    parser.add_argument('--stream', nargs='+', choices=SINK_FORMATS, metavar='FORMAT',
+                        help="Write records as they are scraped (jsonl, csv, sqlite) instead of JSON/CSV at the end")
+    parser.add_argument('--retries', type=int, default=4, help="Attempts per page load before giving up")
+    parser.add_argument('--metrics', metavar='DIR',
+                        help="Write stage timings and counters as a Prometheus textfile and a JSON run summary")
+    parser.add_argument('--profile', nargs='?', const='.', metavar='DIR',
+                        help="Profile the run with cProfile and write a hotspot report, collapsed stacks "
+                             "(for flame graphs) and .pstats into DIR (default: current directory)")
+    parser.add_argument('--profile-memory', action='store_true', help="With --profile, also trace allocations with tracemalloc")
+    args = parser.parse_args()
+    
+    profiler = None
+    if args.profile:
+        from profiling import RunProfiler
+        
+        profiler = RunProfiler('course_catalog_scraper_playwright', args.profile, memory=args.profile_memory).start()
+    
+    capture = PageCapture(args.capture, args.capture_every)
+    resilience = Resilience(RetryPolicy(max_attempts=args.retries))
+    metrics = ScrapeMetrics('course_catalog_scraper_playwright')
+    
+    sink = None
+    if args.stream:
+        sink = open_sinks(args.stream, f"course_catalog_playwright_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                          scraper='course_catalog_scraper_playwright', fieldnames=RECORD_FIELDS)
+    
+    resource_blocker = None
+    if args.block_resources is not None:
+        from resource_blocking import ResourceBlocker, DEFAULT_BLOCKED_TYPES
+        
+        resource_blocker = ResourceBlocker(args.block_resources or DEFAULT_BLOCKED_TYPES)
+    
+    cache = None
+    if args.cache:
+        from response_cache import ResponseCache
+        
+        cache = ResponseCache(ttl=args.cache_ttl)
+    
+    if args.engine == 'async':
+        from async_course_scraper import AsyncCourseScraper
+        
+        scraper = AsyncCourseScraper(
+            engine='browser',
+            concurrency=args.concurrency,
+            rate_per_host=args.rate_per_host,
+            headless=args.headless,
+            cache=cache,
+            resource_blocker=resource_blocker,
+            sink=sink,
+            resilience=resilience,
+            metrics=metrics
+        )
+    else:
+        scraper = CourseScraperPlaywright(headless=args.headless, cache=cache, resource_blocker=resource_blocker,
+                                          capture=capture, sink=sink, resilience=resilience,
+                                          metrics=metrics)
     
     catalog_url = "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main"
     
+    success = False
     try:
         success = scraper.scrape_catalog(catalog_url)
         if success:
-            scraper.save_data('json')
-            scraper.save_data('csv')
-            print(f"Successfully scraped {len(scraper.courses_data)} items")
+            if not sink:
+                scraper.save_data('json')
+                scraper.save_data('csv')
+            print(f"Successfully scraped {scraper.course_count} items")
         else:
             print("No data was scraped")
             
     except Exception as e:
-        print(f"Scraping failed: {e}")
\ No newline at end of file
+        print(f"Scraping failed: {e}")
+    finally:
+        scraper.close()
+        if sink:
+            sink.close('complete' if success else 'failed')
+        capture.close()
+        for line in resilience.summary_lines():
+            print(f"Retries: {line}")
+        if cache:
+            stats = cache.summary()
+            print(f"Response cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} fetched")
+            cache.close()
+        if resource_blocker:
+            stats = resource_blocker.summary()
+            print(f"Resource blocking: {stats['blocked_total']} requests blocked, "
+                  f"~{stats['estimated_bytes_saved'] / 1024:.0f} KB saved (estimated), "
+                  f"{stats['bytes_transferred'] / 1024:.0f} KB transferred")
+            metrics.inc('bytes', stats['bytes_transferred'])
+        for line in metrics.summary_lines():
+            print(f"Timing: {line}")
+        if args.metrics:
+            prom_path, json_path = metrics.write(args.metrics)
+            print(f"Metrics written to {prom_path} and {json_path}")
+        if profiler:
+            paths = profiler.finish()
+            for line in profiler.summary_lines():
+                print(f"Profile: {line}")
+            print(f"Profile written to {paths['report']}, {paths['collapsed']} and {paths['pstats']}")
\ No newline at end of file
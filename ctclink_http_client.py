@@ -0,0 +1,361 @@
+"""
+Direct HTTP Client for the CTCLink Course Catalog
+Fetches the catalog IScript pages with a pooled requests.Session instead of a browser
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qs, urlencode
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from catalog_parser import SUBJECT_LINE_PATTERN, iter_courses
+from metrics import ScrapeMetrics
+from resilience import Resilience
+
+DEFAULT_BASE_URL = "https://csprd.ctclink.us"
+CATALOG_SCRIPT_PATH = "/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main"
+
+BLOCK_TAGS = {'p', 'div', 'tr', 'td', 'th', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'option'}
+
+class CatalogPageParser(HTMLParser):
+    """Collect visible text lines, anchors and iframes from a catalog page"""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines = []
+        self.links = []
+        self.iframes = []
+        self._text = []
+        self._link = None
+        self._skip_depth = 0
+
+    def _flush_text(self):
+        text = ' '.join(''.join(self._text).split())
+        if text:
+            self.lines.append(text)
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ('script', 'style'):
+            self._skip_depth += 1
+        elif tag == 'iframe':
+            self.iframes.append(attrs)
+        elif tag == 'a':
+            self._flush_text()
+            self._link = {'href': attrs.get('href') or '', 'title': attrs.get('title') or '', 'text': []}
+        elif tag in BLOCK_TAGS:
+            self._flush_text()
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == 'a' and self._link is not None:
+            self._link['text'] = ' '.join(''.join(self._link['text']).split())
+            self._link['preceding_line'] = self.lines[-1] if self.lines else ''
+            self.links.append(self._link)
+            self._link = None
+            self._flush_text()
+        elif tag in BLOCK_TAGS:
+            self._flush_text()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._text.append(data)
+        if self._link is not None:
+            self._link['text'].append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+def is_transient_http_error(error):
+    """Connection failures, timeouts, 429 and 5xx are worth retrying; other HTTP errors are not"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def parse_catalog_page(html):
+    """Parse catalog HTML into a CatalogPageParser holding lines, links and iframes"""
+    parser = CatalogPageParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+def _with_institution(content_url, portal_url, institution):
+    """Carry the portal's institution parameter over to the iframe URL"""
+    parts = urlsplit(content_url)
+    query = parse_qs(parts.query)
+    if 'institution' not in query:
+        portal_query = parse_qs(urlsplit(portal_url).query)
+        query['institution'] = portal_query.get('institution', [institution])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query, doseq=True), ''))
+
+def find_content_url(portal_html, portal_url, institution="WA030"):
+    """Return the main_iframe (or first iframe) src of a portal page, or None"""
+    page = parse_catalog_page(portal_html)
+    frames = [f for f in page.iframes if f.get('src')]
+    frames.sort(key=lambda f: f.get('name', f.get('id', '')) != 'main_iframe')
+    if not frames:
+        return None
+    return _with_institution(urljoin(portal_url, frames[0]['src']), portal_url, institution)
+
+def guess_content_url(portal_url, institution="WA030"):
+    """Derive the content (psc) URL from a portal (psp) URL"""
+    parts = urlsplit(portal_url)
+    query = parse_qs(parts.query)
+    institution = query.get('institution', [institution])[0]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.replace('/psp/', '/psc/', 1),
+                       urlencode({'institution': institution}), ''))
+
+def parse_subjects(html, content_url):
+    """
+    Parse the catalog content page into subjects
+
+    Returns:
+        list: dicts with 'code', 'name' and 'url' (the View Courses IScript URL)
+    """
+    page = parse_catalog_page(html)
+
+    names = {}
+    for line in page.lines:
+        match = SUBJECT_LINE_PATTERN.match(line)
+        if match:
+            names.setdefault(match.group(1), match.group(2))
+
+    subjects = []
+    seen = set()
+    for link in page.links:
+        if link['text'].strip().lower() != 'view courses':
+            continue
+        url = urljoin(content_url, link['href'])
+        query = {k.lower(): v for k, v in parse_qs(urlsplit(url).query).items()}
+        code = query.get('subject', [''])[0]
+        if not code:
+            match = SUBJECT_LINE_PATTERN.match(link['preceding_line'])
+            code = match.group(1) if match else ''
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        subjects.append({'code': code, 'name': names.get(code, code), 'url': url})
+    return subjects
+
+def parse_courses(html, subject_code, source_url):
+    """Turn a subject's course listing HTML into course records"""
+    page = parse_catalog_page(html)
+    extracted_at = datetime.now().isoformat()
+
+    courses = []
+    for course in iter_courses('\n'.join(page.lines), subject_code):
+        course_code = f"{course.prefix_code} {course.course_number}"
+        courses.append({
+            'raw_text': f"{course_code} - {course.title}",
+            'extracted_at': extracted_at,
+            'course_code': course_code,
+            'course_title': course.title,
+            'credits': course.credits,
+            'instructor': '',
+            'schedule': '',
+            'location': '',
+            'subject_code': subject_code,
+            'source_url': source_url
+        })
+    return courses
+
+class CTCLinkCatalogClient:
+    def __init__(self, base_url=DEFAULT_BASE_URL, institution="WA030", timeout=30,
+                 pool_size=10, workers=4, record_dir=None, cache=None, resilience=None,
+                 metrics=None):
+        """
+        Browserless client for the CTCLink course catalog IScripts
+
+        Args:
+            base_url (str): Scheme and host to talk to; links found in pages are
+                            rebased onto it, so a local replay server works too
+            institution (str): CTCLink institution code (WA030 = Olympic College)
+            timeout (int): Per-request timeout in seconds
+            pool_size (int): Keep-alive connections held by the session
+            workers (int): Subject pages fetched in parallel
+            record_dir (str): If set, save every fetched page there for later replay
+            cache (ResponseCache): Optional on-disk response cache for every fetch
+            resilience (Resilience): Retry/backoff/circuit-breaker settings shared with
+                                     other clients of the same run (default: a new one)
+            metrics (ScrapeMetrics): Receives fetch/parse timings and page/byte counts
+        """
+        self.base_url = base_url.rstrip('/')
+        self.institution = institution
+        self.timeout = timeout
+        self.workers = max(1, workers)
+        self.record_dir = record_dir
+        self._record_lock = threading.Lock()
+        self.cache = cache
+        self.resilience = resilience or Resilience()
+        self.metrics = metrics or ScrapeMetrics('ctclink_http_client', institution)
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+
+    def portal_url(self):
+        """Portal (psp) URL that wraps the catalog in main_iframe"""
+        return f"{self.base_url}/psp/csprd{CATALOG_SCRIPT_PATH}?institution={self.institution}"
+
+    def content_url(self):
+        """Content (psc) URL that main_iframe loads"""
+        return f"{self.base_url}/psc/csprd{CATALOG_SCRIPT_PATH}?institution={self.institution}"
+
+    def rebase(self, url):
+        """Point an absolute URL found in a page at this client's base_url"""
+        parts = urlsplit(url)
+        base = urlsplit(self.base_url)
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+    def fetch(self, url):
+        """
+        GET a page through the pooled session and return its text
+
+        Transient failures (see is_transient_http_error) are retried with
+        backoff; the last error is raised once the attempts run out.
+        """
+        url = self.rebase(url)
+        with self.metrics.span('fetch'):
+            return self.resilience.call('fetch', self._fetch_once, url, url=url, retryable=is_transient_http_error)
+
+    def _fetch_once(self, url):
+        if self.cache:
+            response = self.cache.fetch(self.session, url, timeout=self.timeout)
+        else:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        self.metrics.inc('pages')
+        self.metrics.inc('bytes', len(response.content))
+        if self.record_dir:
+            self._record(url, response.text)
+        return response.text
+
+    def _record(self, url, html):
+        """
+        Save a fetched page and index it by path and query for replay_server.py
+
+        Worker threads record concurrently, so the manifest update is serialized
+        and every file is written to a .tmp and renamed into place; a reader
+        never sees a half-written page or manifest.
+        """
+        parts = urlsplit(url)
+        key = parts.path + ('?' + parts.query if parts.query else '')
+        filename = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + '.html'
+        page_path = os.path.join(self.record_dir, filename)
+        manifest_path = os.path.join(self.record_dir, 'manifest.json')
+
+        with self._record_lock:
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(page_path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(page_path + '.tmp', page_path)
+
+            manifest = {}
+            if os.path.exists(manifest_path):
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            manifest[key] = filename
+            with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(manifest_path + '.tmp', manifest_path)
+
+    def resolve_content_url(self, portal_url=None):
+        """
+        Find the catalog content URL behind a portal page
+
+        Uses the main_iframe src from the portal HTML, falling back to the
+        PeopleSoft convention of swapping /psp/ for /psc/.
+        """
+        portal_url = self.rebase(portal_url) if portal_url else self.portal_url()
+        try:
+            content_url = find_content_url(self.fetch(portal_url), portal_url, self.institution)
+            if content_url:
+                return content_url
+        except requests.RequestException as e:
+            self.logger.warning(f"Could not load portal page, guessing content URL: {e}")
+        return guess_content_url(portal_url, self.institution)
+
+    def get_subjects(self, portal_url=None):
+        """
+        Fetch the catalog content page and return its subjects
+
+        Returns:
+            list: dicts with 'code', 'name' and 'url' (the View Courses IScript URL)
+        """
+        content_url = self.resolve_content_url(portal_url)
+        self.logger.info(f"Fetching catalog content: {content_url}")
+        subjects = parse_subjects(self.fetch(content_url), content_url)
+        self.logger.info(f"Found {len(subjects)} subjects")
+        return subjects
+
+    def get_subject_courses(self, subject):
+        """Fetch one subject's View Courses page and parse its course rows"""
+        html = self.fetch(subject['url'])
+        with self.metrics.span('parse'):
+            return parse_courses(html, subject['code'], subject['url'])
+
+    def scrape_subjects(self, subjects, change_tracker=None):
+        """
+        Fetch and parse many subjects in parallel over the shared session
+
+        Args:
+            subjects (list): Subject dicts from get_subjects()
+            change_tracker: Optional incremental_scrape.SubjectChangeTracker; pages
+                            it reports unchanged are not parsed and yield no courses
+
+        Yields:
+            tuple: (subject, courses) as each subject finishes, in completion order
+                   rather than subject order; courses is None when the subject
+                   could not be fetched or parsed
+
+        Subjects not yet started are cancelled if the caller stops early (an
+        exception, Ctrl-C or closing the generator) instead of being fetched first.
+        """
+        def fetch_subject(subject):
+            try:
+                if not change_tracker:
+                    return subject, self.get_subject_courses(subject)
+                html = self.fetch(subject['url'])
+                if not change_tracker.page_changed(subject['code'], html):
+                    return subject, []
+                with self.metrics.span('parse'):
+                    courses = parse_courses(html, subject['code'], subject['url'])
+                change_tracker.record_courses(subject['code'], courses)
+                return subject, courses
+            except requests.RequestException as e:
+                self.logger.error(f"Error fetching courses for {subject['code']}: {e}")
+                return subject, None
+            except Exception as e:
+                # Odd HTML or a change-tracker error fails this subject, not the whole batch
+                self.logger.error(f"Error scraping courses for {subject['code']}: {e!r}")
+                return subject, None
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {executor.submit(fetch_subject, subject) for subject in subjects}
+            for future in as_completed(futures):
+                # Drop finished futures so a subject's courses are freed once the caller is done with them
+                futures.discard(future)
+                yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
@@ -9,7 +9,7 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import time
+from page_readiness import PageReadiness
 import logging
 from datetime import datetime
 
@@ -43,6 +43,7 @@ class DebugCourseScraperCTCLink:
         
         self.driver = webdriver.Chrome(options=chrome_options)
         self.wait = WebDriverWait(self.driver, self.wait_timeout)
+        self.readiness = PageReadiness(self.driver, self.wait_timeout, logger=self.logger)
         self.logger.info("Chrome driver initialized for debugging")
         
     def take_screenshot(self, filename):
@@ -135,7 +136,8 @@ class DebugCourseScraperCTCLink:
             self.logger.info(f"Navigating to: {base_url}")
             self.driver.get(base_url)
             self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            time.sleep(3)
+            self.readiness.document_ready()
+            self.readiness.dom_quiet()
             
             self.take_screenshot("01_initial_page.png")
             self.debug_page_content("main")
@@ -148,8 +150,10 @@ class DebugCourseScraperCTCLink:
                 iframe_src = iframe.get_attribute('src')
                 self.logger.info(f"Iframe src: {iframe_src}")
                 
-                self.driver.switch_to.frame(iframe)
-                time.sleep(3)
+                if not self.readiness.iframe_loaded(iframe).ready:
+                    self.driver.switch_to.frame(iframe)
+                self.readiness.spinner_gone()
+                self.readiness.dom_quiet()
                 
                 self.take_screenshot("02_inside_iframe.png")
                 self.debug_page_content("iframe")
@@ -164,6 +168,9 @@ class DebugCourseScraperCTCLink:
                 self.logger.info("No iframe found")
                 self.explore_course_search()
                 
+            for name, timing in self.readiness.summary().items():
+                self.logger.info(f"Wait '{name}': {timing['total_seconds']:.2f}s over {timing['count']} waits, max {timing['max_seconds']:.2f}s")
+                
         except Exception as e:
             self.logger.error(f"Error in site exploration: {e}")
             
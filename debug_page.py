@@ -5,27 +5,26 @@ Simple debug script to see what's actually on the Olympic College page
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-import time
+from page_readiness import PageReadiness
 
 def debug_page():
     chrome_options = Options()
     # chrome_options.add_argument('--headless')  # Comment out to see browser
     driver = webdriver.Chrome(options=chrome_options)
+    readiness = PageReadiness(driver, timeout=15)
     
     url = "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main?institution=WA030&PortalActualURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentProvider=SA&PortalCRefLabel=Course%20Catalog&PortalRegistryName=EMPLOYEE&PortalServletURI=https%3a%2f%2fcsprd.ctclink.us%2fpsp%2fcsprd%2f&PortalURI=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2f&PortalHostNode=SA&NoCrumbs=yes"
     
     try:
         print("Loading page...")
         driver.get(url)
-        time.sleep(5)
+        readiness.document_ready()
         
         print("Looking for iframe...")
-        try:
-            iframe = driver.find_element(By.CSS_SELECTOR, "iframe")
-            driver.switch_to.frame(iframe)
+        if readiness.iframe_loaded().ready:
             print("Switched to iframe")
-            time.sleep(3)
-        except:
+            readiness.dom_quiet()
+        else:
             print("No iframe found")
         
         # Look for links that might contain course prefixes
@@ -63,6 +62,10 @@ def debug_page():
         except:
             print("Could not get body text")
             
+        print("\nWait timings:")
+        for result in readiness.timings:
+            print(f"  {result.name}: {result.elapsed:.2f}s ({'ready' if result.ready else 'timed out'})")
+            
         input("Press Enter to close browser...")
         
     finally:
@@ -0,0 +1,93 @@
+"""
+Batched DOM Extraction
+Reads the text and attributes of every element matching a selector in a single
+execute_script / evaluate_all call instead of one WebDriver round trip per element
+"""
+
+from collections import namedtuple
+import json
+
+# index is the element's position among the selector's matches, so the live
+# element can be looked up again when it has to be clicked
+ElementSnapshot = namedtuple('ElementSnapshot', ['index', 'tag', 'text', 'attrs'])
+
+# Attributes are read as DOM properties when the element has a string property of
+# that name, like WebElement.get_attribute ('href' comes back absolute, 'value' current)
+_ROW_JS = """
+function snapshotRow(node, attributes, textProperty) {
+    var row = [node.tagName.toLowerCase(), node[textProperty] || ''];
+    for (var a = 0; a < attributes.length; a++) {
+        var name = attributes[a];
+        row.push(typeof node[name] === 'string' ? node[name] : node.getAttribute(name));
+    }
+    return row;
+}
+"""
+
+# Tries each selector in turn and returns the rows of the first one with matches
+_SNAPSHOT_FIRST_JS = _ROW_JS + """
+var selectors = arguments[0], attributes = arguments[1], textProperty = arguments[2];
+for (var s = 0; s < selectors.length; s++) {
+    var nodes;
+    try {
+        nodes = document.querySelectorAll(selectors[s]);
+    } catch (e) {
+        continue;
+    }
+    if (!nodes.length) continue;
+    var rows = new Array(nodes.length);
+    for (var i = 0; i < nodes.length; i++) {
+        rows[i] = snapshotRow(nodes[i], attributes, textProperty);
+    }
+    return JSON.stringify([s, rows]);
+}
+return JSON.stringify([-1, []]);
+"""
+
+_LOCATOR_JS = "(nodes, [attributes, textProperty]) => {" + _ROW_JS + """
+    return JSON.stringify(nodes.map(node => snapshotRow(node, attributes, textProperty)));
+}"""
+
+def _snapshots(rows, attributes):
+    return [
+        ElementSnapshot(index, row[0], row[1], dict(zip(attributes, row[2:])))
+        for index, row in enumerate(rows)
+    ]
+
+def snapshot_first(driver, selectors, attributes=(), text_property='innerText'):
+    """
+    Snapshot the elements of the first CSS selector that matches anything
+
+    One execute_script call in the driver's current frame; the rows come back
+    as a single JSON string, which is much cheaper to transfer than a list of
+    WebElements.
+
+    Args:
+        driver: Selenium WebDriver
+        selectors (list): CSS selectors tried in order; invalid ones are skipped
+        attributes (iterable): Attribute names to read from each element
+        text_property (str): 'innerText' (rendered text, like WebElement.text) or 'textContent'
+
+    Returns:
+        tuple: (matching selector or None, list of ElementSnapshot)
+    """
+    selectors = list(selectors)
+    attributes = list(attributes)
+    index, rows = json.loads(driver.execute_script(_SNAPSHOT_FIRST_JS, selectors, attributes, text_property))
+    if index < 0:
+        return None, []
+    return selectors[index], _snapshots(rows, attributes)
+
+def snapshot_elements(driver, selector, attributes=(), text_property='innerText'):
+    """Snapshot every element matching one CSS selector (see snapshot_first)"""
+    return snapshot_first(driver, [selector], attributes, text_property)[1]
+
+def snapshot_locator(locator, attributes=(), text_property='textContent'):
+    """
+    Snapshot every element of a Playwright locator in one evaluate_all call
+
+    Works for page and frame_locator locators, including Playwright-only
+    selectors such as :has-text(). The default text matches Locator.text_content().
+    """
+    attributes = list(attributes)
+    return _snapshots(json.loads(locator.evaluate_all(_LOCATOR_JS, [attributes, text_property])), attributes)
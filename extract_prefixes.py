@@ -8,7 +8,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-import time
+from page_readiness import PageReadiness
 import logging
 
 def setup_driver(headless=False):
@@ -31,6 +31,7 @@ def extract_course_prefixes():
     
     driver = setup_driver(headless=False)  # Set to True to hide browser
     wait = WebDriverWait(driver, 10)
+    readiness = PageReadiness(driver, timeout=10)
     
     try:
         print("Loading Olympic College course catalog...")
@@ -38,7 +39,8 @@ def extract_course_prefixes():
         
         # Wait for page to load
         wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(3)  # Additional wait for dynamic content
+        readiness.document_ready()
+        readiness.dom_quiet()
         
         print("Taking screenshot...")
         driver.save_screenshot("olympic_catalog_page.png")
@@ -47,8 +49,9 @@ def extract_course_prefixes():
         try:
             iframe = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "iframe")))
             print(f"Found iframe: {iframe.get_attribute('name') or iframe.get_attribute('id')}")
-            driver.switch_to.frame(iframe)
-            time.sleep(2)
+            if not readiness.iframe_loaded(iframe).ready:
+                driver.switch_to.frame(iframe)
+            readiness.dom_quiet()
             print("Switched to iframe")
             driver.save_screenshot("inside_iframe.png")
         except:
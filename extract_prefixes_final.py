@@ -4,16 +4,21 @@ This script will open the page and look for course prefixes in common locations
 """
 
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-import time
+from page_readiness import PageReadiness
+from dom_snapshot import snapshot_elements
 import re
 import json
 from datetime import datetime
 
-def extract_course_prefixes():
+# Course catalog portal URL; {institution} is a CTCLink institution code (WA030 = Olympic College)
+CATALOG_URL_TEMPLATE = "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main?institution={institution}&PortalActualURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentProvider=SA&PortalCRefLabel=Course%20Catalog&PortalRegistryName=EMPLOYEE&PortalServletURI=https%3a%2f%2fcsprd.ctclink.us%2fpsp%2fcsprd%2f&PortalURI=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2f&PortalHostNode=SA&NoCrumbs=yes"
+
+def create_driver(headless=False):
+    """Create a Chrome driver configured for prefix extraction"""
     chrome_options = Options()
-    # chrome_options.add_argument('--headless')  # Comment out to see what's happening
+    if headless:
+        chrome_options.add_argument('--headless')
     
     # Suppress Chrome's verbose logging (including TensorFlow messages)
     chrome_options.add_argument('--log-level=3')  # Only show fatal errors
@@ -21,36 +26,50 @@ def extract_course_prefixes():
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--no-sandbox')
     
-    driver = webdriver.Chrome(options=chrome_options)
+    return webdriver.Chrome(options=chrome_options)
+
+def extract_course_prefixes(institution="WA030", driver=None):
+    """
+    Extract course prefixes for one CTCLink institution
+    
+    Args:
+        institution (str): CTCLink institution code
+        driver: Existing WebDriver to reuse; if None a driver is created and closed here
+    """
+    owns_driver = driver is None
+    if owns_driver:
+        driver = create_driver()  # Pass headless=True to hide the browser
+    readiness = PageReadiness(driver, timeout=15)
     
-    url = "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main?institution=WA030&PortalActualURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentURL=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2fEMPLOYEE%2fSA%2fs%2fWEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main&PortalContentProvider=SA&PortalCRefLabel=Course%20Catalog&PortalRegistryName=EMPLOYEE&PortalServletURI=https%3a%2f%2fcsprd.ctclink.us%2fpsp%2fcsprd%2f&PortalURI=https%3a%2f%2fcsprd.ctclink.us%2fpsc%2fcsprd%2f&PortalHostNode=SA&NoCrumbs=yes"
+    url = CATALOG_URL_TEMPLATE.format(institution=institution)
     
     prefixes = set()
     
     try:
-        print("🌐 Loading Olympic College course catalog...")
+        print(f"🌐 Loading {institution} course catalog...")
         driver.get(url)
-        time.sleep(5)
+        readiness.document_ready()
+        readiness.spinner_gone()
         
         # Switch to iframe if present
-        try:
-            iframe = driver.find_element(By.CSS_SELECTOR, "iframe")
-            driver.switch_to.frame(iframe)
+        if readiness.iframe_loaded().ready:
             print("✅ Switched to iframe")
-            time.sleep(3)
-        except:
+            readiness.spinner_gone()
+            readiness.dom_quiet()
+        else:
             print("ℹ️  No iframe found, working with main page")
         
         print("\n🔍 Searching for course prefixes...")
         
         # Strategy 1: Look for clickable links that might be subject/department codes
-        links = driver.find_elements(By.TAG_NAME, "a")
+        # Text and href of every link come back in one round trip
+        links = snapshot_elements(driver, "a", ['href'])
         print(f"   Found {len(links)} links to analyze")
         
         for link in links:
             try:
                 text = link.text.strip()
-                href = link.get_attribute('href') or ''
+                href = link.attrs['href'] or ''
                 
                 # Look for short text that could be course prefixes
                 if text and 2 <= len(text) <= 6:
@@ -70,23 +89,18 @@ def extract_course_prefixes():
                 continue
         
         # Strategy 2: Look for select dropdowns with options
-        selects = driver.find_elements(By.TAG_NAME, "select")
-        print(f"   Found {len(selects)} dropdown menus")
-        
-        for select in selects:
-            try:
-                options = select.find_elements(By.TAG_NAME, "option")
-                for option in options:
-                    text = option.text.strip()
-                    value = option.get_attribute('value') or ''
-                    
-                    # Look for course prefixes in option text or value
-                    for item in [text, value]:
-                        if item and 2 <= len(item) <= 6 and item.isupper() and item.replace('&', '').isalpha():
-                            prefixes.add(item)
-                            print(f"   📚 Found prefix in dropdown: {item}")
-            except:
-                continue
+        options = snapshot_elements(driver, "select option", ['value'])
+        print(f"   Found {len(options)} dropdown options")
+        
+        for option in options:
+            text = option.text.strip()
+            value = option.attrs['value'] or ''
+            
+            # Look for course prefixes in option text or value
+            for item in [text, value]:
+                if item and 2 <= len(item) <= 6 and item.isupper() and item.replace('&', '').isalpha():
+                    prefixes.add(item)
+                    print(f"   📚 Found prefix in dropdown: {item}")
         
         # Strategy 3: Look in page source for common patterns
         page_source = driver.page_source
@@ -111,48 +125,76 @@ def extract_course_prefixes():
         return []
         
     finally:
-        print("\n🔒 Closing browser...")
-        driver.quit()
+        print("\n⏱️  Page readiness waits:")
+        for name, timing in readiness.summary().items():
+            print(f"   {name}: {timing['total_seconds']:.2f}s over {timing['count']} waits ({timing['timeouts']} timeouts)")
+        if owns_driver:
+            print("\n🔒 Closing browser...")
+            driver.quit()
 
 if __name__ == "__main__":
-    print("🎓 Olympic College Course Prefix Extractor")
-    print("=" * 50)
+    import argparse
     
-    prefixes = extract_course_prefixes()
+    parser = argparse.ArgumentParser(description="Extract course prefixes from the CTCLink course catalog")
+    parser.add_argument('--profile', nargs='?', const='.', metavar='DIR',
+                        help="Profile the run with cProfile and write a hotspot report, collapsed stacks "
+                             "(for flame graphs) and .pstats into DIR (default: current directory)")
+    parser.add_argument('--profile-memory', action='store_true', help="With --profile, also trace allocations with tracemalloc")
+    args = parser.parse_args()
     
-    if prefixes:
-        print(f"\n🎉 SUCCESS! Found {len(prefixes)} course prefixes:")
-        print("-" * 30)
+    profiler = None
+    if args.profile:
+        from profiling import RunProfiler
         
-        for i, prefix in enumerate(prefixes, 1):
-            print(f"{i:2d}. {prefix}")
-        
-        # Save to text file
-        txt_filename = "olympic_course_prefixes_final.txt"
-        with open(txt_filename, "w") as f:
-            for prefix in prefixes:
-                f.write(f"{prefix}\n")
-        
-        # Save to JSON file with metadata
-        json_filename = "olympic_course_prefixes_final.json"
-        json_data = {
-            "extracted_at": datetime.now().isoformat(),
-            "source_url": "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main",
-            "institution": "Olympic College (WA030)",
-            "total_prefixes": len(prefixes),
-            "course_prefixes": prefixes,
-            "extraction_method": "Multi-strategy Selenium scraping"
-        }
-        
-        with open(json_filename, "w", encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n💾 Prefixes saved to:")
-        print(f"   📄 Text format: {txt_filename}")
-        print(f"   📋 JSON format: {json_filename}")
-        
-    else:
-        print("\n😞 No course prefixes found.")
-        print("The page might need manual inspection to understand its structure.")
+        profiler = RunProfiler('extract_prefixes_final', args.profile, memory=args.profile_memory).start()
     
-    print("\n✨ Done!")
\ No newline at end of file
+    print("🎓 Olympic College Course Prefix Extractor")
+    print("=" * 50)
+    
+    try:
+        prefixes = extract_course_prefixes()
+        
+        if prefixes:
+            print(f"\n🎉 SUCCESS! Found {len(prefixes)} course prefixes:")
+            print("-" * 30)
+            
+            for i, prefix in enumerate(prefixes, 1):
+                print(f"{i:2d}. {prefix}")
+            
+            # Save to text file
+            txt_filename = "olympic_course_prefixes_final.txt"
+            with open(txt_filename, "w") as f:
+                for prefix in prefixes:
+                    f.write(f"{prefix}\n")
+            
+            # Save to JSON file with metadata
+            json_filename = "olympic_course_prefixes_final.json"
+            json_data = {
+                "extracted_at": datetime.now().isoformat(),
+                "source_url": "https://csprd.ctclink.us/psp/csprd/EMPLOYEE/SA/s/WEBLIB_HCX_CM.H_COURSE_CATALOG.FieldFormula.IScript_Main",
+                "institution": "Olympic College (WA030)",
+                "institution_code": "WA030",
+                "total_prefixes": len(prefixes),
+                "course_prefixes": prefixes,
+                "extraction_method": "Multi-strategy Selenium scraping"
+            }
+            
+            with open(json_filename, "w", encoding='utf-8') as f:
+                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            
+            print(f"\n💾 Prefixes saved to:")
+            print(f"   📄 Text format: {txt_filename}")
+            print(f"   📋 JSON format: {json_filename}")
+            
+        else:
+            print("\n😞 No course prefixes found.")
+            print("The page might need manual inspection to understand its structure.")
+        
+        print("\n✨ Done!")
+    finally:
+        if profiler:
+            paths = profiler.finish()
+            print("\n🔬 Profile:")
+            for line in profiler.summary_lines():
+                print(f"   {line}")
+            print(f"   Written to {paths['report']}, {paths['collapsed']} and {paths['pstats']}")
\ No newline at end of file
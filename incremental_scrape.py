@@ -0,0 +1,235 @@
+"""
+Incremental Scrape Support
+Hashes each subject's course page so unchanged subjects are skipped and only
+course deltas are written to course_catalog.db
+"""
+
+from datetime import datetime
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+
+from init_course_db import create_course_schema
+from ingest_course_data import configure_bulk_connection, split_course_code
+
+# Markup that changes on every request (session scripts, hidden state fields,
+# comments) and would otherwise make every page look modified
+_VOLATILE_PATTERN = re.compile(
+    r'<script\b.*?</script\s*>|<style\b.*?</style\s*>|<input\b[^>]*type=["\']?hidden[^>]*>|<!--.*?-->',
+    re.IGNORECASE | re.DOTALL
+)
+
+def content_hash(html):
+    """SHA-256 of a page with volatile markup removed and whitespace collapsed"""
+    text = ' '.join(_VOLATILE_PATTERN.sub('', html).split())
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class SubjectChangeTracker:
+    def __init__(self, db_path="course_catalog.db", institution_code="WA030", scraper=None):
+        """
+        Track subject page hashes and course deltas for one incremental scrape run
+
+        Scrapers call page_changed() with each subject page they fetch and
+        only parse the page when it returns True, then hand the parsed courses
+        to record_courses(). finish() writes the deltas in one transaction.
+        Both calls are thread-safe so pooled and async scrapers can share one tracker.
+
+        Args:
+            db_path (str): SQLite database created by init_course_db.py
+            institution_code (str): Institution whose subjects are being scraped
+            scraper (str): Name recorded on the scrape_runs row
+        """
+        self.db_path = db_path
+        self.institution_code = institution_code
+        self.scraper = scraper
+        self.logger = logging.getLogger(__name__)
+        self.run_id = None
+
+        self._lock = threading.Lock()
+        self._stored_hashes = {}
+        self._checked = set()
+        self._pending_hashes = {}
+        self._changed_courses = {}
+
+    def start(self):
+        """Load stored page hashes and open a scrape_runs row"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            create_course_schema(conn)
+            self._stored_hashes = dict(conn.execute(
+                "SELECT prefix_code, content_hash FROM subject_pages WHERE institution_code = ?",
+                (self.institution_code,)
+            ))
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO scrape_runs (institution_code, started_at, source, scraper) VALUES (?, ?, ?, ?)",
+                    (self.institution_code, datetime.now().isoformat(), 'incremental', self.scraper)
+                )
+                self.run_id = cursor.lastrowid
+        finally:
+            conn.close()
+        self.logger.info(f"Incremental run {self.run_id}: {len(self._stored_hashes)} subject hashes on record")
+        return self
+
+    def page_changed(self, subject_code, html):
+        """
+        Hash a subject page and report whether it differs from the last run
+
+        Returns:
+            bool: False if the page is identical to the stored one and can be skipped
+        """
+        digest = content_hash(html)
+        with self._lock:
+            self._checked.add(subject_code)
+            if self._stored_hashes.get(subject_code) == digest:
+                return False
+            self._pending_hashes[subject_code] = digest
+            return True
+
+    def record_courses(self, subject_code, courses):
+        """Keep the parsed courses of a changed subject page for finish()"""
+        with self._lock:
+            self._changed_courses[subject_code] = courses
+
+    def finish(self, status='complete'):
+        """
+        Diff changed subjects against stored courses and write only the deltas
+
+        Added and changed courses are upserted, removed ones deleted, and each
+        difference is logged to course_changes for this run. Unchanged subjects
+        only have their last_checked_run_id bumped.
+
+        Returns:
+            dict: Subject and course delta counts for the run
+        """
+        with self._lock:
+            changed = {code: self._changed_courses[code] for code in self._pending_hashes
+                       if code in self._changed_courses}
+            unchanged = sorted(self._checked - set(self._pending_hashes))
+            hashes = dict(self._pending_hashes)
+
+        code = self.institution_code
+        counts = {
+            'run_id': self.run_id,
+            'subjects_checked': len(unchanged) + len(changed),
+            'subjects_unchanged': len(unchanged),
+            'subjects_changed': 0,
+            'added': 0,
+            'removed': 0,
+            'changed': 0
+        }
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            configure_bulk_connection(conn)
+            conn.execute("PRAGMA foreign_keys=ON")
+
+            stored = {}
+            for prefix, number, title, credits in conn.execute(
+                "SELECT prefix_code, course_number, title, credits FROM courses WHERE institution_code = ?", (code,)
+            ):
+                stored.setdefault(prefix, {})[number] = (title or '', credits or '')
+
+            deltas = []
+            upserts = []
+            removals = []
+            page_rows = []
+            for subject_code, courses in changed.items():
+                new = {}
+                for course in courses:
+                    parts = split_course_code(course.get('course_code'))
+                    if parts and parts[0] == subject_code:
+                        new[parts[1]] = (course.get('course_title') or '', course.get('credits') or '')
+                old = stored.get(subject_code, {})
+
+                if old and not new:
+                    # An empty parse of a page that used to list courses is far more
+                    # likely an error page than a withdrawn subject; retry next run
+                    self.logger.warning(f"Subject {subject_code} changed but no courses parsed, keeping stored courses")
+                    continue
+
+                for number, (title, credits) in new.items():
+                    if number not in old:
+                        deltas.append((subject_code, number, 'added', None, title, None, credits))
+                        upserts.append((subject_code, number, title, credits))
+                        continue
+                    # Blank values mean "not on this page", matching ingest_course_records
+                    merged = (title or old[number][0], credits or old[number][1])
+                    if merged != old[number]:
+                        deltas.append((subject_code, number, 'changed', old[number][0], merged[0],
+                                       old[number][1], merged[1]))
+                        upserts.append((subject_code, number) + merged)
+                for number, (title, credits) in old.items():
+                    if number not in new:
+                        deltas.append((subject_code, number, 'removed', title, None, credits, None))
+                        removals.append((code, subject_code, number))
+                page_rows.append((code, subject_code, hashes[subject_code], len(new), self.run_id, self.run_id))
+                counts['subjects_changed'] += 1
+
+            with conn:
+                conn.executemany("""
+                    INSERT INTO subjects (institution_code, prefix_code, last_run_id) VALUES (?, ?, ?)
+                    ON CONFLICT(institution_code, prefix_code) DO UPDATE SET last_run_id = excluded.last_run_id
+                """, [(code, row[1], self.run_id) for row in page_rows])
+                subject_ids = {
+                    prefix: subject_id
+                    for subject_id, prefix in conn.execute(
+                        "SELECT id, prefix_code FROM subjects WHERE institution_code = ?", (code,)
+                    )
+                }
+
+                conn.executemany("""
+                    INSERT INTO courses
+                    (subject_id, institution_code, prefix_code, course_number, title, credits, last_run_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(institution_code, prefix_code, course_number) DO UPDATE SET
+                        title = excluded.title,
+                        credits = excluded.credits,
+                        last_run_id = excluded.last_run_id,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [(subject_ids[prefix], code, prefix, number, title, credits, self.run_id)
+                      for prefix, number, title, credits in upserts])
+                conn.executemany(
+                    "DELETE FROM courses WHERE institution_code = ? AND prefix_code = ? AND course_number = ?",
+                    removals
+                )
+                conn.executemany("""
+                    INSERT INTO course_changes
+                    (run_id, institution_code, prefix_code, course_number, change_type,
+                     old_title, new_title, old_credits, new_credits)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(self.run_id, code) + delta for delta in deltas])
+
+                conn.executemany("""
+                    INSERT INTO subject_pages
+                    (institution_code, prefix_code, content_hash, course_count, last_changed_run_id, last_checked_run_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(institution_code, prefix_code) DO UPDATE SET
+                        content_hash = excluded.content_hash,
+                        course_count = excluded.course_count,
+                        last_changed_run_id = excluded.last_changed_run_id,
+                        last_checked_run_id = excluded.last_checked_run_id
+                """, page_rows)
+                conn.executemany(
+                    "UPDATE subject_pages SET last_checked_run_id = ? WHERE institution_code = ? AND prefix_code = ?",
+                    [(self.run_id, code, prefix) for prefix in unchanged]
+                )
+
+                conn.execute(
+                    "UPDATE scrape_runs SET finished_at = ?, course_count = ?, status = ? WHERE id = ?",
+                    (datetime.now().isoformat(), len(deltas), status, self.run_id)
+                )
+
+            for delta in deltas:
+                counts[delta[2]] += 1
+        finally:
+            conn.close()
+
+        self.logger.info(
+            f"Incremental run {self.run_id}: {counts['subjects_unchanged']} unchanged, "
+            f"{counts['subjects_changed']} changed subjects; {counts['added']} added, "
+            f"{counts['removed']} removed, {counts['changed']} changed courses"
+        )
+        return counts
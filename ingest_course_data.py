@@ -6,8 +6,13 @@ Loads course prefix data from JSON file into SQLite database
 import sqlite3
 import json
 import os
+import time
 from datetime import datetime
 
+from init_course_db import migrate_course_prefixes, create_course_schema
+from catalog_parser import COURSE_CODE_PATTERN, Subject, iter_catalog_records
+from metrics import ScrapeMetrics
+
 def load_json_data(json_file):
     """Load and validate JSON data"""
     
@@ -173,6 +178,326 @@ def ingest_course_prefixes(json_file="olympic_course_prefixes_final.json", db_pa
             conn.close()
             print("🔒 Database connection closed.")
 
+def configure_bulk_connection(conn):
+    """Tune a connection for large single-transaction writes"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+
+def prefix_rows_from_data(data):
+    """Yield course_prefixes rows from one extraction JSON document"""
+    institution = data.get('institution', 'Olympic College')
+    institution_code = data.get('institution_code', 'WA030')
+    for prefix in data.get('course_prefixes', []):
+        yield (
+            prefix,
+            institution,
+            institution_code,
+            data.get('extracted_at'),
+            data.get('source_url'),
+            data.get('extraction_method', 'Unknown')
+        )
+
+def bulk_ingest_course_prefixes(json_files, db_path="course_catalog.db", prune=False, metrics=None):
+    """
+    Non-interactive bulk ingest of one or more prefix JSON files
+    
+    Rows are classified against what is already stored, then new and changed
+    rows are written with a single executemany upsert inside one transaction.
+    Rows that differ only in extracted_at are refreshed so it stays current;
+    identical rows (e.g. the same file ingested twice) are not rewritten.
+    
+    Args:
+        json_files (list): Paths to extraction JSON files
+        db_path (str): Path to the SQLite database
+        prune (bool): Delete stored prefixes of the ingested institutions that
+                      are missing from the input
+        metrics (ScrapeMetrics): Receives load/db_insert timings and row/byte counts
+        
+    Returns:
+        dict: inserted/updated/refreshed/unchanged/pruned counts, or None on failure
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        print(f"   Please run 'python init_course_db.py' first to create the database.")
+        return None
+    
+    metrics = metrics or ScrapeMetrics('ingest_course_data')
+    incoming = {}
+    for json_file in json_files:
+        with metrics.span('load'):
+            data = load_json_data(json_file)
+        if not data:
+            return None
+        metrics.inc('bytes', os.path.getsize(json_file))
+        for row in prefix_rows_from_data(data):
+            incoming[(row[2], row[0])] = row  # Last file wins for duplicate prefixes
+    
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        configure_bulk_connection(conn)
+        migrate_course_prefixes(conn)
+        
+        # Only the institutions being ingested can conflict with incoming rows
+        ingested_codes = sorted({code for code, _ in incoming})
+        placeholders = ', '.join('?' for _ in ingested_codes)
+        existing = {
+            (code, prefix): (institution, source_url, method, extracted_at)
+            for prefix, institution, code, source_url, method, extracted_at in conn.execute(
+                "SELECT prefix_code, institution, institution_code, source_url, extraction_method, extracted_at "
+                f"FROM course_prefixes WHERE institution_code IN ({placeholders})",
+                ingested_codes
+            )
+        }
+        
+        counts = {'inserted': 0, 'updated': 0, 'refreshed': 0, 'unchanged': 0, 'pruned': 0}
+        changed_rows = []
+        for key, row in incoming.items():
+            stored = existing.get(key)
+            if stored is None:
+                counts['inserted'] += 1
+            elif stored[:3] != (row[1], row[4], row[5]):
+                counts['updated'] += 1
+            elif stored[3] != row[3]:
+                counts['refreshed'] += 1
+            else:
+                counts['unchanged'] += 1
+                continue
+            changed_rows.append(row)
+        
+        with metrics.span('db_insert'), conn:
+            conn.executemany("""
+                INSERT INTO course_prefixes
+                (prefix_code, institution, institution_code, extracted_at, source_url, extraction_method)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(institution_code, prefix_code) DO UPDATE SET
+                    institution = excluded.institution,
+                    extracted_at = excluded.extracted_at,
+                    source_url = excluded.source_url,
+                    extraction_method = excluded.extraction_method
+            """, changed_rows)
+            
+            if prune:
+                stale = [key for key in existing if key not in incoming]
+                conn.executemany(
+                    "DELETE FROM course_prefixes WHERE institution_code = ? AND prefix_code = ?",
+                    stale
+                )
+                counts['pruned'] = len(stale)
+        
+        metrics.inc('rows', len(changed_rows))
+        elapsed = time.perf_counter() - start
+        print(f"\n📊 Bulk Ingestion Summary ({len(incoming)} rows in {elapsed:.3f}s):")
+        print(f"   Inserted:  {counts['inserted']}")
+        print(f"   Updated:   {counts['updated']}")
+        print(f"   Refreshed: {counts['refreshed']}")
+        print(f"   Unchanged: {counts['unchanged']}")
+        if prune:
+            print(f"   Pruned:    {counts['pruned']}")
+        return counts
+        
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return None
+        
+    finally:
+        conn.close()
+
+def split_course_code(course_code):
+    """Split 'ACCT& 201' into ('ACCT&', '201'); returns None if it isn't a course code"""
+    match = COURSE_CODE_PATTERN.fullmatch((course_code or '').strip())
+    return (match.group(1), match.group(2)) if match else None
+
+def ingest_scraped_courses(json_file, db_path="course_catalog.db", institution_code="WA030", scraper=None,
+                           metrics=None):
+    """
+    Load scraper output (a JSON list of course records) into the course-level tables
+    
+    Each call records one scrape_runs row. Subjects and courses are upserted,
+    and sections (instructor/schedule/location) replace the course's previous ones.
+    Records without a course code (whole-page raw_text blobs) are run through
+    catalog_parser so the subjects and courses inside them are stored too.
+    
+    Args:
+        json_file (str): JSON written by a scraper's save_data('json')
+        db_path (str): Path to the SQLite database
+        institution_code (str): Used for records that don't carry their own institution_code
+        scraper (str): Name recorded on the scrape run (defaults to the file name)
+        metrics (ScrapeMetrics): Receives load/parse/db_insert timings and row/byte counts
+        
+    Returns:
+        dict: run_id plus subject/course/section/skipped counts, or None on failure
+    """
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        print(f"   Please run 'python init_course_db.py' first to create the database.")
+        return None
+    
+    metrics = metrics or ScrapeMetrics('ingest_course_data', institution_code)
+    try:
+        with metrics.span('load'), open(json_file, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Error loading JSON: {e}")
+        return None
+    metrics.inc('bytes', os.path.getsize(json_file))
+    
+    return ingest_course_records(records, db_path, institution_code, source=json_file,
+                                 scraper=scraper or os.path.basename(json_file), metrics=metrics)
+
+def course_rows_from_records(records, institution_code="WA030"):
+    """
+    Collect de-duplicated subject, course and section rows from scraper records
+    
+    Records without a course code (whole-page raw_text blobs) are run through
+    catalog_parser so the subjects and courses inside them are collected too.
+    
+    Returns:
+        tuple: (subjects, courses, sections, skipped) for write_course_rows()
+    """
+    subjects = {}
+    courses = {}
+    sections = []
+    skipped = 0
+    for record in records:
+        parts = split_course_code(record.get('course_code'))
+        if not parts:
+            found = False
+            code = record.get('institution_code') or institution_code
+            for parsed in iter_catalog_records(record.get('raw_text') or record.get('page_content') or ''):
+                found = True
+                if isinstance(parsed, Subject):
+                    subjects[(code, parsed.prefix_code)] = parsed.name
+                else:
+                    subjects.setdefault((code, parsed.prefix_code), None)
+                    courses[(code, parsed.prefix_code, parsed.course_number)] = (parsed.title, parsed.credits, '')
+            if not found:
+                skipped += 1
+            continue
+        prefix, number = parts
+        code = record.get('institution_code') or institution_code
+        subjects.setdefault((code, prefix), record.get('subject_name'))
+        courses[(code, prefix, number)] = (
+            record.get('course_title') or '',
+            record.get('credits') or '',
+            record.get('description') or ''
+        )
+        if record.get('instructor') or record.get('schedule') or record.get('location'):
+            sections.append((code, prefix, number, record.get('section_code') or '',
+                             record.get('instructor'), record.get('schedule'), record.get('location')))
+    return subjects, courses, sections, skipped
+
+def write_course_rows(conn, run_id, subjects, courses, sections):
+    """
+    Upsert rows from course_rows_from_records() for one scrape run
+    
+    Runs inside the caller's transaction; can be called repeatedly for the
+    same run_id when records arrive in batches.
+    """
+    conn.executemany("""
+        INSERT INTO subjects (institution_code, prefix_code, subject_name, last_run_id)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(institution_code, prefix_code) DO UPDATE SET
+            subject_name = COALESCE(excluded.subject_name, subjects.subject_name),
+            last_run_id = excluded.last_run_id
+    """, [(code, prefix, name, run_id) for (code, prefix), name in subjects.items()])
+    
+    subject_ids = {
+        (code, prefix): subject_id
+        for subject_id, code, prefix in conn.execute(
+            "SELECT id, institution_code, prefix_code FROM subjects WHERE last_run_id = ?", (run_id,)
+        )
+    }
+    
+    conn.executemany("""
+        INSERT INTO courses
+        (subject_id, institution_code, prefix_code, course_number, title, credits, description, last_run_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(institution_code, prefix_code, course_number) DO UPDATE SET
+            subject_id = excluded.subject_id,
+            title = COALESCE(NULLIF(excluded.title, ''), courses.title),
+            credits = COALESCE(NULLIF(excluded.credits, ''), courses.credits),
+            description = COALESCE(NULLIF(excluded.description, ''), courses.description),
+            last_run_id = excluded.last_run_id,
+            updated_at = CURRENT_TIMESTAMP
+    """, [
+        (subject_ids[(code, prefix)], code, prefix, number, title, credits, description, run_id)
+        for (code, prefix, number), (title, credits, description) in courses.items()
+    ])
+    
+    if sections:
+        course_ids = {
+            (code, prefix, number): course_id
+            for course_id, code, prefix, number in conn.execute(
+                "SELECT id, institution_code, prefix_code, course_number FROM courses WHERE last_run_id = ?",
+                (run_id,)
+            )
+        }
+        section_course_ids = {course_ids[s[:3]] for s in sections}
+        # Replace sections left by earlier runs only; an earlier batch of this run may already have written some
+        conn.executemany(
+            "DELETE FROM sections WHERE course_id = ? AND run_id IS NOT ?",
+            [(cid, run_id) for cid in section_course_ids]
+        )
+        conn.executemany("""
+            INSERT INTO sections (course_id, run_id, section_code, instructor, schedule, location)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(course_ids[s[:3]], run_id) + s[3:] for s in sections])
+
+def ingest_course_records(records, db_path="course_catalog.db", institution_code="WA030", source=None, scraper=None,
+                          metrics=None):
+    """Load in-memory course records into the course-level tables (see ingest_scraped_courses)"""
+    metrics = metrics or ScrapeMetrics('ingest_course_data', institution_code)
+    start = time.perf_counter()
+    started_at = datetime.now().isoformat()
+    
+    with metrics.span('parse'):
+        subjects, courses, sections, skipped = course_rows_from_records(records, institution_code)
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        configure_bulk_connection(conn)
+        conn.execute("PRAGMA foreign_keys=ON")
+        create_course_schema(conn)
+        
+        with metrics.span('db_insert'), conn:
+            cursor = conn.execute(
+                "INSERT INTO scrape_runs (institution_code, started_at, source, scraper) VALUES (?, ?, ?, ?)",
+                (institution_code, started_at, source, scraper)
+            )
+            run_id = cursor.lastrowid
+            
+            write_course_rows(conn, run_id, subjects, courses, sections)
+            
+            conn.execute(
+                "UPDATE scrape_runs SET finished_at = ?, course_count = ?, status = 'complete' WHERE id = ?",
+                (datetime.now().isoformat(), len(courses), run_id)
+            )
+        
+        counts = {
+            'run_id': run_id,
+            'subjects': len(subjects),
+            'courses': len(courses),
+            'sections': len(sections),
+            'skipped': skipped
+        }
+        metrics.inc('rows', len(subjects) + len(courses) + len(sections))
+        print(f"\n📊 Course Ingestion Summary (run {run_id}, {time.perf_counter() - start:.3f}s):")
+        print(f"   Subjects: {counts['subjects']}")
+        print(f"   Courses:  {counts['courses']}")
+        print(f"   Sections: {counts['sections']}")
+        print(f"   Skipped (nothing parseable): {skipped}")
+        return counts
+        
+    except sqlite3.Error as e:
+        print(f"❌ Database error: {e}")
+        return None
+        
+    finally:
+        conn.close()
+
 def query_sample_data(db_path="course_catalog.db"):
     """Query and display sample data from the database"""
     
@@ -219,34 +544,80 @@ def query_sample_data(db_path="course_catalog.db"):
             conn.close()
 
 if __name__ == "__main__":
-    # Default file paths
-    json_file = "olympic_course_prefixes_final.json"
-    db_file = "course_catalog.db"
+    import argparse
     
-    # Check for JSON file
-    if not os.path.exists(json_file):
-        print(f"📁 Looking for JSON files...")
-        json_files = [f for f in os.listdir('.') if f.endswith('.json') and 'prefix' in f.lower()]
-        
-        if json_files:
-            print(f"   Found: {json_files}")
-            json_file = json_files[0]  # Use first match
-            print(f"   Using: {json_file}")
-        else:
-            print(f"❌ No course prefix JSON files found.")
-            print(f"   Please run the extraction script first to generate the JSON file.")
-            exit(1)
-    
-    # Run ingestion
-    success = ingest_course_prefixes(json_file, db_file)
-    
-    if success:
-        # Show sample queries
-        query_sample_data(db_file)
-        
-        print(f"\n🚀 Next Steps:")
-        print(f"   • Query database: sqlite3 {db_file}")
-        print(f"   • View all data: SELECT * FROM course_prefixes;")
-        print(f"   • Use the view: SELECT * FROM v_course_prefixes;")
-        
-    print(f"\n✨ Done!")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load course prefix JSON into the catalog database")
+    parser.add_argument('json_files', nargs='*', help="Prefix JSON file(s) (default: olympic_course_prefixes_final.json)")
+    parser.add_argument('--db', default="course_catalog.db")
+    parser.add_argument('--bulk', action='store_true', help="Non-interactive single-transaction upsert with summary counts")
+    parser.add_argument('--prune', action='store_true', help="With --bulk, delete prefixes no longer present for the ingested institutions")
+    parser.add_argument('--courses', action='store_true', help="Files are scraper output; load them into the subjects/courses tables")
+    parser.add_argument('--institution', default="WA030", help="With --courses, institution code for records without one")
+    parser.add_argument('--metrics', metavar='DIR', help="With --courses/--bulk, write stage timings as ingest_course_data.prom and a JSON summary")
+    parser.add_argument('--profile', nargs='?', const='.', metavar='DIR',
+                        help="Profile the run with cProfile and write a hotspot report, collapsed stacks "
+                             "(for flame graphs) and .pstats into DIR (default: current directory)")
+    parser.add_argument('--profile-memory', action='store_true', help="With --profile, also trace allocations with tracemalloc")
+    args = parser.parse_args()
+    
+    profiler = None
+    if args.profile:
+        from profiling import RunProfiler
+        
+        profiler = RunProfiler('ingest_course_data', args.profile, memory=args.profile_memory).start()
+    
+    try:
+        metrics = ScrapeMetrics('ingest_course_data', args.institution if args.courses else None)
+        if args.courses or args.bulk:
+            if args.courses:
+                if not args.json_files:
+                    parser.error("--courses needs at least one scraper JSON file")
+                results = [ingest_scraped_courses(f, args.db, args.institution, metrics=metrics) for f in args.json_files]
+                ok = all(r is not None for r in results)
+            else:
+                counts = bulk_ingest_course_prefixes(args.json_files or ["olympic_course_prefixes_final.json"], args.db,
+                                                     prune=args.prune, metrics=metrics)
+                ok = counts is not None
+            if args.metrics:
+                prom_path, json_path = metrics.write(args.metrics)
+                print(f"📈 Metrics written to {prom_path} and {json_path}")
+            exit(0 if ok else 1)
+        
+        # Default file paths
+        json_file = args.json_files[0] if args.json_files else "olympic_course_prefixes_final.json"
+        db_file = args.db
+        
+        # Check for JSON file
+        if not os.path.exists(json_file):
+            print(f"📁 Looking for JSON files...")
+            json_files = [f for f in os.listdir('.') if f.endswith('.json') and 'prefix' in f.lower()]
+            
+            if json_files:
+                print(f"   Found: {json_files}")
+                json_file = json_files[0]  # Use first match
+                print(f"   Using: {json_file}")
+            else:
+                print(f"❌ No course prefix JSON files found.")
+                print(f"   Please run the extraction script first to generate the JSON file.")
+                exit(1)
+        
+        # Run ingestion
+        success = ingest_course_prefixes(json_file, db_file)
+        
+        if success:
+            # Show sample queries
+            query_sample_data(db_file)
+            
+            print(f"\n🚀 Next Steps:")
+            print(f"   • Query database: sqlite3 {db_file}")
+            print(f"   • View all data: SELECT * FROM course_prefixes;")
+            print(f"   • Use the view: SELECT * FROM v_course_prefixes;")
+            
+        print(f"\n✨ Done!")
+    finally:
+        if profiler:
+            paths = profiler.finish()
+            print("\n🔬 Profile:")
+            for line in profiler.summary_lines():
+                print(f"   {line}")
+            print(f"   Written to {paths['report']}, {paths['collapsed']} and {paths['pstats']}")
\ No newline at end of file
@@ -7,12 +7,124 @@ import sqlite3
 import os
 from datetime import datetime
 
-def create_database_schema(db_path="course_catalog.db"):
+# A prefix is unique within one institution; the same prefix (e.g. MATH&)
+# exists at many CTCLink colleges
+COURSE_PREFIXES_TABLE_SQL = """
+CREATE TABLE {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prefix_code VARCHAR(10) NOT NULL,
+    institution VARCHAR(100) DEFAULT 'Olympic College',
+    institution_code VARCHAR(10) DEFAULT 'WA030',
+    extracted_at TIMESTAMP,
+    source_url TEXT,
+    extraction_method VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (institution_code, prefix_code)
+);
+"""
+
+# Normalized course-level schema: one scrape_runs row per ingest, subjects per
+# institution, courses per subject and (optional) sections per course.
+# prefix_code/institution_code are repeated on courses so the lookup indexes cover
+# the common queries without a join.
+COURSE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    institution_code VARCHAR(10) NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP,
+    source TEXT,
+    scraper VARCHAR(100),
+    course_count INTEGER DEFAULT 0,
+    status VARCHAR(20) DEFAULT 'running'
+);
+
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    institution_code VARCHAR(10) NOT NULL,
+    prefix_code VARCHAR(10) NOT NULL,
+    subject_name VARCHAR(200),
+    last_run_id INTEGER REFERENCES scrape_runs(id) ON DELETE SET NULL,
+    UNIQUE (institution_code, prefix_code)
+);
+
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+    institution_code VARCHAR(10) NOT NULL,
+    prefix_code VARCHAR(10) NOT NULL,
+    course_number VARCHAR(10) NOT NULL,
+    title TEXT,
+    credits VARCHAR(20),
+    description TEXT,
+    last_run_id INTEGER REFERENCES scrape_runs(id) ON DELETE SET NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (institution_code, prefix_code, course_number)
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+    run_id INTEGER REFERENCES scrape_runs(id) ON DELETE SET NULL,
+    section_code VARCHAR(20) DEFAULT '',
+    instructor VARCHAR(200),
+    schedule VARCHAR(200),
+    location VARCHAR(200)
+);
+
+-- Incremental scrapes: last content hash seen for each subject's course page
+CREATE TABLE IF NOT EXISTS subject_pages (
+    institution_code VARCHAR(10) NOT NULL,
+    prefix_code VARCHAR(10) NOT NULL,
+    content_hash CHAR(64) NOT NULL,
+    course_count INTEGER DEFAULT 0,
+    last_changed_run_id INTEGER REFERENCES scrape_runs(id) ON DELETE SET NULL,
+    last_checked_run_id INTEGER REFERENCES scrape_runs(id) ON DELETE SET NULL,
+    PRIMARY KEY (institution_code, prefix_code)
+);
+
+-- Per-run course deltas written by incremental scrapes
+CREATE TABLE IF NOT EXISTS course_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES scrape_runs(id) ON DELETE CASCADE,
+    institution_code VARCHAR(10) NOT NULL,
+    prefix_code VARCHAR(10) NOT NULL,
+    course_number VARCHAR(10) NOT NULL,
+    change_type VARCHAR(10) NOT NULL CHECK (change_type IN ('added', 'removed', 'changed')),
+    old_title TEXT,
+    new_title TEXT,
+    old_credits VARCHAR(20),
+    new_credits VARCHAR(20)
+);
+
+CREATE INDEX IF NOT EXISTS idx_courses_prefix_number
+    ON courses(prefix_code, course_number, institution_code, title, credits);
+CREATE INDEX IF NOT EXISTS idx_courses_institution
+    ON courses(institution_code, prefix_code, course_number, title, credits);
+CREATE INDEX IF NOT EXISTS idx_courses_subject ON courses(subject_id);
+CREATE INDEX IF NOT EXISTS idx_sections_course ON sections(course_id);
+CREATE INDEX IF NOT EXISTS idx_scrape_runs_institution ON scrape_runs(institution_code, started_at);
+CREATE INDEX IF NOT EXISTS idx_course_changes_run ON course_changes(run_id);
+"""
+
+def create_course_schema(conn):
+    """
+    Create the subjects/courses/sections/scrape_runs tables (and the
+    incremental-scrape subject_pages/course_changes tables) if they don't exist
+    
+    Args:
+        conn (sqlite3.Connection): Open connection to the catalog database
+    """
+    conn.executescript(COURSE_SCHEMA_SQL)
+
+def create_database_schema(db_path="course_catalog.db", force=False):
     """
     Create the database schema for storing course prefix data
     
     Args:
         db_path (str): Path to the SQLite database file
+        force (bool): Replace an existing database without asking
     """
     
     print("🗄️  Database Schema Initializer")
@@ -20,7 +132,15 @@ def create_database_schema(db_path="course_catalog.db"):
     
     # Check if database already exists
     if os.path.exists(db_path):
-        response = input(f"⚠️  Database '{db_path}' already exists. Overwrite? (y/N): ")
+        if force:
+            response = 'y'
+        else:
+            try:
+                response = input(f"⚠️  Database '{db_path}' already exists. Overwrite? (y/N): ")
+            except EOFError:
+                # No terminal to answer the prompt (cron, CI, piped stdin)
+                print(f"\n⚠️  Database '{db_path}' already exists; rerun with --force to overwrite it.")
+                response = ''
         if response.lower() != 'y':
             print("❌ Operation cancelled.")
             return False
@@ -36,21 +156,7 @@ def create_database_schema(db_path="course_catalog.db"):
         print(f"📁 Creating database: {db_path}")
         
         # Create course_prefixes table
-        create_table_sql = """
-        CREATE TABLE course_prefixes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            prefix_code VARCHAR(10) NOT NULL UNIQUE,
-            institution VARCHAR(100) DEFAULT 'Olympic College',
-            institution_code VARCHAR(10) DEFAULT 'WA030',
-            extracted_at TIMESTAMP,
-            source_url TEXT,
-            extraction_method VARCHAR(100),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-        
-        cursor.execute(create_table_sql)
+        cursor.execute(COURSE_PREFIXES_TABLE_SQL.format(table="course_prefixes"))
         print("✅ Created table: course_prefixes")
         
         # Create index for faster lookups
@@ -92,6 +198,10 @@ def create_database_schema(db_path="course_catalog.db"):
         cursor.execute(create_view_sql)
         print("✅ Created view: v_course_prefixes")
         
+        # Course-level tables
+        create_course_schema(conn)
+        print("✅ Created tables: scrape_runs, subjects, courses, sections, subject_pages, course_changes")
+        
         # Commit changes
         conn.commit()
         
@@ -129,6 +239,56 @@ def create_database_schema(db_path="course_catalog.db"):
             conn.close()
             print("🔒 Database connection closed.")
 
+def migrate_course_prefixes(conn):
+    """
+    Upgrade a course_prefixes table whose prefix_code is globally UNIQUE
+    to one that is unique per institution
+    
+    Args:
+        conn (sqlite3.Connection): Open connection to the catalog database
+        
+    Returns:
+        bool: True if the table was rebuilt
+    """
+    cursor = conn.cursor()
+    row = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='course_prefixes'"
+    ).fetchone()
+    if not row or 'UNIQUE (institution_code, prefix_code)' in row[0]:
+        return False
+    
+    columns = ("id, prefix_code, institution, institution_code, extracted_at, "
+               "source_url, extraction_method, created_at, updated_at")
+    cursor.executescript(f"""
+        BEGIN;
+        {COURSE_PREFIXES_TABLE_SQL.format(table="course_prefixes_new")}
+        INSERT INTO course_prefixes_new ({columns}) SELECT {columns} FROM course_prefixes;
+        DROP VIEW IF EXISTS v_course_prefixes;
+        DROP TABLE course_prefixes;
+        ALTER TABLE course_prefixes_new RENAME TO course_prefixes;
+        CREATE INDEX idx_prefix_code ON course_prefixes(prefix_code);
+        CREATE TRIGGER update_course_prefixes_updated_at
+            AFTER UPDATE ON course_prefixes
+        BEGIN
+            UPDATE course_prefixes 
+            SET updated_at = CURRENT_TIMESTAMP 
+            WHERE id = NEW.id;
+        END;
+        CREATE VIEW v_course_prefixes AS
+        SELECT 
+            prefix_code,
+            institution,
+            institution_code,
+            extracted_at,
+            created_at,
+            updated_at
+        FROM course_prefixes
+        ORDER BY prefix_code;
+        COMMIT;
+    """)
+    print("✅ Migrated course_prefixes to per-institution prefix uniqueness")
+    return True
+
 def test_database_connection(db_path="course_catalog.db"):
     """Test that the database was created correctly"""
     
@@ -176,17 +336,24 @@ def test_database_connection(db_path="course_catalog.db"):
             conn.close()
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Create the course catalog database schema")
+    parser.add_argument('--db', default="course_catalog.db", help="Database file to create")
+    parser.add_argument('--force', action='store_true', help="Overwrite an existing database without asking")
+    args = parser.parse_args()
+    
     # Create the database schema
-    success = create_database_schema()
+    success = create_database_schema(args.db, args.force)
     
     if success:
         # Test the database
-        test_database_connection()
+        test_database_connection(args.db)
         
         print(f"\n🚀 Next Steps:")
         print(f"   1. Run your course prefix extraction script")
         print(f"   2. Run the ingestion script to load JSON data")
-        print(f"   3. Query your data with: sqlite3 course_catalog.db")
+        print(f"   3. Query your data with: sqlite3 {args.db}")
         
     else:
         print(f"\n💥 Database creation failed. Please check the errors above.")
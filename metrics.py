@@ -0,0 +1,216 @@
+"""
+Scrape-Run Metrics
+Per-stage timing histograms and run counters (pages, rows, bytes, retries), exported
+as a Prometheus textfile and as a JSON run summary
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import math
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the stage-duration histogram buckets; +Inf is implied
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense, plus min/max"""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimated quantile: the upper bound of the bucket the q-th observation falls in"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+class ScrapeMetrics:
+    def __init__(self, scraper, institution_code=None, buckets=DEFAULT_BUCKETS):
+        """
+        Metrics for one scrape or ingest run
+
+        Stages are timed with span(); counters are bumped with inc(). All
+        methods are thread-safe so pool workers and fetch threads can share
+        one instance.
+
+        Args:
+            scraper (str): Run label, e.g. 'course_catalog_scraper'
+            institution_code (str): Optional second label
+            buckets (tuple): Histogram bucket bounds in seconds
+        """
+        self.scraper = scraper
+        self.institution_code = institution_code
+        self.buckets = buckets
+        self.stages = {}
+        self.counters = {}
+        self.resilience = None
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram(self.buckets)
+            self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block as one observation of `stage` (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def inc(self, counter, amount=1):
+        """Add to a run counter such as 'pages', 'rows' or 'bytes'"""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def track_resilience(self, resilience):
+        """Report this Resilience's attempt and retry counts with the run's metrics"""
+        self.resilience = resilience
+
+    def _retry_counts(self):
+        if not self.resilience:
+            return {}
+        return {
+            name: {key: stats[key] for key in ('attempts', 'retries', 'failures')}
+            for name, stats in self.resilience.summary()['operations'].items()
+        }
+
+    def summary(self):
+        """
+        The run as a JSON-ready dict
+
+        Returns:
+            dict: labels, wall-clock duration, counters, retries per operation and,
+                  per stage, count/total/mean/min/max/p50/p95 seconds with the share
+                  of wall-clock time spent in it (stages nest, and parallel workers
+                  can push a share past 1)
+        """
+        elapsed = time.perf_counter() - self._start
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': h.count,
+                    'total_seconds': round(h.sum, 6),
+                    'mean_seconds': round(h.sum / h.count, 6),
+                    'min_seconds': round(h.min, 6),
+                    'max_seconds': round(h.max, 6),
+                    'p50_seconds': round(h.quantile(0.5), 6),
+                    'p95_seconds': round(h.quantile(0.95), 6),
+                    'share_of_run': round(h.sum / elapsed, 4) if elapsed else 0.0
+                }
+                for stage, h in sorted(self.stages.items(), key=lambda item: -item[1].sum)
+            }
+            counters = dict(self.counters)
+        return {
+            'scraper': self.scraper,
+            'institution_code': self.institution_code,
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(elapsed, 6),
+            'counters': counters,
+            'retries': self._retry_counts(),
+            'stages': stages
+        }
+
+    def _labels(self, **extra):
+        labels = {'scraper': self.scraper}
+        if self.institution_code:
+            labels['institution'] = self.institution_code
+        labels.update(extra)
+        return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format (for node_exporter's textfile collector)"""
+        lines = [
+            '# HELP scrape_stage_duration_seconds Time spent in each scrape stage.',
+            '# TYPE scrape_stage_duration_seconds histogram'
+        ]
+        with self._lock:
+            for stage, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'scrape_stage_duration_seconds_bucket{self._labels(stage=stage, le=bound)} {cumulative}')
+                lines.append(f'scrape_stage_duration_seconds_bucket{self._labels(stage=stage, le="+Inf")} {h.count}')
+                lines.append(f'scrape_stage_duration_seconds_sum{self._labels(stage=stage)} {h.sum:.6f}')
+                lines.append(f'scrape_stage_duration_seconds_count{self._labels(stage=stage)} {h.count}')
+            counters = sorted(self.counters.items())
+
+        for name, value in counters:
+            lines.append(f'# TYPE scrape_{name}_total counter')
+            lines.append(f'scrape_{name}_total{self._labels()} {value}')
+
+        retries = self._retry_counts()
+        if retries:
+            lines.append('# TYPE scrape_attempts_total counter')
+            lines.extend(f'scrape_attempts_total{self._labels(operation=op)} {c["attempts"]}' for op, c in retries.items())
+            lines.append('# TYPE scrape_retries_total counter')
+            lines.extend(f'scrape_retries_total{self._labels(operation=op)} {c["retries"]}' for op, c in retries.items())
+            lines.append('# TYPE scrape_failures_total counter')
+            lines.extend(f'scrape_failures_total{self._labels(operation=op)} {c["failures"]}' for op, c in retries.items())
+
+        lines.append('# TYPE scrape_run_duration_seconds gauge')
+        lines.append(f'scrape_run_duration_seconds{self._labels()} {time.perf_counter() - self._start:.6f}')
+        lines.append('# TYPE scrape_run_start_timestamp_seconds gauge')
+        lines.append(f'scrape_run_start_timestamp_seconds{self._labels()} {self.started_at.timestamp():.0f}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory):
+        """
+        Write <scraper>.prom (replaced atomically, as the textfile collector expects)
+        and <scraper>_<start time>.json into directory
+
+        Returns:
+            tuple: (prom path, json path)
+        """
+        os.makedirs(directory, exist_ok=True)
+        prom_path = os.path.join(directory, f"{self.scraper}.prom")
+        with open(prom_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(prom_path + '.tmp', prom_path)
+
+        json_path = os.path.join(directory, f"{self.scraper}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        return prom_path, json_path
+
+    def summary_lines(self):
+        """Where the run's time went, one line per stage, for end-of-run output"""
+        summary = self.summary()
+        lines = [
+            f"{stage}: {s['count']} x, {s['total_seconds']:.2f}s total ({s['share_of_run']:.0%}), "
+            f"mean {s['mean_seconds']:.3f}s, p95 <= {s['p95_seconds']:.3f}s, max {s['max_seconds']:.3f}s"
+            for stage, s in summary['stages'].items()
+        ]
+        if summary['counters']:
+            lines.append('counters: ' + ', '.join(f"{name}={value}" for name, value in sorted(summary['counters'].items())))
+        return lines
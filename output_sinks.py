@@ -0,0 +1,218 @@
+"""
+Streaming Output Sinks for Scraped Records
+Write records to JSONL, CSV and/or SQLite as they are scraped, in bounded batches,
+instead of holding a whole catalog in memory until save_data() runs
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+import csv
+import json
+import logging
+import sqlite3
+import threading
+
+from init_course_db import create_course_schema
+from ingest_course_data import configure_bulk_connection, course_rows_from_records, write_course_rows
+
+SINK_FORMATS = ('jsonl', 'csv', 'sqlite')
+
+class RecordSink(ABC):
+    """
+    Base class: buffers records and hands them to _write_batch every flush_every records
+
+    write()/write_many() are thread-safe, so pool workers can share one sink.
+    """
+    def __init__(self, flush_every=500):
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self.logger = logging.getLogger(__name__)
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        with self._lock:
+            self._buffer.extend(records)
+            self.count += len(records)
+            if len(self._buffer) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._write_batch(batch)
+
+    @abstractmethod
+    def _write_batch(self, records):
+        """Write one flushed batch; called with the sink's lock held"""
+
+    def close(self, status='complete'):
+        """Flush what is buffered and release the file or connection"""
+        with self._lock:
+            self._flush_locked()
+            self._close(status)
+
+    def _close(self, status):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close('complete' if exc_type is None else 'failed')
+
+class JsonlSink(RecordSink):
+    def __init__(self, path, flush_every=500):
+        """One JSON object per line; the file is readable (and appendable) at every flush"""
+        super().__init__(flush_every)
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write_batch(self, records):
+        self._file.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        self._file.flush()
+
+    def _close(self, status):
+        self._file.close()
+        self.logger.info(f"Streamed {self.count} records to {self.path}")
+
+class CsvSink(RecordSink):
+    def __init__(self, path, fieldnames=None, flush_every=500):
+        """
+        CSV with a fixed header
+
+        Without fieldnames the first record's keys are used; keys that only
+        appear in later records are dropped (with a warning), since the header
+        is already on disk. Nested values are written as JSON.
+        """
+        super().__init__(flush_every)
+        self.path = path
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = None
+        self._dropped = set()
+
+    def _write_batch(self, records):
+        if self._writer is None:
+            self.fieldnames = self.fieldnames or list(records[0].keys())
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
+            self._writer.writeheader()
+        for record in records:
+            extra = record.keys() - set(self.fieldnames) - self._dropped
+            if extra:
+                self._dropped |= extra
+                self.logger.warning(f"{self.path}: no column for {', '.join(sorted(extra))}, values dropped")
+            self._writer.writerow({
+                key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                for key, value in record.items()
+            })
+        self._file.flush()
+
+    def _close(self, status):
+        self._file.close()
+        self.logger.info(f"Streamed {self.count} records to {self.path}")
+
+class SqliteSink(RecordSink):
+    def __init__(self, db_path="course_catalog.db", institution_code="WA030", scraper=None, flush_every=500):
+        """
+        Upsert records into the course-level tables batch by batch
+
+        The whole stream is one scrape_runs row; each flush is its own
+        transaction, so rows written before a crash are kept.
+        """
+        super().__init__(flush_every)
+        self.db_path = db_path
+        self.institution_code = institution_code
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        configure_bulk_connection(self._conn)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        create_course_schema(self._conn)
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO scrape_runs (institution_code, started_at, source, scraper) VALUES (?, ?, ?, ?)",
+                (institution_code, datetime.now().isoformat(), 'stream', scraper)
+            )
+            self.run_id = cursor.lastrowid
+
+    def _write_batch(self, records):
+        subjects, courses, sections, _ = course_rows_from_records(records, self.institution_code)
+        with self._conn:
+            write_course_rows(self._conn, self.run_id, subjects, courses, sections)
+
+    def _close(self, status):
+        with self._conn:
+            course_count = self._conn.execute(
+                "SELECT COUNT(*) FROM courses WHERE last_run_id = ?", (self.run_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "UPDATE scrape_runs SET finished_at = ?, course_count = ?, status = ? WHERE id = ?",
+                (datetime.now().isoformat(), course_count, status, self.run_id)
+            )
+        self._conn.close()
+        self.logger.info(f"Streamed {self.count} records into {self.db_path} (run {self.run_id}, {course_count} courses)")
+
+class MultiSink:
+    """Fan records out to several sinks"""
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    @property
+    def count(self):
+        return self.sinks[0].count if self.sinks else 0
+
+    def write(self, record):
+        self.write_many([record])
+
+    def write_many(self, records):
+        for sink in self.sinks:
+            sink.write_many(records)
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self, status='complete'):
+        for sink in self.sinks:
+            sink.close(status)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close('complete' if exc_type is None else 'failed')
+
+def open_sinks(formats, basename, db_path="course_catalog.db", institution_code="WA030",
+               scraper=None, fieldnames=None, flush_every=500):
+    """
+    Open one sink per requested format
+
+    Args:
+        formats (iterable): Any of SINK_FORMATS
+        basename (str): File name without extension for jsonl/csv
+        db_path (str): Database for 'sqlite'
+        institution_code (str): Institution for records without their own code ('sqlite')
+        scraper (str): Name recorded on the scrape_runs row ('sqlite')
+        fieldnames (list): CSV header (default: the first record's keys)
+        flush_every (int): Records buffered per sink before a write
+
+    Returns:
+        MultiSink
+    """
+    sinks = []
+    for fmt in dict.fromkeys(formats):
+        if fmt == 'jsonl':
+            sinks.append(JsonlSink(f"{basename}.jsonl", flush_every))
+        elif fmt == 'csv':
+            sinks.append(CsvSink(f"{basename}.csv", fieldnames, flush_every))
+        elif fmt == 'sqlite':
+            sinks.append(SqliteSink(db_path, institution_code, scraper, flush_every))
+        else:
+            raise ValueError(f"Unknown sink format '{fmt}', expected one of {', '.join(SINK_FORMATS)}")
+    return MultiSink(sinks)
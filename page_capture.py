@@ -0,0 +1,109 @@
+"""
+Debug Capture Policy for Browser Scrapers
+Decides which screenshots and page sources are kept (off, on-error, sampled, always)
+and writes them to disk on a background thread
+"""
+
+import base64
+import logging
+import os
+import queue
+import threading
+
+CAPTURE_MODES = ('off', 'on-error', 'sampled', 'always')
+
+class PageCapture:
+    def __init__(self, mode='on-error', sample_every=10, output_dir='.', max_pending=32):
+        """
+        Screenshot / page-source capture shared by a scraper and its pool workers
+
+        Scrapers ask wants() before grabbing anything from the browser, so
+        skipped captures cost nothing. Accepted captures are queued and a
+        daemon thread decodes and writes them; when max_pending captures are
+        already waiting, new ones are dropped instead of stalling the scrape.
+
+        Args:
+            mode (str): 'off', 'on-error', 'sampled' (1 in sample_every, plus errors) or 'always'
+            sample_every (int): Sampling interval for 'sampled'
+            output_dir (str): Directory the files are written to
+            max_pending (int): Captures allowed to wait for the writer thread
+        """
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode '{mode}', expected one of {', '.join(CAPTURE_MODES)}")
+        self.mode = mode
+        self.sample_every = max(1, sample_every)
+        self.output_dir = output_dir
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'written': 0, 'skipped': 0, 'dropped': 0, 'failed': 0}
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+
+    def wants(self, error=False):
+        """Whether the next capture point should grab a screenshot or page source"""
+        if self.mode == 'always' or (error and self.mode != 'off'):
+            return True
+        with self._lock:
+            # The first capture point is always sampled, then every sample_every-th one
+            wanted = self.mode == 'sampled' and self._requests % self.sample_every == 0
+            self._requests += 1
+            if not wanted:
+                self.stats['skipped'] += 1
+        return wanted
+
+    def submit(self, filename, data, encoding=None):
+        """
+        Queue a capture for the writer thread
+
+        Args:
+            filename (str): File name inside output_dir
+            data: bytes, text, or a base64 string when encoding='base64'
+            encoding (str): 'base64' to decode on the writer thread
+        """
+        with self._lock:
+            if self._thread is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self._thread = threading.Thread(target=self._write_loop, name="page-capture-writer", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((filename, data, encoding))
+            return os.path.join(self.output_dir, filename)
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped'] += 1
+            self.logger.warning(f"Capture queue full, dropped {filename}")
+            return None
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            filename, data, encoding = item
+            path = os.path.join(self.output_dir, filename)
+            try:
+                if encoding == 'base64':
+                    data = base64.b64decode(data)
+                if isinstance(data, str):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(data)
+                else:
+                    with open(path, 'wb') as f:
+                        f.write(data)
+                with self._lock:
+                    self.stats['written'] += 1
+                self.logger.info(f"Capture saved: {path}")
+            except Exception as e:
+                with self._lock:
+                    self.stats['failed'] += 1
+                self.logger.error(f"Failed to write capture {path}: {e}")
+
+    def close(self):
+        """Wait for queued captures to be written and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread:
+            self._queue.put(None)
+            thread.join()
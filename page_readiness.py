@@ -0,0 +1,174 @@
+"""
+Page Readiness Waits for CTCLink Scrapers
+Condition-based waits that replace fixed time.sleep() calls
+"""
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from collections import namedtuple
+import logging
+import time
+
+# Result of a single wait: which condition, whether it was met, and seconds spent
+WaitResult = namedtuple('WaitResult', ['name', 'ready', 'elapsed'])
+
+# Elements that indicate a search has rendered its results
+RESULT_TABLE_SELECTOR = "table tr, tr[class*='course'], div[class*='course'], .course-row"
+
+# PeopleSoft "Processing..." indicators plus generic loading spinners
+SPINNER_SELECTOR = (
+    "#WAIT_win0, #processing, #pt_processing, .ps_box-processing, "
+    "div[class*='spinner'], div[class*='loading']"
+)
+
+_SPINNER_VISIBLE_JS = """
+var nodes = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < nodes.length; i++) {
+    var style = window.getComputedStyle(nodes[i]);
+    if (style.display !== 'none' && style.visibility !== 'hidden' && nodes[i].offsetParent !== null) {
+        return true;
+    }
+}
+return false;
+"""
+
+_DOM_QUIET_JS = """
+var quietMs = arguments[0];
+if (!window.__scraperMutationObserver) {
+    window.__scraperLastMutation = Date.now();
+    window.__scraperMutationObserver = new MutationObserver(function() {
+        window.__scraperLastMutation = Date.now();
+    });
+    window.__scraperMutationObserver.observe(document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+}
+return (Date.now() - window.__scraperLastMutation) >= quietMs;
+"""
+
+class PageReadiness:
+    def __init__(self, driver, timeout=10, poll_frequency=0.1, logger=None):
+        """
+        Wait for pages to be ready instead of sleeping for a fixed time
+
+        Args:
+            driver: Selenium WebDriver to poll
+            timeout (float): Default maximum seconds for each wait
+            poll_frequency (float): Seconds between condition checks
+            logger: Logger used to report wait timings
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.logger = logger or logging.getLogger(__name__)
+        self.timings = []
+
+    def _wait(self, name, condition, timeout=None):
+        """Poll a condition until it holds or the timeout expires, recording how long it took"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+            ready = True
+        except TimeoutException:
+            ready = False
+
+        result = WaitResult(name, ready, time.monotonic() - start)
+        self.timings.append(result)
+
+        if ready:
+            self.logger.info(f"Ready: {name} after {result.elapsed:.2f}s")
+        else:
+            self.logger.warning(f"Timed out waiting for {name} after {result.elapsed:.2f}s")
+        return result
+
+    def document_ready(self, timeout=None):
+        """Wait for document.readyState to reach 'complete'"""
+        return self._wait(
+            'document ready',
+            lambda d: d.execute_script("return document.readyState") == 'complete',
+            timeout
+        )
+
+    def results_table_present(self, selector=RESULT_TABLE_SELECTOR, timeout=None):
+        """Wait for search result rows to be present in the DOM"""
+        return self._wait(
+            'result table present',
+            EC.presence_of_element_located((By.CSS_SELECTOR, selector)),
+            timeout
+        )
+
+    def spinner_gone(self, selector=SPINNER_SELECTOR, timeout=None):
+        """Wait until no loading/processing indicator is visible"""
+        return self._wait(
+            'spinner gone',
+            lambda d: not d.execute_script(_SPINNER_VISIBLE_JS, selector),
+            timeout
+        )
+
+    def dom_quiet(self, quiet_ms=500, timeout=None):
+        """Wait until the DOM has gone quiet_ms milliseconds without any mutations"""
+        def no_recent_mutations(driver):
+            try:
+                return driver.execute_script(_DOM_QUIET_JS, quiet_ms)
+            except WebDriverException:
+                # The document was replaced mid-check; the next poll re-installs the observer
+                return False
+
+        return self._wait(f'DOM quiet for {quiet_ms}ms', no_recent_mutations, timeout)
+
+    def iframe_loaded(self, frame=(By.CSS_SELECTOR, "iframe"), timeout=None):
+        """
+        Switch into an iframe once it exists and its document has finished loading
+
+        Args:
+            frame: Locator tuple or iframe WebElement
+        """
+        def frame_document_complete(driver):
+            if not EC.frame_to_be_available_and_switch_to_it(frame)(driver):
+                return False
+            if driver.execute_script("return document.readyState") == 'complete':
+                return True
+            driver.switch_to.parent_frame()
+            return False
+
+        return self._wait('iframe loaded', frame_document_complete, timeout)
+
+    def page_replaced(self, old_element, timeout=None):
+        """Wait for an element from the previous page to go stale after a navigation"""
+        return self._wait('page replaced', EC.staleness_of(old_element), timeout)
+
+    def page_settled(self, old_root=None, quiet_ms=500, timeout=None):
+        """
+        Wait for a page to finish loading after navigation or a form submit
+
+        Args:
+            old_root: <html> element captured before the action; if given, first
+                      wait for it to go stale so we don't observe the old page
+        """
+        results = []
+        if old_root is not None:
+            results.append(self.page_replaced(old_root, timeout))
+        results.append(self.document_ready(timeout))
+        results.append(self.spinner_gone(timeout=timeout))
+        results.append(self.dom_quiet(quiet_ms, timeout))
+        return results
+
+    def current_root(self):
+        """Return the <html> element of the current document (for page_settled)"""
+        return self.driver.find_element(By.TAG_NAME, "html")
+
+    def summary(self):
+        """Summarize wait timings by condition name"""
+        summary = {}
+        for result in self.timings:
+            entry = summary.setdefault(result.name, {
+                'count': 0, 'timeouts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+            })
+            entry['count'] += 1
+            entry['timeouts'] += 0 if result.ready else 1
+            entry['total_seconds'] += result.elapsed
+            entry['max_seconds'] = max(entry['max_seconds'], result.elapsed)
+        return summary
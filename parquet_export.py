@@ -0,0 +1,263 @@
+"""
+Columnar Catalog Export
+Writes scraped courses and course prefixes to Parquet datasets partitioned by
+institution and scrape date, and loads them back with column projection and row filters
+"""
+
+from datetime import date, datetime
+import json
+import os
+import sqlite3
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ingest_course_data import course_rows_from_records, prefix_rows_from_data
+
+DEFAULT_DATASET_ROOT = "catalog_parquet"
+
+# Directory layout: <root>/<dataset>/institution_code=WA030/scrape_date=2025-10-01/part-0.parquet.
+# The partition values live only in the path, so readers skip whole directories
+# for institution/date filters without opening a file.
+PARTITIONING = ds.partitioning(
+    pa.schema([('institution_code', pa.string()), ('scrape_date', pa.date32())]),
+    flavor='hive'
+)
+
+_LOW_CARDINALITY = pa.dictionary(pa.int32(), pa.string())
+
+COURSE_SCHEMA = pa.schema([
+    ('institution_code', pa.string()),
+    ('scrape_date', pa.date32()),
+    ('prefix_code', _LOW_CARDINALITY),
+    ('subject_name', _LOW_CARDINALITY),
+    ('course_number', pa.string()),
+    ('title', pa.string()),
+    ('credits', _LOW_CARDINALITY),
+    ('description', pa.string())
+])
+
+PREFIX_SCHEMA = pa.schema([
+    ('institution_code', pa.string()),
+    ('scrape_date', pa.date32()),
+    ('prefix_code', _LOW_CARDINALITY),
+    ('institution', _LOW_CARDINALITY),
+    ('extracted_at', pa.string()),
+    ('source_url', _LOW_CARDINALITY),
+    ('extraction_method', _LOW_CARDINALITY)
+])
+
+def _scrape_date(value):
+    """Date part of an ISO timestamp, or today when it is missing or malformed"""
+    try:
+        return datetime.fromisoformat(str(value)[:19]).date()
+    except ValueError:
+        return date.today()
+
+def _write(rows, schema, root, name):
+    """Write row dicts as one Parquet dataset, replacing the institution/date partitions they cover"""
+    if not rows:
+        return 0
+    table = pa.Table.from_pylist(rows, schema=schema)
+    file_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        table,
+        os.path.join(root, name),
+        format=file_format,
+        partitioning=PARTITIONING,
+        basename_template='part-{i}.parquet',
+        existing_data_behavior='delete_matching',
+        file_options=file_format.make_write_options(compression='zstd')
+    )
+    return table.num_rows
+
+def course_rows(records, institution_code="WA030"):
+    """
+    Turn scraper records into one row per course per institution and scrape date
+
+    Records are grouped by the date of their extracted_at and run through
+    course_rows_from_records, so whole-page raw_text dumps become proper
+    course rows instead of one repeated blob per line.
+    """
+    by_date = {}
+    for record in records:
+        by_date.setdefault(_scrape_date(record.get('extracted_at')), []).append(record)
+
+    rows = []
+    for scrape_date, group in by_date.items():
+        subjects, courses, _, _ = course_rows_from_records(group, institution_code)
+        for (code, prefix, number), (title, credits, description) in courses.items():
+            rows.append({
+                'institution_code': code,
+                'scrape_date': scrape_date,
+                'prefix_code': prefix,
+                'subject_name': subjects.get((code, prefix)),
+                'course_number': number,
+                'title': title,
+                'credits': credits,
+                'description': description
+            })
+    return rows
+
+def load_record_files(paths):
+    """Read scraper output files: JSON lists from save_data or JSON Lines from --stream jsonl"""
+    records = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                records.extend(json.loads(line) for line in f if line.strip())
+            else:
+                records.extend(json.load(f))
+    return records
+
+def export_courses(records, root=DEFAULT_DATASET_ROOT, institution_code="WA030"):
+    """
+    Write scraped course records to <root>/courses
+
+    Returns:
+        int: Number of course rows written
+    """
+    return _write(course_rows(records, institution_code), COURSE_SCHEMA, root, 'courses')
+
+def export_courses_from_db(db_path="course_catalog.db", root=DEFAULT_DATASET_ROOT):
+    """Write every stored course to <root>/courses, dated by the run that last touched it"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = [
+            {
+                'institution_code': code,
+                'scrape_date': _scrape_date(started_at),
+                'prefix_code': prefix,
+                'subject_name': subject_name,
+                'course_number': number,
+                'title': title,
+                'credits': credits,
+                'description': description
+            }
+            for code, started_at, prefix, subject_name, number, title, credits, description in conn.execute("""
+                SELECT c.institution_code, r.started_at, c.prefix_code, s.subject_name,
+                       c.course_number, c.title, c.credits, c.description
+                FROM courses c
+                JOIN subjects s ON s.id = c.subject_id
+                LEFT JOIN scrape_runs r ON r.id = c.last_run_id
+            """)
+        ]
+    finally:
+        conn.close()
+    return _write(rows, COURSE_SCHEMA, root, 'courses')
+
+def _prefix_row(prefix, institution, code, extracted_at, source_url, method):
+    return {
+        'institution_code': code,
+        'scrape_date': _scrape_date(extracted_at),
+        'prefix_code': prefix,
+        'institution': institution,
+        'extracted_at': extracted_at,
+        'source_url': source_url,
+        'extraction_method': method
+    }
+
+def export_prefixes(json_files=(), db_path=None, root=DEFAULT_DATASET_ROOT):
+    """
+    Write course prefixes to <root>/prefixes from extraction JSON files and/or course_prefixes
+
+    Returns:
+        int: Number of prefix rows written
+    """
+    sources = []
+    for path in json_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            sources.extend(prefix_rows_from_data(json.load(f)))
+    if db_path:
+        conn = sqlite3.connect(db_path)
+        try:
+            sources.extend(conn.execute("""
+                SELECT prefix_code, institution, institution_code, extracted_at, source_url, extraction_method
+                FROM course_prefixes
+            """).fetchall())
+        finally:
+            conn.close()
+
+    # The same prefix often comes from both a JSON file and the database; keep the last one
+    rows = {}
+    for source in sources:
+        row = _prefix_row(*source)
+        rows[(row['institution_code'], row['scrape_date'], row['prefix_code'])] = row
+    return _write(list(rows.values()), PREFIX_SCHEMA, root, 'prefixes')
+
+def load_dataset(name='courses', root=DEFAULT_DATASET_ROOT, columns=None, institutions=None, since=None, until=None):
+    """
+    Load an exported dataset, reading only the requested columns and partitions
+
+    Args:
+        name (str): 'courses' or 'prefixes'
+        root (str): Directory given to the export functions
+        columns (list): Columns to read (None for all)
+        institutions (list): Only these institution codes
+        since (date): Only scrapes on or after this date
+        until (date): Only scrapes on or before this date
+
+    Returns:
+        pyarrow.Table (call .to_pandas() for a DataFrame)
+
+    Raises:
+        FileNotFoundError: Nothing has been exported as name under root yet
+    """
+    path = os.path.join(root, name)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No {name} dataset at {path}; export one first with 'parquet_export.py {name} ...'")
+    dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+    conditions = []
+    if institutions:
+        conditions.append(ds.field('institution_code').isin(list(institutions)))
+    if since:
+        conditions.append(ds.field('scrape_date') >= pa.scalar(since, pa.date32()))
+    if until:
+        conditions.append(ds.field('scrape_date') <= pa.scalar(until, pa.date32()))
+    condition = None
+    for expression in conditions:
+        condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=columns, filter=condition)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export scraped catalogs to partitioned Parquet and query them")
+    parser.add_argument('--root', default=DEFAULT_DATASET_ROOT, help="Dataset directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    courses = commands.add_parser('courses', help="Export course records")
+    courses.add_argument('files', nargs='*', help="Scraper output (.json from save_data or .jsonl from --stream)")
+    courses.add_argument('--db', help="Export the courses table of this database instead")
+    courses.add_argument('--institution', default='WA030', help="Institution for records without their own code")
+
+    prefixes = commands.add_parser('prefixes', help="Export course prefixes")
+    prefixes.add_argument('files', nargs='*', help="Prefix extraction JSON files")
+    prefixes.add_argument('--db', help="Also export the course_prefixes table of this database")
+
+    query = commands.add_parser('query', help="Load a dataset with column and row filters")
+    query.add_argument('dataset', choices=['courses', 'prefixes'])
+    query.add_argument('--columns', nargs='+')
+    query.add_argument('--institution', nargs='+', dest='institutions')
+    query.add_argument('--since', type=date.fromisoformat, help="YYYY-MM-DD")
+    query.add_argument('--until', type=date.fromisoformat, help="YYYY-MM-DD")
+    query.add_argument('--limit', type=int, default=20, help="Rows to print")
+    args = parser.parse_args()
+
+    if args.command == 'courses':
+        if args.db:
+            written = export_courses_from_db(args.db, args.root)
+        else:
+            written = export_courses(load_record_files(args.files), args.root, args.institution)
+        print(f"📦 {written} course rows written to {os.path.join(args.root, 'courses')}")
+    elif args.command == 'prefixes':
+        written = export_prefixes(args.files, args.db, args.root)
+        print(f"📦 {written} prefix rows written to {os.path.join(args.root, 'prefixes')}")
+    else:
+        try:
+            table = load_dataset(args.dataset, args.root, args.columns, args.institutions, args.since, args.until)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            exit(1)
+        print(table.slice(0, args.limit).to_pandas().to_string())
+        print(f"\n{table.num_rows} rows")
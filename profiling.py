@@ -0,0 +1,267 @@
+"""
+Run Profiling
+cProfile (and optionally tracemalloc) around a scrape or ingest run, written as a sorted
+hotspot report, a raw .pstats dump and a collapsed-stack file for flame graph tools
+"""
+
+from datetime import datetime
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# Where the time goes, by the code it is spent in: (label, substrings of the file
+# name or built-in's name). Times are inclusive, so nested categories overlap
+# (e.g. WebDriver calls include the HTTP round trips underneath them).
+CATEGORIES = (
+    ('browser driver', ('selenium', 'playwright')),
+    ('http', ('requests', 'urllib3', 'http/client', 'aiohttp')),
+    ('sleep / waits', ('time.sleep', 'select.', 'selectors', '_thread.lock', 'acquire')),
+    ('regex', ('/re/', '/re.py', 're.Pattern', '_sre', 'sre_')),
+    ('html parsing', ('html/parser', 'bs4')),
+    ('json', ('/json/', '_json')),
+    ('sqlite', ('sqlite3',)),
+)
+
+def _category(func):
+    filename, _, name = func
+    where = name if filename == '~' else filename.replace(os.sep, '/')
+    for label, patterns in CATEGORIES:
+        if any(pattern in where for pattern in patterns):
+            return label
+    return None
+
+def _frame_label(func):
+    """Readable name for a pstats function key; never contains ';' (the stack separator)"""
+    filename, line, name = func
+    if filename == '~':
+        label = name.strip('<>')
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(';', ',')
+
+class RunProfiler:
+    def __init__(self, name, directory='.', memory=False, top=40):
+        """
+        Profile one run of an entry point
+
+        The thread that calls start() is profiled, and so is every thread started
+        after it (pool workers, fetch threads); their profiles are merged.
+
+        Args:
+            name (str): Run label used in the file names, e.g. 'course_catalog_scraper'
+            directory (str): Where the report files are written
+            memory (bool): Also trace allocations with tracemalloc (slows the run down)
+            top (int): Functions / allocation sites listed per report section
+        """
+        self.name = name
+        self.directory = directory
+        self.memory = memory
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.thread_profiles = []
+        self.memory_snapshot = None
+        self.memory_peak = 0
+        self.started_at = datetime.now()
+        self.wall_seconds = 0.0
+        self._start = None
+        self._stats = None
+        self._stack_cache = None
+        self._lock = threading.Lock()
+
+    def _profile_thread(self, frame, event, arg):
+        """threading.setprofile hook: hand the new thread over to its own cProfile profiler"""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Only one profiler may be active at a time (Python 3.12+); there it sees every thread
+            return
+        with self._lock:
+            self.thread_profiles.append(profile)
+
+    def start(self):
+        if self.memory:
+            tracemalloc.start(10)
+        threading.setprofile(self._profile_thread)
+        self._start = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+        self.wall_seconds = time.perf_counter() - self._start
+        threading.setprofile(None)
+        with self._lock:
+            for profile in self.thread_profiles:
+                profile.disable()
+        if self.memory:
+            self.memory_snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+            ])
+            self.memory_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def stats(self):
+        """Merged pstats.Stats of every profiled thread"""
+        if self._stats is None:
+            stats = pstats.Stats(self.profile)
+            for profile in self.thread_profiles:
+                profile.create_stats()
+                if profile.stats:
+                    stats.add(profile)
+            self._stats = stats
+        return self._stats
+
+    def profiled_seconds(self):
+        """Time under every profiled thread's outermost calls (exceeds wall time when threads overlap)"""
+        return sum(entry[3] for entry in self.stats().stats.values() if not entry[4])
+
+    def categories(self):
+        """
+        Inclusive seconds per CATEGORIES label, from the rebuilt stacks
+
+        A stack's time counts once towards every category that appears anywhere in
+        it, so recursion and calls back out of and into a category are not double counted.
+        """
+        totals = {}
+        for seconds, labels in self._stacks().values():
+            for label in labels:
+                totals[label] = totals.get(label, 0.0) + seconds
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def hotspot_report(self):
+        """Plain-text report: time per category, top functions by own and by cumulative time, allocations"""
+        stats = self.stats()
+        out = io.StringIO()
+        out.write(f"Profile of {self.name}, started {self.started_at.isoformat(timespec='seconds')}\n")
+        profiled = self.profiled_seconds()
+        out.write(f"Wall time {self.wall_seconds:.3f}s, {profiled:.3f}s profiled over "
+                  f"{1 + len(self.thread_profiles)} threads, {stats.total_calls} calls\n\n")
+
+        out.write("Time by category (inclusive, categories can nest)\n")
+        for label, seconds in self.categories().items():
+            out.write(f"  {label:<16} {seconds:>10.3f}s {seconds / (profiled or 1.0):>6.0%}\n")
+
+        for title, key in (("own time", 'tottime'), ("cumulative time", 'cumulative')):
+            out.write(f"\nTop {self.top} functions by {title}\n")
+            stats.stream = out
+            stats.sort_stats(key).print_stats(self.top)
+
+        if self.memory_snapshot:
+            out.write(f"Allocations still live at the end: top {self.top} lines "
+                      f"(peak traced memory {self.memory_peak / 1024 / 1024:.1f} MiB)\n")
+            for stat in self.memory_snapshot.statistics('lineno')[:self.top]:
+                frame = stat.traceback[0]
+                out.write(f"  {stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}\n")
+        return out.getvalue()
+
+    def _stacks(self, min_share=0.0001):
+        """
+        Rebuild whole stacks from cProfile's caller -> callee edges
+
+        Each callee's time is split between its callers in proportion to the time
+        each call edge took. Branches below min_share of the total are dropped.
+
+        Returns:
+            dict: "frame;frame;frame" -> (own seconds, set of category labels on the stack)
+        """
+        if self._stack_cache is not None:
+            return self._stack_cache
+        raw = self.stats().stats
+        children = {}
+        for func, (_, _, _, _, callers) in raw.items():
+            for caller, edge in callers.items():
+                children.setdefault(caller, []).append((func, edge[3]))
+        roots = [func for func, entry in raw.items() if not entry[4]]
+        floor = (sum(raw[func][3] for func in roots) or 1.0) * min_share
+
+        stacks = {}
+
+        def walk(func, path, labels, categories, share):
+            own = raw[func][2] * share
+            if own > 0:
+                key = ';'.join(labels)
+                seconds, _ = stacks.get(key, (0.0, categories))
+                stacks[key] = (seconds + own, categories)
+            for child, edge_seconds in children.get(func, ()):
+                child_total = raw[child][3]
+                if child in path or not child_total:
+                    continue
+                child_share = min(share * edge_seconds / child_total, 1.0)
+                if child_total * child_share < floor or len(path) >= 200:
+                    continue
+                category = _category(child)
+                walk(child, path | {child}, labels + [_frame_label(child)],
+                     categories | {category} if category else categories, child_share)
+
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 1000))
+        try:
+            for root in roots:
+                category = _category(root)
+                walk(root, {root}, [_frame_label(root)], frozenset([category] if category else []), 1.0)
+        finally:
+            sys.setrecursionlimit(limit)
+        self._stack_cache = stacks
+        return stacks
+
+    def collapsed_stacks(self):
+        """
+        Stacks in the collapsed format flamegraph.pl, speedscope and inferno read
+
+        cProfile records caller -> callee edges rather than whole stacks, so the
+        stacks are an estimate (see _stacks).
+
+        Returns:
+            list: "frame;frame;frame microseconds" lines
+        """
+        return [
+            f"{key} {round(seconds * 1e6)}"
+            for key, (seconds, _) in self._stacks().items()
+            if round(seconds * 1e6) > 0
+        ]
+
+    def write(self):
+        """
+        Write <name>_profile_<start>.txt (hotspots), .collapsed (flame graph input)
+        and .pstats (for snakeviz or pstats) into the directory
+
+        Returns:
+            dict: 'report', 'collapsed' and 'pstats' paths
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{self.name}_profile_{self.started_at.strftime('%Y%m%d_%H%M%S')}")
+        paths = {'report': base + '.txt', 'collapsed': base + '.collapsed', 'pstats': base + '.pstats'}
+        with open(paths['report'], 'w', encoding='utf-8') as f:
+            f.write(self.hotspot_report())
+        with open(paths['collapsed'], 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.collapsed_stacks()) + '\n')
+        self.stats().dump_stats(paths['pstats'])
+        return paths
+
+    def finish(self):
+        """stop() and write(); returns the written paths"""
+        self.stop()
+        return self.write()
+
+    def summary_lines(self):
+        """The biggest categories and functions, for end-of-run output"""
+        profiled = self.profiled_seconds() or 1.0
+        lines = [
+            f"{label}: {seconds:.2f}s ({seconds / profiled:.0%} of profiled time)"
+            for label, seconds in list(self.categories().items())[:5]
+        ]
+        stats = self.stats()
+        hottest = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:3]
+        lines.append('hottest: ' + ', '.join(f"{_frame_label(func)} {entry[2]:.2f}s" for func, entry in hottest))
+        if self.memory_snapshot:
+            lines.append(f"peak traced memory {self.memory_peak / 1024 / 1024:.1f} MiB")
+        return lines
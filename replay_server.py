@@ -0,0 +1,95 @@
+"""
+Local Replay Server for Saved Catalog Pages
+Serves pages recorded by CTCLinkCatalogClient(record_dir=...) so scrapers can run offline
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import hashlib
+import json
+import os
+import threading
+
+class ReplayServer:
+    def __init__(self, pages_dir, host="127.0.0.1", port=0):
+        """
+        Serve saved pages by request path and query string
+
+        Args:
+            pages_dir (str): Directory containing manifest.json and the saved pages
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free port)
+        """
+        self.pages_dir = pages_dir
+        with open(os.path.join(pages_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.requests_served = 0
+        self._served_lock = threading.Lock()
+
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                filename = server.manifest.get(self.path) or server.manifest.get(self.path.split('?')[0])
+                if not filename:
+                    self.send_error(404, "Page not recorded")
+                    return
+                with open(os.path.join(server.pages_dir, filename), 'rb') as f:
+                    body = f.read()
+                with server._served_lock:
+                    server.requests_served += 1
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), ReplayHandler)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        """Base URL to hand to CTCLinkCatalogClient"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay saved CTCLink catalog pages over HTTP")
+    parser.add_argument('pages_dir', help="Directory written by CTCLinkCatalogClient(record_dir=...)")
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    replay = ReplayServer(args.pages_dir, port=args.port)
+    print(f"Replaying {len(replay.manifest)} pages at {replay.base_url}")
+    try:
+        replay.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped")
@@ -0,0 +1,284 @@
+"""
+Retries, Backoff and Circuit Breaking for Catalog Fetches
+Wraps page loads and searches so transient failures are retried with jittered
+exponential backoff, a degraded host pauses all workers instead of being hammered,
+and every attempt's outcome and latency is counted
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+class RetryPolicy:
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0, multiplier=2.0):
+        """
+        Exponential backoff with full jitter
+
+        The wait before retry n is drawn uniformly from
+        [0, min(max_delay, base_delay * multiplier ** (n - 1))], so workers
+        that failed together do not all come back at the same moment.
+
+        Args:
+            max_attempts (int): Attempts per call, including the first
+            base_delay (float): Backoff ceiling in seconds for the first retry
+            max_delay (float): Upper bound on any single wait
+            multiplier (float): Growth of the ceiling per retry
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delay(self, retry):
+        """Seconds to wait before retry number `retry` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (retry - 1))
+        return random.uniform(0, ceiling)
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Per-host breaker
+
+        After failure_threshold consecutive failures the circuit opens and
+        callers are held back for reset_timeout seconds. Then one probe call
+        is let through: success closes the circuit, failure opens it again.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def wait_time(self):
+        """
+        Seconds the caller should hold off before trying; 0 means go ahead
+
+        A caller that gets 0 while the circuit is half-open is the probe.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    return remaining
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                # Another caller's probe is in flight; check back shortly
+                return min(1.0, self.reset_timeout)
+            self._probing = True
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def abandon(self):
+        """Give up a half-open probe without a verdict (the call was cancelled)"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        """Count a failure; returns True if this one opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self.opened += 1
+                return True
+            return False
+
+class Resilience:
+    def __init__(self, policy=None, failure_threshold=5, reset_timeout=30.0):
+        """
+        Retry policy, per-host circuit breakers and attempt statistics shared by a scrape
+
+        One instance is meant to be shared by every worker of a run (threads
+        or tasks), so a host that starts failing pauses all of them.
+
+        Args:
+            policy (RetryPolicy): Backoff settings (default RetryPolicy())
+            failure_threshold (int): Consecutive failures per host that open its circuit
+            reset_timeout (float): Seconds an open circuit pauses work on its host
+        """
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.logger = logging.getLogger(__name__)
+        self.breakers = {}
+        self.stats = {}
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    def breaker(self, url):
+        """The circuit breaker for a URL's host (created on first use)"""
+        host = urlsplit(url).netloc if url and '//' in url else (url or '')
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def _operation_stats(self, operation):
+        return self.stats.setdefault(operation, {
+            'calls': 0, 'attempts': 0, 'retries': 0, 'failures': 0,
+            'total_seconds': 0.0, 'max_seconds': 0.0
+        })
+
+    def _record_attempt(self, operation, attempt, seconds):
+        with self._lock:
+            stats = self._operation_stats(operation)
+            stats['attempts'] += 1
+            stats['calls' if attempt == 1 else 'retries'] += 1
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    def _record_failure(self, operation):
+        """Count a call that failed for good (retries exhausted or not retryable)"""
+        with self._lock:
+            self._operation_stats(operation)['failures'] += 1
+
+    def record_restart(self):
+        """Count a browser/driver restart done by a before_retry hook"""
+        with self._lock:
+            self.restarts += 1
+
+    def _failed(self, operation, breaker, url, attempt, error, retryable):
+        """Book-keeping after a failed attempt; returns the backoff delay, or None to give up"""
+        if not retryable(error):
+            # The host answered (e.g. a 404), so it is not degraded; this also ends a half-open probe
+            breaker.record_success()
+            return None
+        if breaker.record_failure():
+            host = urlsplit(url).netloc if url and '//' in url else url
+            self.logger.warning(f"Circuit opened for {host or 'host'} after {breaker.failures} failures; "
+                                f"pausing {breaker.reset_timeout:g}s")
+        if attempt >= self.policy.max_attempts:
+            self.logger.error(f"{operation} failed after {attempt} attempts: {error}")
+            return None
+        delay = self.policy.delay(attempt)
+        self.logger.warning(f"{operation} attempt {attempt} failed ({error}); retrying in {delay:.1f}s")
+        return delay
+
+    def call(self, operation, func, *args, url=None, retryable=None, before_retry=None, **kwargs):
+        """
+        Run func(*args, **kwargs) with retries, backoff and the host's circuit breaker
+
+        Args:
+            operation (str): Name the attempts are counted under, e.g. 'fetch'
+            url (str): URL (or host) whose circuit breaker guards the call
+            retryable: Predicate on the raised exception; others are re-raised at once
+                       (default: every Exception)
+            before_retry: Optional callable(attempt, error) run before the next attempt,
+                          e.g. to reset or restart a browser
+
+        Raises:
+            The last exception once attempts are exhausted
+        """
+        retryable = retryable or (lambda error: True)
+        breaker = self.breaker(url)
+        attempt = 0
+        while True:
+            wait = breaker.wait_time()
+            while wait > 0:
+                time.sleep(wait)
+                wait = breaker.wait_time()
+            attempt += 1
+            started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._record_attempt(operation, attempt, time.monotonic() - started)
+                delay = self._failed(operation, breaker, url, attempt, e, retryable)
+                if delay is None:
+                    self._record_failure(operation)
+                    raise
+                time.sleep(delay)
+                if before_retry:
+                    before_retry(attempt, e)
+                continue
+            except BaseException:
+                breaker.abandon()
+                raise
+            breaker.record_success()
+            self._record_attempt(operation, attempt, time.monotonic() - started)
+            return result
+
+    async def call_async(self, operation, func, *args, url=None, retryable=None, before_retry=None, **kwargs):
+        """Coroutine version of call(): func is a coroutine function, waits do not block the loop"""
+        retryable = retryable or (lambda error: True)
+        breaker = self.breaker(url)
+        attempt = 0
+        while True:
+            wait = breaker.wait_time()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = breaker.wait_time()
+            attempt += 1
+            started = time.monotonic()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                self._record_attempt(operation, attempt, time.monotonic() - started)
+                delay = self._failed(operation, breaker, url, attempt, e, retryable)
+                if delay is None:
+                    self._record_failure(operation)
+                    raise
+                await asyncio.sleep(delay)
+                if before_retry:
+                    await before_retry(attempt, e)
+                continue
+            except BaseException:
+                breaker.abandon()
+                raise
+            breaker.record_success()
+            self._record_attempt(operation, attempt, time.monotonic() - started)
+            return result
+
+    def summary(self):
+        """
+        Attempt statistics for the run
+
+        Returns:
+            dict: 'operations' (name -> calls, attempts, retries, failures and
+                  latency per attempt), 'circuit_opens' (host -> count) and 'restarts'
+        """
+        with self._lock:
+            return {
+                'operations': {
+                    name: dict(stats, avg_seconds=stats['total_seconds'] / stats['attempts'])
+                    for name, stats in self.stats.items()
+                },
+                'circuit_opens': {host: b.opened for host, b in self.breakers.items() if b.opened},
+                'restarts': self.restarts
+            }
+
+    def summary_lines(self):
+        """summary() as short human-readable lines for end-of-run output"""
+        summary = self.summary()
+        lines = [
+            f"{name}: {stats['calls']} calls, {stats['retries']} retries, {stats['failures']} failed, "
+            f"avg {stats['avg_seconds']:.2f}s / max {stats['max_seconds']:.2f}s per attempt"
+            for name, stats in summary['operations'].items()
+        ]
+        for host, opened in summary['circuit_opens'].items():
+            lines.append(f"circuit for {host} opened {opened} times")
+        if summary['restarts']:
+            lines.append(f"{summary['restarts']} browser restarts")
+        return lines
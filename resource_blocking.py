@@ -0,0 +1,190 @@
+"""
+Resource Blocking for Browser Scrapers
+Drops images, fonts, media, stylesheets and trackers before they are downloaded,
+via Playwright routes or Chrome DevTools Network.setBlockedURLs, and counts what was saved
+"""
+
+from urllib.parse import urlsplit
+import json
+import logging
+import threading
+
+RESOURCE_TYPES = ('image', 'font', 'stylesheet', 'media', 'tracker')
+
+# Stylesheets are opt-in: PageReadiness.spinner_gone and Playwright's
+# visibility checks read computed styles, which change without the portal CSS
+DEFAULT_BLOCKED_TYPES = ('image', 'font', 'media', 'tracker')
+
+# File extensions per type, for Chrome's URL-pattern blocking and for Playwright
+# requests whose resource type is reported as 'other'
+RESOURCE_EXTENSIONS = {
+    'image': ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.ico', '.bmp'),
+    'font': ('.woff', '.woff2', '.ttf', '.otf', '.eot'),
+    'stylesheet': ('.css',),
+    'media': ('.mp4', '.webm', '.mp3', '.ogg', '.wav')
+}
+
+TRACKER_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'facebook.net', 'connect.facebook.com', 'hotjar.com', 'newrelic.com', 'nr-data.net',
+    'quantserve.com', 'scorecardresearch.com', 'clarity.ms', 'siteimproveanalytics.com'
+)
+
+# Chrome's Network.loadingFailed reports these types for blocked requests
+_CDP_TYPES = {'Image': 'image', 'Font': 'font', 'Stylesheet': 'stylesheet', 'Media': 'media'}
+
+# Typical transfer sizes used to estimate savings; blocked requests are never
+# downloaded, so their real size is unknown
+ESTIMATED_BYTES = {'image': 20_000, 'font': 35_000, 'stylesheet': 30_000, 'media': 250_000, 'tracker': 40_000}
+
+class ResourceBlocker:
+    def __init__(self, block_types=DEFAULT_BLOCKED_TYPES, extra_hosts=()):
+        """
+        Decide which subresources a browser scraper skips, and keep per-run counts
+
+        One blocker can be shared by several drivers or contexts (counts are
+        thread-safe). The main document, scripts and XHR are never blocked.
+
+        Args:
+            block_types (iterable): Any of RESOURCE_TYPES
+            extra_hosts (iterable): More host names to block as trackers
+        """
+        unknown = set(block_types) - set(RESOURCE_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown resource types: {', '.join(sorted(unknown))}")
+        self.block_types = set(block_types)
+        self.tracker_hosts = TRACKER_HOSTS + tuple(extra_hosts)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self.blocked = {resource_type: 0 for resource_type in RESOURCE_TYPES}
+        self.requests_allowed = 0
+        self.bytes_transferred = 0
+
+    def is_tracker(self, url):
+        host = urlsplit(url).hostname or ''
+        return any(host == tracker or host.endswith('.' + tracker) for tracker in self.tracker_hosts)
+
+    def category(self, url, resource_type=None):
+        """
+        Return the blocked category of a request, or None to let it through
+
+        Args:
+            url (str): Request URL
+            resource_type (str): Playwright resource type, if known
+        """
+        if 'tracker' in self.block_types and self.is_tracker(url):
+            return 'tracker'
+        if resource_type in self.block_types:
+            return resource_type
+        path = urlsplit(url).path.lower()
+        for blocked_type in self.block_types & set(RESOURCE_EXTENSIONS):
+            if path.endswith(RESOURCE_EXTENSIONS[blocked_type]):
+                return blocked_type
+        return None
+
+    def _count_blocked(self, category):
+        with self._lock:
+            self.blocked[category] += 1
+
+    def _count_transferred(self, size):
+        with self._lock:
+            self.requests_allowed += 1
+            self.bytes_transferred += max(0, size)
+
+    def cdp_url_patterns(self):
+        """Wildcard patterns for Chrome DevTools Network.setBlockedURLs"""
+        patterns = []
+        for blocked_type in sorted(self.block_types & set(RESOURCE_EXTENSIONS)):
+            for extension in RESOURCE_EXTENSIONS[blocked_type]:
+                patterns.extend([f"*{extension}", f"*{extension}?*"])
+        if 'tracker' in self.block_types:
+            patterns.extend(f"*://*{host}/*" for host in self.tracker_hosts)
+        return patterns
+
+    def configure_chrome_options(self, chrome_options):
+        """Turn on the Network performance log that collect_selenium_stats reads"""
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+    def install_selenium(self, driver):
+        """Block matching URLs in a Chrome WebDriver via the DevTools protocol"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.cdp_url_patterns()})
+
+    def collect_selenium_stats(self, driver):
+        """
+        Drain the driver's performance log into the blocked/transferred counts
+
+        Call regularly (e.g. after each page) so Chrome's log buffer stays small.
+        """
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            self.logger.debug(f"Performance log unavailable: {e}")
+            return
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            params = message.get('params', {})
+            if message.get('method') == 'Network.loadingFinished':
+                self._count_transferred(int(params.get('encodedDataLength', 0)))
+            elif message.get('method') == 'Network.loadingFailed' and params.get('blockedReason') == 'inspector':
+                category = _CDP_TYPES.get(params.get('type'), 'tracker')
+                self._count_blocked(category if category in self.block_types else 'tracker')
+
+    def _on_request_finished(self, request):
+        try:
+            sizes = request.sizes()
+            self._count_transferred(sizes['responseBodySize'] + sizes['responseHeadersSize'])
+        except Exception:
+            self._count_transferred(0)
+
+    def install_playwright(self, context):
+        """
+        Abort matching requests in a Playwright BrowserContext (sync API)
+
+        Install after any other "**/*" route (e.g. the response cache): the
+        latest route runs first and falls back to earlier ones for requests it lets through.
+        """
+        def handle(route):
+            category = self.category(route.request.url, route.request.resource_type)
+            if category:
+                self._count_blocked(category)
+                route.abort('blockedbyclient')
+            else:
+                route.fallback()
+
+        context.route("**/*", handle)
+        context.on("requestfinished", self._on_request_finished)
+
+    async def install_playwright_async(self, context):
+        """Async-API counterpart of install_playwright()"""
+        async def handle(route):
+            category = self.category(route.request.url, route.request.resource_type)
+            if category:
+                self._count_blocked(category)
+                await route.abort('blockedbyclient')
+            else:
+                await route.fallback()
+
+        async def on_request_finished(request):
+            try:
+                sizes = await request.sizes()
+                self._count_transferred(sizes['responseBodySize'] + sizes['responseHeadersSize'])
+            except Exception:
+                self._count_transferred(0)
+
+        await context.route("**/*", handle)
+        context.on("requestfinished", on_request_finished)
+
+    def summary(self):
+        """Blocked counts per type, transferred bytes and the estimated bytes saved"""
+        with self._lock:
+            blocked = {k: v for k, v in self.blocked.items() if v}
+            return {
+                'blocked': blocked,
+                'blocked_total': sum(blocked.values()),
+                'requests_allowed': self.requests_allowed,
+                'bytes_transferred': self.bytes_transferred,
+                'estimated_bytes_saved': sum(ESTIMATED_BYTES[k] * v for k, v in blocked.items())
+            }
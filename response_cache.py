@@ -0,0 +1,303 @@
+"""
+On-Disk Response Cache for Catalog Fetchers
+SQLite-backed page cache with TTL, size-bounded LRU eviction and ETag/Last-Modified
+revalidation, shared by the requests, aiohttp and Playwright fetch paths
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "response_cache.db"
+
+# Headers that describe the bytes on the wire rather than the stored body
+_TRANSPORT_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+# Headers that belong to one session and must not be replayed to another
+_SESSION_HEADERS = {'set-cookie', 'set-cookie2'}
+# Playwright resource types served from the cache; subresources (scripts, images...) go to the network
+CACHED_RESOURCE_TYPES = ('document', 'xhr')
+
+class CachedResponse:
+    """The parts of a response the scrapers use, whether from the cache or the network"""
+    def __init__(self, url, status_code, headers, content, encoding='utf-8', from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=3600, max_bytes=200 * 1024 * 1024):
+        """
+        Cache GET responses on disk
+
+        Fresh entries (younger than ttl) are served without touching the
+        network. Stale entries that carry an ETag or Last-Modified header are
+        revalidated with a conditional request; a 304 refreshes them in place.
+        When the stored bodies exceed max_bytes the least recently used
+        entries are evicted. Responses marked Cache-Control no-store or private
+        are never stored, and Set-Cookie headers are dropped from stored ones.
+
+        Args:
+            path (str): SQLite file holding the cache
+            ttl (float): Seconds an entry is served without revalidation
+            max_bytes (int): Upper bound on the total size of stored bodies
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+        self._lock = threading.Lock()
+        # Several worker processes may share one cache file; wait out their write locks
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key CHAR(64) PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                encoding VARCHAR(40),
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+        """)
+
+    @staticmethod
+    def key_for(url, method='GET'):
+        """Cache key for a request: method plus URL with its query parameters sorted"""
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ''))
+        return hashlib.sha256(f"{method.upper()} {normalized}".encode('utf-8')).hexdigest()
+
+    def lookup(self, url):
+        """
+        Return the stored entry for url
+
+        Returns:
+            tuple: (CachedResponse, is_fresh), or (None, False) when nothing is stored
+        """
+        key = self.key_for(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, encoding, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, False
+            with self._conn:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        status, headers, encoding, body, fetched_at = row
+        response = CachedResponse(url, status, json.loads(headers), body, encoding, from_cache=True)
+        return response, now - fetched_at < self.ttl
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def cacheable(headers):
+        """False for responses whose Cache-Control forbids a shared on-disk copy"""
+        cache_control = next((v for k, v in headers.items() if k.lower() == 'cache-control'), '')
+        directives = {d.strip().split('=')[0].lower() for d in cache_control.split(',')}
+        return not directives & {'no-store', 'private'}
+
+    def store(self, url, status, headers, body, encoding='utf-8'):
+        """
+        Save a successful response and evict old entries if the cache is over budget
+
+        Uncacheable responses (see cacheable) are returned without being saved.
+        """
+        if not self.cacheable(headers):
+            headers = {k.lower(): v for k, v in headers.items() if k.lower() not in _TRANSPORT_HEADERS}
+            return CachedResponse(url, status, headers, body, encoding)
+        headers = {
+            k.lower(): v for k, v in headers.items()
+            if k.lower() not in _TRANSPORT_HEADERS and k.lower() not in _SESSION_HEADERS
+        }
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO responses
+                (key, url, status, headers, encoding, body, size, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (self.key_for(url), url, status, json.dumps(headers), encoding, body, len(body), now, now))
+            self.stats['stored'] += 1
+            self._evict()
+        return CachedResponse(url, status, headers, body, encoding)
+
+    def refresh(self, url):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, self.key_for(url))
+            )
+
+    def _evict(self):
+        """Drop least recently used entries until the stored bodies fit in max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self.stats['evicted'] += evicted
+
+    @staticmethod
+    def validators(entry):
+        """Conditional request headers for a stale entry"""
+        headers = {}
+        if entry.headers.get('etag'):
+            headers['If-None-Match'] = entry.headers['etag']
+        if entry.headers.get('last-modified'):
+            headers['If-Modified-Since'] = entry.headers['last-modified']
+        return headers
+
+    def fetch(self, session, url, timeout=30):
+        """
+        GET url through a requests.Session, using the cache where possible
+
+        Raises:
+            requests.HTTPError: For non-2xx responses (which are never cached)
+        """
+        entry, fresh = self.lookup(url)
+        if fresh:
+            self._count('hits')
+            return entry
+
+        validators = self.validators(entry) if entry else {}
+        response = session.get(url, timeout=timeout, headers=validators)
+        if entry and validators and response.status_code == 304:
+            self._count('revalidated')
+            self.refresh(url)
+            return entry
+
+        response.raise_for_status()
+        self._count('misses')
+        return self.store(url, response.status_code, response.headers, response.content, response.encoding or 'utf-8')
+
+    async def fetch_async(self, session, url, throttle=None):
+        """
+        GET url through an aiohttp.ClientSession, using the cache where possible
+
+        Args:
+            session (aiohttp.ClientSession): Session used on a miss or revalidation
+            url (str): Page to fetch
+            throttle: Optional coroutine function awaited only before a network request,
+                      so cache hits skip rate limiting
+
+        Raises:
+            aiohttp.ClientResponseError: For non-2xx responses (which are never cached)
+        """
+        entry, fresh = self.lookup(url)
+        if fresh:
+            self._count('hits')
+            return entry
+
+        validators = self.validators(entry) if entry else {}
+        if throttle:
+            await throttle(url)
+        async with session.get(url, headers=validators) as response:
+            if entry and validators and response.status == 304:
+                self._count('revalidated')
+                self.refresh(url)
+                return entry
+            response.raise_for_status()
+            body = await response.read()
+            self._count('misses')
+            return self.store(url, response.status, dict(response.headers), body, response.charset or 'utf-8')
+
+    def playwright_route_handler(self):
+        """
+        Build a Playwright route handler that serves GET requests from the cache
+
+        Install with page.route("**/*", cache.playwright_route_handler()) or on a
+        BrowserContext. Only GET documents and XHRs are cached (CACHED_RESOURCE_TYPES);
+        other requests pass through untouched.
+        """
+        def handle(route):
+            request = route.request
+            if (request.method != 'GET' or not request.url.startswith('http')
+                    or request.resource_type not in CACHED_RESOURCE_TYPES):
+                route.continue_()
+                return
+            entry, fresh = self.lookup(request.url)
+            if fresh:
+                self._count('hits')
+                route.fulfill(status=entry.status_code, headers=entry.headers, body=entry.content)
+                return
+
+            validators = self.validators(entry) if entry else {}
+            response = route.fetch(headers={**request.headers, **validators})
+            if entry and validators and response.status == 304:
+                self._count('revalidated')
+                self.refresh(request.url)
+                route.fulfill(status=entry.status_code, headers=entry.headers, body=entry.content)
+                return
+
+            body = response.body()
+            if response.ok:
+                self._count('misses')
+                self.store(request.url, response.status, response.headers, body)
+            route.fulfill(response=response, body=body)
+        return handle
+
+    def playwright_async_route_handler(self):
+        """Async-API counterpart of playwright_route_handler()"""
+        async def handle(route):
+            request = route.request
+            if (request.method != 'GET' or not request.url.startswith('http')
+                    or request.resource_type not in CACHED_RESOURCE_TYPES):
+                await route.continue_()
+                return
+            entry, fresh = self.lookup(request.url)
+            if fresh:
+                self._count('hits')
+                await route.fulfill(status=entry.status_code, headers=entry.headers, body=entry.content)
+                return
+
+            validators = self.validators(entry) if entry else {}
+            response = await route.fetch(headers={**request.headers, **validators})
+            if entry and validators and response.status == 304:
+                self._count('revalidated')
+                self.refresh(request.url)
+                await route.fulfill(status=entry.status_code, headers=entry.headers, body=entry.content)
+                return
+
+            body = await response.body()
+            if response.ok:
+                self._count('misses')
+                self.store(request.url, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+        return handle
+
+    def summary(self):
+        """Hit/miss counts plus the number and size of stored entries"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return dict(self.stats, entries=entries, bytes=size)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
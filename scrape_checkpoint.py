@@ -0,0 +1,79 @@
+"""
+Checkpoints for Resumable Scrapes
+Records every completed subject (or institution) and its rows as soon as it finishes,
+so a --resume run skips finished work after a crash or Ctrl+C
+"""
+
+from datetime import datetime
+import json
+import logging
+import sqlite3
+import threading
+
+DEFAULT_CHECKPOINT_PATH = "scrape_checkpoint.db"
+
+class ScrapeCheckpoint:
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, scope='WA030', resume=False):
+        """
+        Checkpoint store for one scrape (one scope) in a SQLite file
+
+        Each record() is committed immediately, so everything recorded before
+        a crash survives it. A run that does not resume starts its scope empty;
+        other scopes in the same file are left alone.
+
+        Args:
+            path (str): SQLite file holding the checkpoints
+            scope (str): What is being scraped, e.g. an institution code
+            resume (bool): Keep items completed by an earlier run of this scope
+        """
+        self.path = path
+        self.scope = scope
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        # Pool workers record from their own threads
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                scope VARCHAR(40) NOT NULL,
+                item VARCHAR(40) NOT NULL,
+                row_count INTEGER NOT NULL,
+                rows TEXT NOT NULL,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (scope, item)
+            );
+        """)
+        if not resume:
+            self.clear()
+
+    def completed(self):
+        """
+        Items finished by earlier runs of this scope
+
+        Returns:
+            dict: item -> list of rows recorded for it
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item, rows FROM checkpoints WHERE scope = ?", (self.scope,)
+            ).fetchall()
+        return {item: json.loads(data) for item, data in rows}
+
+    def record(self, item, rows):
+        """Mark an item finished and store its rows (committed before returning)"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO checkpoints (scope, item, row_count, rows, completed_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (self.scope, item, len(rows), json.dumps(rows, ensure_ascii=False), datetime.now().isoformat()))
+
+    def clear(self):
+        """Forget every item of this scope"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE scope = ?", (self.scope,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -7,7 +7,7 @@ echo.
 
 REM Install Python packages
 echo Installing Python packages...
-pip install selenium playwright requests beautifulsoup4 pandas
+pip install -r "%~dp0requirements.txt"
 
 echo.
 echo Installing Playwright browsers...
@@ -8,7 +8,7 @@ echo
 
 # Install Python packages
 echo "Installing Python packages..."
-pip install selenium playwright requests beautifulsoup4 pandas
+pip install -r "$(dirname "$0")/requirements.txt"
 
 echo
 echo "Installing Playwright browsers..."
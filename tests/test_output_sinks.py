@@ -0,0 +1,46 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_sinks import SqliteSink
+
+def section(number):
+    return {
+        'course_code': 'MATH& 141',
+        'course_title': 'Precalculus I',
+        'credits': '5',
+        'section_code': f'0{number}',
+        'instructor': f'Instructor {number}',
+        'schedule': 'MW 9:00',
+        'location': 'ST 101'
+    }
+
+def stored_sections(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(row[0] for row in conn.execute("SELECT section_code FROM sections"))
+    finally:
+        conn.close()
+
+def test_sections_crossing_a_flush_are_kept(tmp_path):
+    db_path = str(tmp_path / 'catalog.db')
+    sink = SqliteSink(db_path, flush_every=2)
+    sink.write_many([section(n) for n in range(1, 4)])  # first batch: 01-03
+    # second batch, flushed on close: 04 of the same course
+    sink.write(section(4))
+    sink.close()
+    assert stored_sections(db_path) == ['01', '02', '03', '04']
+
+def test_a_new_run_replaces_earlier_sections(tmp_path):
+    db_path = str(tmp_path / 'catalog.db')
+    first = SqliteSink(db_path)
+    first.write_many([section(1), section(2)])
+    first.close()
+
+    second = SqliteSink(db_path, flush_every=1)
+    second.write(section(3))
+    second.write(section(4))
+    second.close()
+    assert stored_sections(db_path) == ['03', '04']